@@ -3,7 +3,12 @@ import sys
 sys.path.append('../calc')
 
 from .one_point import *
-from stat_controls import Statistic
+from .robust_trends import *
+from stat_controls import (Statistic, calc_trend_stats, get_linear_trend,
+                           update_suff_stats, get_stats_grids, stack_datasets,
+                           unstack_datasets)
+from stat_store import *
+from .render_queue import *
 from .vis_controls import *
 # -- Import from subpackege
 from .doc import *
@@ -1,9 +1,17 @@
 # -*- coding: utf-8 -*-
 __all__ = [
+    'get_station_ids',
+    'get_station_data',
     'one_point_calc',
 ]
 """
-Script for analysis and visualization data, presented as a point (station)
+Script for analysis and visualization data, presented as a point (station):
+    a. get_station_ids --> get indices of the nearest grid cells for all
+                           stations (computed once for each grid);
+    b. get_station_data --> get data of all stations and datasets by one
+                            vectorized selection for each dataset;
+    c. one_point_calc --> statistics (csv) and figures for each station
+                          (plot jobs are rendered by RenderQueue).
 
 Autors of project: Evgenii Churiulin, Ana Bastos
 
@@ -22,6 +30,10 @@ Version    Date       Name
            of path to the personal modules
     1.3    2023-05-04 Evgenii Churiulin, MPI-BGC
            Small changes in code related to refactoring
+    1.4    2026-10-17 MPI-BGC
+           Data of all stations are selected by one vectorized selection for
+           each dataset (get_station_data). Figures are rendered by queue of
+           plot jobs (render_queue.py)
 """
 
 # =============================     Import modules     ====================
@@ -36,11 +48,80 @@ from typing import Optional
 sys.path.append(os.path.join(os.getcwd(), '..'))
 from settings import get_settings4stations, get_limits4station_plots, config
 from vis_controls import one_linear_plot, box_plot
-from libraries import makefolder, vis_stations
+from render_queue import RenderQueue
+from libraries import makefolder, vis_stations, get_grid_key
 
+# -- Indices of stations for each grid (key of grid and stations --> indices):
+station_ids = {}
 
 # =============================   Personal functions   ====================
 
+def get_station_ids(
+        lat:np.array, lon:np.array, stations:dict,
+    ) -> tuple[np.array, np.array]:
+    """Get indices of the nearest grid cells (the same cells as in
+       .sel(method = 'nearest')) for all stations. Indices are computed once
+       for each grid:
+
+        Input variables:
+        lat, lon - Latitudes and longitudes of grid
+        stations - User stations (get_settings4stations)
+
+        OUTPUT variables:
+        ilat, ilon - Indices of latitudes and longitudes for each station
+    """
+    lats = [stations.get(i + 1)[0] for i in range(len(stations))]
+    lons = [stations.get(i + 1)[1] for i in range(len(stations))]
+    key = (get_grid_key(lat, lon), tuple(lats), tuple(lons))
+    if key not in station_ids:
+        station_ids[key] = (
+            pd.Index(lat).get_indexer(lats, method = 'nearest'),
+            pd.Index(lon).get_indexer(lons, method = 'nearest'),
+        )
+    return station_ids.get(key)
+
+
+def get_station_data(
+        lst4ds_names:list[str],
+        data_list:list[xr.Dataset],
+        var:Optional[str],
+        stations:dict,
+    ) -> xr.DataArray:
+    """Get data of all stations and datasets. Data of each dataset are
+       selected by one vectorized selection (isel) for all stations:
+
+        Input variables:
+        lst4ds_names - Dataset names
+        data_list - Data for research datasets (Datasets or DataArrays)
+        var - Research parameter (None if data_list has DataArrays)
+        stations - User stations (get_settings4stations)
+
+        OUTPUT variables:
+        points - Data (dataset, station, time[, other dimensions, for example:
+                 vegtype]). Coordinates of grid cells are in lat and lon,
+                 station names are in station_name. Time axes of datasets
+                 are joined
+    """
+    lst4points = []
+    for act_data in data_list:
+        act_data = act_data[var] if var is not None else act_data
+        ilat, ilon = get_station_ids(act_data.lat.values, act_data.lon.values, stations)
+        lst4points.append(
+            act_data.isel(
+                lat = xr.DataArray(ilat, dims = 'station'),
+                lon = xr.DataArray(ilon, dims = 'station'),
+            )
+        )
+    points = xr.concat(
+        lst4points, dim = pd.Index(lst4ds_names, name = 'dataset'), join = 'outer')
+    return (
+        points.assign_coords(
+            station = np.arange(1, len(stations) + 1),
+            station_name = ('station', [stations.get(i + 1)[2] for i in range(len(stations))]))
+              .transpose('dataset', 'station', 'time', ...)
+              .load()
+    )
+
 # Function: one_point_calc. Create option for analysis data in one point
 #                           (station) or in a random point
 def one_point_calc(
@@ -54,6 +135,9 @@ def one_point_calc(
         region:str,                    # Research region
         uconfig:config,                # User class with settings
         tstart:Optional[int] = 1980,   # First year of the research period
+        queue:Optional[RenderQueue] = None, # Queue of plot jobs (figures are rendered by
+                                            # queue.run). Default is None (figures are
+                                            # rendered at the end of function)
         # OUTPUT variables:
     ) -> pd.DataFrame:                 # Statistical data for all stations
     # -- Local variables:
@@ -71,27 +155,31 @@ def one_point_calc(
     plt_limits_point = get_limits4station_plots(tstart, uconfig)
     # -- Create output folder:
     data_OUT = makefolder(data_OUT + fn_output)
+    # -- Plot jobs of stations:
+    lrender = queue is None
+    queue = queue if queue is not None else RenderQueue()
 
-    # -- Get data for stations and create figures:
+    # -- Get data for all stations and datasets (dataset, station, time):
+    points = get_station_data(lst4ds_names, data_list, var, stations)
+    # -- Convert parameters to correct units:
+    if var in units_group_1:
+        var_units = '1000 km2'
+    elif var in units_group_2:
+        # Convert units from gC m-2 yr-1 --> kgC m-2 yr-1
+        var_units = 'kg C m\u207b\u00B2 yr\u207b\u00B9'
+        points = points / g2kg
+    elif var in units_group_3:
+        var_units = 'kg C m \u207b\u00B2' if var == 'cVeg' else 'm\u00B2 m\u207b\u00B2'
+
+    # -- Get statistics and create figures for stations:
     for i in range(len(stations)):
-        # -- Get coordinates for each point:
-        lats, lons = stations.get(i + 1)[0], stations.get(i + 1)[1]
         name4plot, pft4plot = stations.get(i + 1)[2], stations.get(i + 1)[3]
-        # -- Get data for each station:
-        lst4points = []
-        for j in range(len(lst4ds_names)):
-            point_data = data_list[j][var].sel(lat = lats, lon = lons, method = 'nearest')
-            # 2.2.1 Convert parameters to correct units:
-            if var in units_group_1:
-                var_units = '1000 km2'
-                lst4points.append(point_data)
-            elif var in units_group_2:
-                # Convert units from gC m-2 yr-1 --> kgC m-2 yr-1
-                var_units = 'kg C m\u207b\u00B2 yr\u207b\u00B9'
-                lst4points.append(point_data / g2kg )
-            elif var in units_group_3:
-                var_units = 'kg C m \u207b\u00B2' if var == 'cVeg' else 'm\u00B2 m\u207b\u00B2'
-                lst4points.append(point_data)
+        # -- Get data for each station (time axis of each dataset):
+        lst4points = [
+            points.isel(station = i)
+                  .sel(dataset = lst4ds_names[j], time = data_list[j].time.values)
+            for j in range(len(lst4ds_names))
+        ]
 
         # -- Get data for statistical metrics and save them into .csv tables:
         stat_data = [
@@ -131,8 +219,8 @@ def one_point_calc(
         # -- User settings for boxplots and line plots:
         user_plt_settings = {
             'title' : (f'Annual values of {lvar_name} for one point '
-                f'(lat = {point_data[0].lat.values},'
-                f' lon = {point_data[0].lon.values}) \n {pft4plot}'),
+                f'(lat = {lst4points[-1].lat.values},'
+                f' lon = {lst4points[-1].lon.values}) \n {pft4plot}'),
             'ylabel' : f'{svar_name}, {var_units}',
             'output_name' : f'{var}_station_{name4plot}.png',
             'output_name_bxp' : f'boxplot_{var}_station_{name4plot}.png',
@@ -173,7 +261,9 @@ def one_point_calc(
             ystep =  0.01
         # -- Start visualization:
         # Plot 1: linear plot for each station
-        one_linear_plot(
+        queue.add(
+            data_OUT + user_plt_settings.get('output_name'),
+            one_linear_plot,
             lst4ds_names,
             region,
             var,
@@ -188,7 +278,9 @@ def one_point_calc(
             ystep = ystep,
         )
         # Plot 2: Boxplot for each station
-        box_plot(
+        queue.add(
+            data_OUT + user_plt_settings.get('output_name_bxp'),
+            box_plot,
             df_boxplot_data,
             user_plt_settings,
             data_OUT,
@@ -196,7 +288,8 @@ def one_point_calc(
             ymax,
             ystep,
         )
-        # Plot 3: 2D Map with station location
-        vis_stations(data_OUT, uconfig)
-
+    # Plot 3: 2D Map with station location (the same for all stations)
+    queue.add(data_OUT + 'STATIONS.png', vis_stations, data_OUT, uconfig)
+    if lrender:
+        queue.run()
     return df_stat_data
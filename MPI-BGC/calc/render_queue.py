@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    'get_job_data',
+    'init_render_worker',
+    'render_job',
+    'RenderQueue',
+]
+"""
+Queue of plot jobs (plot function + data + settings). Jobs are collected
+after computations and rendered one after another or in a pool of worker
+processes with headless backend (Agg). Each job has unique name, output
+files are defined by settings of job (the same names as in sequential mode).
+Errors of one figure don't stop other figures:
+    a. get_job_data --> get data of job without lazy (Dask) arrays;
+    b. init_render_worker --> initialization of worker (Agg backend);
+    c. render_job --> render one figure and get status of job;
+    d. RenderQueue --> queue of plot jobs:
+        - add --> add new plot job to queue;
+        - run --> render all jobs and get report ('OK' or 'FAILED').
+
+Autors of project: Evgenii Churiulin, Ana Bastos
+
+Current Code Owner: MPI-BGC, Evgenii Churiulin
+phone:  +49  170 261-5104
+email:  evgenychur@bgc-jena.mpg.de
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-17 MPI-BGC
+           Initial release
+    1.2    2026-10-17 MPI-BGC
+           Jobs of broken pool are rendered again in own pools
+"""
+
+# =============================     Import modules     ====================
+# -- Standard modules:
+import time
+import traceback
+import pandas as pd
+import xarray as xr
+from typing import Optional, Callable
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# =============================   Personal functions   ====================
+
+def get_job_data(obj):
+    """Get data of job without lazy (Dask) arrays: data are computed in the
+       main process, only values are sent to workers"""
+    if isinstance(obj, (xr.DataArray, xr.Dataset)):
+        return obj.compute()
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(get_job_data(item) for item in obj)
+    if isinstance(obj, dict):
+        return {key: get_job_data(value) for key, value in obj.items()}
+    return obj
+
+
+def init_render_worker() -> None:
+    """Initialization of worker: headless backend for figures"""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def render_job(name:str, func:Callable, args:tuple, kwargs:dict) -> dict:
+    """Render one figure (func(*args, **kwargs)). Errors are not raised,
+       they are returned in status of job:
+
+        OUTPUT variables:
+        res - 'name', 'status' ('OK' or 'FAILED'), 'error' and 'time' (s)
+    """
+    import matplotlib.pyplot as plt
+    tstart = time.perf_counter()
+    error = ''
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        # -- Figures of job are not used by the next jobs:
+        plt.close('all')
+    return {
+        'name'  : name,
+        'status': 'OK' if not error else 'FAILED',
+        'error' : error,
+        'time'  : time.perf_counter() - tstart,
+    }
+
+
+class RenderQueue:
+    """Queue of plot jobs. Jobs are rendered by run in the same order as they
+       were added (nprocs = 1) or in a pool of worker processes (nprocs > 1).
+       Report of jobs has the same order as jobs.
+    """
+    def __init__(self, nprocs: Optional[int] = 1, nretry: Optional[int] = 1):
+        """Initialization:
+
+            Input variables:
+            nprocs - Number of worker processes. Default is 1 (jobs are
+                     rendered in actual process)
+            nretry - Number of restarts of job if worker process was killed
+                     (job is rendered in own pool). Default is 1
+        """
+        self.nprocs = nprocs if nprocs is not None else 1
+        self.nretry = nretry
+        self.jobs = {}
+
+
+    def add(self, name:str, func:Callable, *args, **kwargs) -> None:
+        """Add new plot job to queue:
+
+            Input variables:
+            name - Unique name of job (for example: name of output figure)
+            func - Plot function (module level function of calc or libraries)
+            *args, **kwargs - Arguments of plot function
+        """
+        if name in self.jobs:
+            raise ValueError(f'Plot job {name} is already in queue')
+        self.jobs[name] = (func, get_job_data(args), get_job_data(kwargs))
+
+
+    def run(self) -> pd.DataFrame:
+        """Render all jobs, queue is empty after run. If worker process was
+           killed, jobs of broken pool are rendered again, each job in own
+           pool (only the job that killed worker fails):
+
+            OUTPUT variables:
+            report - 'status' ('OK' or 'FAILED'), 'error' and 'time' (s) of
+                     jobs, index is name of job
+        """
+        jobs, self.jobs = self.jobs, {}
+        results = {}
+        if self.nprocs <= 1 or len(jobs) <= 1:
+            for name, job in jobs.items():
+                results[name] = render_job(name, *job)
+        else:
+            # -- All jobs in one pool:
+            broken = self.__run_pool(jobs, list(jobs), results)
+            # -- Jobs of broken pool, one job for each new pool:
+            for _ in range(self.nretry):
+                if not broken:
+                    break
+                lst4broken, broken = broken, []
+                for i in range(0, len(lst4broken), self.nprocs):
+                    broken += self.__run_pool(
+                        jobs, lst4broken[i:i + self.nprocs], results, lisolate = True)
+            for name in broken:
+                results[name] = {'name': name, 'status': 'FAILED',
+                                 'error': 'process pool was broken', 'time': 0.0}
+        report = pd.DataFrame([results.get(name) for name in jobs],
+                              columns = ['name', 'status', 'error', 'time']).set_index('name')
+        for name, res in report[report['status'] != 'OK'].iterrows():
+            print(f'Plot job {name}: FAILED\n{res["error"]}')
+        print(f'{(report["status"] == "OK").sum()} of {len(report)} figures were '
+              f'rendered in {report["time"].sum():.2f} s (sum of render times)')
+        return report
+
+
+    def __run_pool(
+            self, jobs:dict, names:list[str], results:dict,
+            lisolate: Optional[bool] = False,
+        ) -> list[str]:
+        """Render jobs (names) in one pool of nprocs workers or, if lisolate,
+           each job in own pool of one worker. Results are added to results,
+           names of jobs of broken pools are returned"""
+        if lisolate:
+            executors = [ProcessPoolExecutor(max_workers = 1, initializer = init_render_worker)
+                         for _ in names]
+        else:
+            executors = [ProcessPoolExecutor(max_workers = min(self.nprocs, len(names)),
+                                             initializer = init_render_worker)] * len(names)
+        futures = {executor.submit(render_job, name, *jobs.get(name)): name
+                   for executor, name in zip(executors, names)}
+        broken = []
+        wait(futures)
+        for future, name in futures.items():
+            try:
+                results[name] = future.result()
+            except BrokenProcessPool:
+                # -- Worker was killed (this job or other job of the same pool):
+                broken.append(name)
+            except Exception:
+                results[name] = {'name': name, 'status': 'FAILED',
+                                 'error': traceback.format_exc(), 'time': 0.0}
+        for executor in set(executors):
+            executor.shutdown()
+        return broken
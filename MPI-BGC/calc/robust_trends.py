@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    'theil_sen_mk_numpy',
+    'theil_sen_mk',
+    'get_robust_trend',
+]
+"""
+Robust trend estimators for grid data: Theil-Sen slope (median of pairwise
+slopes) and Mann-Kendall test of significance (with correction for ties).
+Computations are compiled by Numba and run in parallel over grid points. If
+Numba is not available, vectorized NumPy version is used:
+    a. theil_sen_mk_numpy --> Theil-Sen / Mann-Kendall for block of grid points
+                              (NumPy version);
+    b. theil_sen_mk --> Theil-Sen / Mann-Kendall for block of grid points
+                        (Numba version if Numba is available);
+    c. get_robust_trend --> Theil-Sen / Mann-Kendall for DataArray.
+
+Benchmark: tests/bench_trends.py
+
+Autors of project: Evgenii Churiulin, Ana Bastos
+
+Current Code Owner: MPI-BGC, Evgenii Churiulin
+phone:  +49  170 261-5104
+email:  evgenychur@bgc-jena.mpg.de
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-16 MPI-BGC
+           Initial release
+"""
+
+# =============================     Import modules     ====================
+import math
+import numpy as np
+import xarray as xr
+from typing import Optional
+from scipy.special import erfc
+try:
+    from numba import njit, prange
+    lnumba = True
+except ImportError:
+    lnumba = False
+
+# =============================   Personal functions   ====================
+
+def theil_sen_mk_numpy(values:np.array, years:np.array) -> np.array:
+    """ Theil-Sen slope and Mann-Kendall test for block of grid points (NaN
+    values are masked for each grid point):
+
+    **Input variables:**
+
+        values - Research data (grid points, time)
+        years - Time values (years)
+
+    **Output variables:**
+        res - Array (grid points, 5): slope (trend per year), intercept,
+              Mann-Kendall Z score, p-value (two-sided) and number of valid values
+    """
+    values = np.asarray(values, dtype = np.float64)
+    years  = np.asarray(years, dtype = np.float64)
+    ii, jj = np.triu_indices(len(years), k = 1)
+    # -- All pairs of timesteps (grid points, pairs):
+    dv = values[:, jj] - values[:, ii]
+    slopes = dv / (years[jj] - years[ii])
+    valid = ~np.isnan(values)
+    count = valid.sum(axis = 1).astype(np.float64)
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        slope = np.nanmedian(slopes, axis = 1)
+        intercept = (
+            np.nanmedian(values, axis = 1) -
+            slope * np.nanmedian(np.where(valid, years, np.nan), axis = 1))
+        # -- Mann-Kendall statistic and variance (with correction for ties):
+        stat = np.nansum(np.sign(dv), axis = 1)
+        nties = np.where(
+            valid, (values[:, :, None] == values[:, None, :]).sum(axis = 2), 1)
+        var_s = (count * (count - 1) * (2 * count + 5) -
+                 ((nties - 1) * (2 * nties + 5)).sum(axis = 1)) / 18.0
+        zscore = np.where(
+            stat > 0, (stat - 1) / np.sqrt(var_s),
+            np.where(stat < 0, (stat + 1) / np.sqrt(var_s), 0.0))
+        pvalue = erfc(np.abs(zscore) / math.sqrt(2.0))
+    zscore = np.where(var_s > 0, zscore, np.nan)
+    pvalue = np.where(var_s > 0, pvalue, np.nan)
+    return np.stack([slope, intercept, zscore, pvalue, count], axis = 1)
+
+
+if lnumba:
+    @njit(parallel = True, cache = True)
+    def theil_sen_mk(values:np.array, years:np.array) -> np.array:
+        """ Theil-Sen slope and Mann-Kendall test for block of grid points
+        (Numba version, parallel loop over grid points). Input and output
+        variables are the same as in **theil_sen_mk_numpy**."""
+        ncell, ntime = values.shape
+        res = np.full((ncell, 5), np.nan)
+        for c in prange(ncell):
+            # -- Valid values of grid point:
+            y = np.empty(ntime)
+            t = np.empty(ntime)
+            n = 0
+            for k in range(ntime):
+                if not np.isnan(values[c, k]):
+                    y[n] = values[c, k]
+                    t[n] = years[k]
+                    n += 1
+            res[c, 4] = n
+            if n < 2:
+                continue
+            # -- Theil-Sen slope and Mann-Kendall statistic:
+            slopes = np.empty(n * (n - 1) // 2)
+            npair = 0
+            stat = 0.0
+            for i in range(n - 1):
+                for j in range(i + 1, n):
+                    dv = y[j] - y[i]
+                    if t[j] != t[i]:
+                        slopes[npair] = dv / (t[j] - t[i])
+                        npair += 1
+                    if dv > 0:
+                        stat += 1.0
+                    elif dv < 0:
+                        stat -= 1.0
+            if npair == 0:
+                continue
+            slope = np.median(slopes[:npair])
+            res[c, 0] = slope
+            res[c, 1] = np.median(y[:n]) - slope * np.median(t[:n])
+            # -- Variance of statistic with correction for ties:
+            ys = np.sort(y[:n])
+            ties = 0.0
+            k = 0
+            while k < n:
+                m = k
+                while m + 1 < n and ys[m + 1] == ys[k]:
+                    m += 1
+                nt = m - k + 1
+                ties += nt * (nt - 1) * (2 * nt + 5)
+                k = m + 1
+            var_s = (n * (n - 1) * (2 * n + 5) - ties) / 18.0
+            if var_s <= 0:
+                continue
+            if stat > 0:
+                zscore = (stat - 1) / math.sqrt(var_s)
+            elif stat < 0:
+                zscore = (stat + 1) / math.sqrt(var_s)
+            else:
+                zscore = 0.0
+            res[c, 2] = zscore
+            res[c, 3] = math.erfc(abs(zscore) / math.sqrt(2.0))
+        return res
+else:
+    theil_sen_mk = theil_sen_mk_numpy
+
+
+def get_robust_trend(
+        data:xr.DataArray, nblock: Optional[int] = 2000) -> xr.Dataset:
+    """ Theil-Sen slope and Mann-Kendall test for each grid point. Data are
+    processed by blocks of grid points, Dask data are processed lazily by chunks.
+
+    **Input variables:**
+
+        data - Research data with time dimension
+        nblock - Number of grid points in one block (memory limit for NumPy
+                 version). Default is 2000
+
+    **Output variables:**
+        res - Dataset with 'trends' (Theil-Sen slope per year), 'intercept',
+              'zscore' (Mann-Kendall Z score), 'pvalue' and 'count' (number
+              of valid values)
+    """
+    years = data.time.dt.year.values.astype(np.float64)
+
+    def calc_blocks(values):
+        shape  = values.shape[:-1]
+        values = values.reshape(-1, values.shape[-1])
+        res = np.empty((values.shape[0], 5))
+        for i in range(0, values.shape[0], nblock):
+            res[i:i + nblock] = theil_sen_mk(
+                np.ascontiguousarray(values[i:i + nblock], dtype = np.float64), years)
+        return res.reshape(shape + (5,))
+
+    if data.chunks is not None:
+        data = data.chunk({'time': -1})
+    res = xr.apply_ufunc(
+        calc_blocks, data,
+        input_core_dims  = [['time']],
+        output_core_dims = [['stat']],
+        dask = 'parallelized',
+        output_dtypes = [np.float64],
+        dask_gufunc_kwargs = {'output_sizes': {'stat': 5}},
+    )
+    return xr.Dataset({
+        'trends'   : res.isel(stat = 0),
+        'intercept': res.isel(stat = 1),
+        'zscore'   : res.isel(stat = 2),
+        'pvalue'   : res.isel(stat = 3),
+        'count'    : res.isel(stat = 4),
+    })
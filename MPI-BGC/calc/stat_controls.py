@@ -19,20 +19,267 @@ Version    Date       Name
            Small changes related to code refactoring
     1.4    2023-11-10 Evgenii Churiulin, MPI-BGC
            Prepared for package and created common class Statistic
+    1.5    2026-10-16 MPI-BGC
+           Vectorized timtrend (closed form of linear trend), it supports
+           lazy (Dask) data
+    1.6    2026-10-16 MPI-BGC
+           Added timstats (mean, std and trend in one pass over time)
+    1.7    2026-10-16 MPI-BGC
+           Added NaN-aware trend engine (get_linear_trend): slope, standard
+           error, p-value and number of valid values. NaN values are masked
+           instead of zero values in timtrend and timstats
+    1.8    2026-10-16 MPI-BGC
+           Added timtrend_robust (Theil-Sen slope, Mann-Kendall test)
+    1.9    2026-10-16 MPI-BGC
+           Sufficient statistics moved to update_suff_stats and get_stats_grids.
+           Added timstats_store (incremental statistics, module stat_store)
+    1.10   2026-10-16 MPI-BGC
+           Added API for datasets stacked along 'dataset' dimension
+           (stack_datasets, timstats_stacked, get_difference_stacked)
+    1.11   2026-10-16 MPI-BGC
+           Added get_skill_matrix (all pairs of reference and research datasets:
+           difference, bias, RMSE and pattern correlation)
+    1.12   2026-10-17 MPI-BGC
+           get_skill_matrix: only mean, std and trends, without cache
+    1.13   2026-10-17 MPI-BGC
+           timstats_store: stamps of source files (lst4sources)
 """
 # =============================     Import modules     ====================
 import numpy as np
 import xarray as xr
 from typing import Optional
+from scipy.stats import t as t_dist
+from robust_trends import get_robust_trend
 import warnings
 warnings.filterwarnings("ignore")
+
+# -- Statistics for skill scores (get_skill_matrix):
+skill_stats = ('mean', 'std', 'trends')
+
 # =============================   Personal functions   ====================
 
+def calc_trend_stats(values:np.array, years:np.array) -> np.array:
+    """ Closed form of least-squares linear trend for each grid point. Invalid
+    (NaN) values are masked for each grid point separately.
+
+    **Input variables:**
+
+        values - Research data, time is the last axis
+        years - Time values (years)
+
+    **Output variables:**
+        res - Array with the last axis: slope (trend per year), standard error
+              of slope, p-value (two-sided t-test, slope = 0) and number of
+              valid values
+    """
+    values = np.asarray(values, dtype = np.float64)
+    valid  = ~np.isnan(values)
+    count  = valid.sum(axis = -1)
+    dt     = np.where(valid, years - years.mean(), 0.0)
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        # -- Deviations from the mean values of each grid point:
+        t_dev = np.where(valid, dt - (dt.sum(axis = -1) / count)[..., None], 0.0)
+        x_dev = np.where(
+            valid, values - (np.where(valid, values, 0.0).sum(axis = -1) / count)[..., None], 0.0)
+        s_tt  = (t_dev ** 2).sum(axis = -1)
+        slope = (t_dev * x_dev).sum(axis = -1) / s_tt
+        # -- Residual sum of squares, standard error and p-value:
+        sse    = np.maximum((x_dev ** 2).sum(axis = -1) - slope ** 2 * s_tt, 0.0)
+        stderr = np.sqrt(sse / (count - 2) / s_tt)
+        pvalue = 2.0 * t_dist.sf(np.abs(slope / stderr), count - 2)
+    slope  = np.where(count >= 2, slope, np.nan)
+    stderr = np.where(count >= 3, stderr, np.nan)
+    pvalue = np.where(count >= 3, pvalue, np.nan)
+    return np.stack([slope, stderr, pvalue, count.astype(np.float64)], axis = -1)
+
+
+def get_linear_trend(
+        data:xr.DataArray, nblock: Optional[int] = 50) -> xr.Dataset:
+    """ Linear trend (least-squares) for each grid point. Invalid (NaN) values
+    are masked for each grid point. Data are processed by blocks of the first
+    spatial dimension (for example: latitudes), Dask data are processed lazily
+    by chunks.
+
+    **Input variables:**
+
+        data - Research data with time dimension
+        nblock - Number of values of the first spatial dimension in one block
+                 (memory limit for not chunked data). Default is 50
+
+    **Output variables:**
+        res - Dataset with 'trends' (slope per year), 'stderr' (standard error
+              of slope), 'pvalue' and 'count' (number of valid values)
+    """
+    years = data.time.dt.year.values.astype(np.float64)
+
+    def get_stats(block):
+        return xr.apply_ufunc(
+            calc_trend_stats, block,
+            kwargs = {'years': years},
+            input_core_dims  = [['time']],
+            output_core_dims = [['stat']],
+            dask = 'parallelized',
+            output_dtypes = [np.float64],
+            dask_gufunc_kwargs = {'output_sizes': {'stat': 4}},
+        )
+
+    dims = [dim for dim in data.dims if dim != 'time']
+    # -- Blocks over latitudes (or the first spatial dimension):
+    dims = ['lat'] if 'lat' in dims else dims
+    if data.chunks is not None:
+        res = get_stats(data.chunk({'time': -1}))
+    elif len(dims) > 0 and data.sizes[dims[0]] > nblock:
+        res = xr.concat(
+            [get_stats(data.isel({dims[0]: slice(i, i + nblock)}))
+             for i in range(0, data.sizes[dims[0]], nblock)],
+            dim = dims[0],
+        )
+    else:
+        res = get_stats(data)
+    return xr.Dataset({
+        'trends': res.isel(stat = 0),
+        'stderr': res.isel(stat = 1),
+        'pvalue': res.isel(stat = 2),
+        'count' : res.isel(stat = 3),
+    })
+
+
+def update_suff_stats(
+        data:xr.DataArray,
+        stats: Optional[dict] = None,
+        t_ref: Optional[float] = None,
+        ntime_block: Optional[int] = 12,
+    ) -> dict:
+    """ Accumulate sufficient statistics of data over time (one pass, blocks
+    of timesteps) for mean, std and linear trend. NaN values are masked.
+
+    **Input variables:**
+
+        data - Research data with time dimension (new timesteps)
+        stats - Sufficient statistics of previous timesteps. Default is None
+        t_ref - Reference year (time shift for numerical stability). Default
+                is None (the first year of data)
+        ntime_block - Number of timesteps in one block. Default is 12
+
+    **Output variables:**
+        stats - Sufficient statistics: 't_ref', 'shift' (x0 - values of the
+                first timestep), 'count', 'sum_x' = sum(x - x0), 'sum_x2' =
+                sum((x - x0)**2), 'sum_t' = sum(t), 'sum_t2' = sum(t**2) and
+                'sum_tx' = sum(t * (x - x0)), where t = year - t_ref
+    """
+    data  = data.transpose('time', ...)
+    years = data.time.dt.year.values.astype(np.float64)
+    if stats is None:
+        shape = data.shape[1:]
+        stats = {
+            't_ref': float(years[0] if t_ref is None else t_ref),
+            'shift': np.nan_to_num(np.asarray(data.isel(time = 0).values, dtype = np.float64)),
+        }
+        for name in ('count', 'sum_x', 'sum_x2', 'sum_t', 'sum_t2', 'sum_tx'):
+            stats[name] = np.zeros(shape)
+    shift = stats['shift']
+    dt = years - stats['t_ref']
+    for j in range(0, len(years), ntime_block):
+        block = np.asarray(
+            data.isel(time = slice(j, j + ntime_block)).values, dtype = np.float64)
+        valid = ~np.isnan(block)
+        xdev  = np.where(valid, block - shift, 0.0)
+        tdev  = np.where(
+            valid, dt[j:j + ntime_block].reshape((-1,) + (1,) * shift.ndim), 0.0)
+        stats['count']  += valid.sum(axis = 0)
+        stats['sum_x']  += xdev.sum(axis = 0)
+        stats['sum_x2'] += (xdev ** 2).sum(axis = 0)
+        stats['sum_t']  += tdev.sum(axis = 0)
+        stats['sum_t2'] += (tdev ** 2).sum(axis = 0)
+        stats['sum_tx'] += (tdev * xdev).sum(axis = 0)
+    return stats
+
+
+def get_stats_grids(stats:dict, data:xr.DataArray) -> xr.Dataset:
+    """ Mean, std, trend (slope and intercept) and number of valid values
+    based on sufficient statistics (**update_suff_stats**).
+
+    **Input variables:**
+
+        stats - Sufficient statistics
+        data - Research data (source of dimensions and coordinates)
+
+    **Output variables:**
+        res - Dataset with 'mean', 'std', 'trends', 'intercept' and 'count'
+    """
+    data = data.transpose('time', ...)
+    count, sum_x, sum_t = stats['count'], stats['sum_x'], stats['sum_t']
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        mean = np.where(count > 0, stats['shift'] + sum_x / count, np.nan)
+        std  = np.where(
+            count > 0,
+            np.sqrt(np.maximum(stats['sum_x2'] / count - (sum_x / count) ** 2, 0.0)),
+            np.nan)
+        # -- Trend: NaN values are masked (the same as in timtrend)
+        slope = np.where(
+            count >= 2,
+            (stats['sum_tx'] - sum_t * sum_x / count) /
+            (stats['sum_t2'] - sum_t ** 2 / count),
+            np.nan)
+        intercept = mean - slope * (stats['t_ref'] + sum_t / count)
+    dims   = [dim for dim in data.dims if dim != 'time']
+    coords = {dim: data[dim].values for dim in dims if dim in data.coords}
+    return xr.Dataset(
+        {
+            'mean'     : (dims, mean),
+            'std'      : (dims, std),
+            'trends'   : (dims, slope),
+            'intercept': (dims, intercept),
+            'count'    : (dims, count.astype(np.int64)),
+        },
+        coords = coords,
+    )
+
+
+def stack_datasets(
+        lst4dts:list[str], data_list:list[xr.DataArray], var: Optional[str] = None,
+        **kwargs
+    ) -> xr.DataArray:
+    """ Align research datasets (the same grid, for example: results of
+    get_interpol) into one DataArray with 'dataset' dimension. Time axes of
+    datasets are joined (missing timesteps are NaN).
+
+    Memory: datasets in memory are copied into one new array (datasets x
+    joined time axis x grid), peak memory is about twice the sum of all
+    datasets (lazy Dask data stay lazy). For big datasets use **timstats**
+    (dataset by dataset) or **timstats_store**.
+
+    **Input variables:**
+
+        lst4dts - Names of datasets
+        data_list - Research datasets at the same order as **lst4dts**
+        var - Research parameter.
+        **kwargs - Other parameters ('fire_xarray' or 'fire_ratio' with True/False values)
+
+    **Output variables:**
+        stacked - Research data with dimensions ('dataset', 'time', ...)
+    """
+    data = [
+        data_list[i][var] if kwargs.get('fire_xarray') else data_list[i]
+        for i in range(len(lst4dts))
+    ]
+    stacked = xr.concat(
+        [item.drop_vars('area', errors = 'ignore') for item in data],
+        dim = xr.DataArray(list(lst4dts), dims = 'dataset', name = 'dataset'),
+        join = 'outer', coords = 'minimal', compat = 'override',
+    )
+    return stacked.transpose('dataset', 'time', ...)
+
+
+def unstack_datasets(stacked:xr.DataArray) -> tuple[list[str], list[xr.DataArray]]:
+    """ Get names of datasets and list of DataArrays from data with 'dataset'
+    dimension (for functions which use lists of datasets)"""
+    names = [str(name) for name in stacked.dataset.values]
+    return names, [stacked.sel(dataset = name) for name in names]
+
+
 class Statistic:
     """Statistical parameters for research datasets (grid points):"""
-    def __init__(self):
-        pass
-
     def timmean(
             self, lst4dts:list[str], lst4data:list[xr.DataArray], var:str, **kwargs
         ) -> list[xr.Dataset]:
@@ -94,43 +341,215 @@ class Statistic:
         """
 
         # Start computations:
-        # -- Get actual data for TIME TRENDS calculations
-        lst4data  = []  # list for data
-        lst4years = []  # list for years
-
+        # -- Linear trend (least-squares) in closed form for all grid points.
+        #    Invalid (NaN) values are masked for each grid point:
+        lst4trends = []
         for i in range(len(lst4dts)):
             if kwargs.get('fire_xarray'):
-                lst4data.append(data_list[i][var].values)
-            elif kwargs.get('fire_ratio'):
-                lst4data.append(data_list[i].values)
-            lst4years.append(data_list[i].time.dt.year.values )
-           # lst4years.append(data_list[i].year.values )
+                data = data_list[i][var]
+            else:
+                data = data_list[i]
+            lst4trends.append(get_linear_trend(data)['trends'])
+        return lst4trends
 
-        # -- Get actual time trends
-        lst4trends = []
+
+    def timtrend_robust(
+            self, lst4dts:list[str], data_list:list[xr.DataArray], var:str, **kwargs
+        ) -> list[xr.Dataset]:
+        """ Robust trend values for research datasets (for each grid point):
+        Theil-Sen slope and Mann-Kendall test of significance (module
+        robust_trends, compiled by Numba if it is available). NaN values are
+        masked for each grid point.
+
+        **Input variables:**
+
+            lst4dts - Names of datasets
+            data_list - Research datasets at the same order as **lst4dts**
+            var - Research parameter.
+            **kwargs - Other parameters ('fire_xarray' or 'fire_ratio' with True/False values)
+
+        **Output variables:**
+            lst4trends - Datasets with 'trends', 'intercept', 'zscore', 'pvalue'
+                         and 'count' values for the research datasets.
+        """
+        return [
+            get_robust_trend(data_list[i][var] if kwargs.get('fire_xarray') else data_list[i])
+            for i in range(len(lst4dts))
+        ]
+
+
+    def timstats(
+            self, lst4dts:list[str], data_list:list[xr.DataArray], var:str,
+            ntime_block: Optional[int] = 12, **kwargs
+        ) -> list[xr.Dataset]:
+        """ Mean, std, trend (slope and intercept) and number of valid values
+        for research datasets (for each grid point) in one pass over time.
+        Data are read by blocks of timesteps and only sufficient statistics
+        are accumulated: n, sum(x - x0), sum((x - x0)**2), sum(t), sum(t**2),
+        sum(t * (x - x0)) for valid values (x0 - values of the first timestep,
+        t - years minus mean year, shifts for numerical stability). Results are
+        the same as for **timmean**, **timstd** and **timtrend**.
+
+        **Input variables:**
+
+            lst4dts - Names of datasets
+            data_list - Research datasets at the same order as **lst4dts**
+            var - Research parameter.
+            ntime_block - Number of timesteps in one block. Default is 12
+            **kwargs - Other parameters ('fire_xarray' or 'fire_ratio' with True/False values)
+
+        **Output variables:**
+            lst4stat - Datasets with 'mean', 'std', 'trends', 'intercept' and
+                       'count' values for the research datasets.
+        """
+        lst4stat = []
         for i in range(len(lst4dts)):
+            if kwargs.get('fire_xarray'):
+                data = data_list[i][var]
+            else:
+                data = data_list[i]
+            stats = update_suff_stats(
+                data, t_ref = data.time.dt.year.values.mean(), ntime_block = ntime_block)
+            lst4stat.append(get_stats_grids(stats, data))
+        return lst4stat
 
-            # Datasets have NaN values for water objects. Such points shoud be
-            # changed to zero
-            lst4data[i][np.isnan(lst4data[i])] = 0
-
-            # Reshape to an array with as many rows as years and as
-            # many columns as there are pixels
-            val = lst4data[i].reshape(len(lst4years[i]), -1)
-            # Do a first-degree polyfit
-            regressions = np.polyfit(lst4years[i], val, 1)
-            # Get the coefficients back
-            trends = regressions[0,:].reshape(lst4data[i].shape[1],
-                                              lst4data[i].shape[2])
-
-            lon = data_list[i].lon.values
-            lat = data_list[i].lat.values
-
-            trends = xr.DataArray(trends,
-                                  coords = dict(lat =  lat, lon =  lon),
-                                  name = 'trends')
-            lst4trends.append(trends)
-        return lst4trends
+
+    def timstats_store(
+            self, lst4dts:list[str], data_list:list[xr.DataArray], var:str,
+            store_dir:str, lst4sources: Optional[list[dict]] = None,
+            ntime_block: Optional[int] = 12, **kwargs
+        ) -> list[xr.Dataset]:
+        """ The same as **timstats**, but sufficient statistics are saved in
+        the persistent store (module stat_store) and updated only with new
+        timesteps. If source data were revised, statistics are calculated
+        again for the whole period.
+
+        **Input variables:**
+
+            lst4dts - Names of datasets
+            data_list - Research datasets at the same order as **lst4dts**
+            var - Research parameter.
+            store_dir - Folder for store of statistics
+            lst4sources - Stamps of source files at the same order as **lst4dts**
+                          (get_file_stamp). Default is None (overlap window of
+                          processed timesteps is always compared)
+            ntime_block - Number of timesteps in one block. Default is 12
+            **kwargs - Other parameters ('fire_xarray' or 'fire_ratio' with True/False values)
+
+        **Output variables:**
+            lst4stat - Datasets with 'mean', 'std', 'trends', 'intercept' and
+                       'count' values for the research datasets.
+        """
+        # -- Module stat_store uses functions of this module:
+        from stat_store import update_stat_store
+        return [
+            update_stat_store(
+                store_dir, lst4dts[i], str(var),
+                data_list[i][var] if kwargs.get('fire_xarray') else data_list[i],
+                source = lst4sources[i] if lst4sources is not None else None,
+                ntime_block = ntime_block)
+            for i in range(len(lst4dts))
+        ]
+
+
+    def timstats_stacked(
+            self, stacked:xr.DataArray, ntime_block: Optional[int] = 12,
+        ) -> xr.Dataset:
+        """ Mean, std, trend (slope and intercept) and number of valid values
+        for all research datasets at once (one vectorized pass over time).
+
+        **Input variables:**
+
+            stacked - Research data with 'dataset' dimension (**stack_datasets**)
+            ntime_block - Number of timesteps in one block. Default is 12
+
+        **Output variables:**
+            stat - Dataset with 'mean', 'std', 'trends', 'intercept' and 'count'
+                   values, dimensions ('dataset', ...). Use stat['mean'].sel(
+                   dataset = name) to get values of one dataset.
+        """
+        stats = update_suff_stats(
+            stacked, t_ref = stacked.time.dt.year.values.mean(), ntime_block = ntime_block)
+        return get_stats_grids(stats, stacked).transpose('dataset', ...)
+
+
+    def get_difference_stacked(
+            self, stat:xr.Dataset, refer_ds:str, comp_ds:str,
+        ) -> xr.Dataset:
+        """ Get values for comparsion differences between datasets (stacked
+        version of **get_difference**):
+
+        **Input variables:**
+
+            stat - Data with 'dataset' dimension (for example: timstats_stacked)
+            refer_ds - Reference dataset (for example: MODIS)
+            comp_ds - Research dataset (for example: OCN)
+
+        **Output variables:**
+            res - Data with 'dataset' dimension: reference_ds, comparison_ds, diff
+        """
+        ref_data = stat.sel(dataset = refer_ds, drop = True)
+        comp_var = stat.sel(dataset = comp_ds, drop = True)
+        return xr.concat(
+            [ref_data, comp_var, ref_data - comp_var],
+            dim = xr.DataArray([refer_ds, comp_ds, 'diff'], dims = 'dataset', name = 'dataset'),
+        )
+
+
+    def get_skill_matrix(
+            self, stat:xr.Dataset, lst4refer:list[str],
+            lst4comp: Optional[list[str]] = None,
+        ) -> xr.Dataset:
+        """ Differences and skill scores of all research datasets against all
+        reference datasets (one broadcast pass for each statistic). Grid points
+        are weighted by cos(lat), NaN values are masked for each pair. Only
+        statistics 'mean', 'std' and 'trends' are used ('count', 'intercept'
+        and etc. are skipped).
+
+        **Input variables:**
+
+            stat - Data with 'dataset' dimension (for example: timstats_stacked).
+                   DataArray is used as one statistic (name of DataArray)
+            lst4refer - Reference datasets (for example: ['BA_MODIS', 'GFED4.1s'])
+            lst4comp - Research datasets. Default is None (all datasets)
+
+        **Output variables:**
+            skill - Dataset with variables for each statistic (for example: mean):
+                    'mean_diff' (refer - dataset, dimensions: refer, dataset,
+                    lat, lon), 'mean_bias', 'mean_rmse' and 'mean_corr'
+                    (pattern correlation), dimensions: refer, dataset.
+        """
+        lst4comp = list(stat.dataset.values) if lst4comp is None else list(lst4comp)
+        if isinstance(stat, xr.DataArray):
+            stat = stat.to_dataset(name = stat.name if stat.name is not None else 'data')
+        else:
+            stat = stat[[name for name in skill_stats if name in stat.data_vars]]
+        res = []
+        for name, data in stat.data_vars.items():
+            if 'lat' not in data.dims or 'lon' not in data.dims:
+                continue
+            # -- Broadcast: (refer, dataset, lat, lon)
+            ref  = data.sel(dataset = lst4refer).rename(dataset = 'refer')
+            comp = data.sel(dataset = lst4comp)
+            diff = (ref - comp).transpose('refer', 'dataset', ...)
+            valid = diff.notnull()
+            weights = np.cos(np.deg2rad(data.lat)).broadcast_like(diff).where(valid, 0.0)
+            wsum = weights.sum(['lat', 'lon'])
+            ref_v  = ref.where(valid)
+            comp_v = comp.where(valid)
+            ref_a  = ref_v  - (ref_v  * weights).sum(['lat', 'lon']) / wsum
+            comp_a = comp_v - (comp_v * weights).sum(['lat', 'lon']) / wsum
+            skill = xr.Dataset({
+                f'{name}_diff': diff,
+                f'{name}_bias': (diff * weights).sum(['lat', 'lon']) / wsum,
+                f'{name}_rmse': np.sqrt((diff ** 2 * weights).sum(['lat', 'lon']) / wsum),
+                f'{name}_corr': (
+                    (ref_a * comp_a * weights).sum(['lat', 'lon']) /
+                    np.sqrt((ref_a ** 2 * weights).sum(['lat', 'lon']) *
+                            (comp_a ** 2 * weights).sum(['lat', 'lon']))),
+            })
+            res.append(skill)
+        return xr.merge(res)
 
 
     def get_difference(
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    'get_time_digest',
+    'get_time_digests',
+    'get_store_path',
+    'read_store',
+    'write_store',
+    'update_stat_store',
+]
+"""
+Persistent store of sufficient statistics (mean, std and linear trend) for
+each dataset, research parameter and grid. Statistics are updated only with
+new timesteps (for example: new year of NRT release), mean, std and trend
+grids are calculated without reading of the previous timesteps. Revisions of
+source data are detected by stamp of source file (path, size and modification
+time): if stamp was changed, checksums of the last processed timesteps
+(overlap window) are compared. If source data were revised (time axis or values
+of overlap window were changed) statistics are calculated again for the whole
+period:
+    a. get_time_digest --> get checksum (md5) of data for one timestep;
+    b. get_time_digests --> get checksums of all timesteps (block by block);
+    c. get_store_path --> get path of the store file (NetCDF);
+    d. read_store --> read sufficient statistics from store;
+    e. write_store --> save sufficient statistics in store;
+    f. update_stat_store --> update statistics with new timesteps and get
+                             mean, std and trend grids.
+
+Autors of project: Evgenii Churiulin, Ana Bastos
+
+Current Code Owner: MPI-BGC, Evgenii Churiulin
+phone:  +49  170 261-5104
+email:  evgenychur@bgc-jena.mpg.de
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-16 MPI-BGC
+           Initial release
+    1.2    2026-10-17 MPI-BGC
+           Checksums of all processed timesteps are compared (revision of any
+           timestep is detected)
+    1.3    2026-10-17 MPI-BGC
+           Processed timesteps are not read again: stamp of source file is saved
+           in store, only overlap window is compared if stamp was changed
+"""
+
+# =============================     Import modules     ====================
+# -- Standard modules:
+import os
+import sys
+import hashlib
+import numpy as np
+import xarray as xr
+from typing import Optional
+# -- Personal modules:
+sys.path.append(os.path.join(os.getcwd(), '..'))
+from libraries import makefolder, get_grid_key, get_cache_key
+from stat_controls import update_suff_stats, get_stats_grids
+
+# -- Names of sufficient statistics (arrays):
+stats_names = ('shift', 'count', 'sum_x', 'sum_x2', 'sum_t', 'sum_t2', 'sum_tx')
+
+# =============================   Personal functions   ====================
+
+def get_time_digest(data:xr.DataArray, itime:int) -> str:
+    """Get checksum (md5) of data for one timestep"""
+    values = np.ascontiguousarray(data.isel(time = itime).values, dtype = np.float64)
+    return hashlib.md5(values.tobytes()).hexdigest()
+
+
+def get_time_digests(data:xr.DataArray, ntime_block: Optional[int] = 12) -> list[str]:
+    """Get checksums (md5) of data for all timesteps. Data are read block by
+       block (ntime_block timesteps), checksums are the same as get_time_digest"""
+    digests = []
+    for j in range(0, data.sizes['time'], ntime_block):
+        block = np.asarray(
+            data.isel(time = slice(j, j + ntime_block)).transpose('time', ...).values,
+            dtype = np.float64)
+        digests += [hashlib.md5(np.ascontiguousarray(values).tobytes()).hexdigest()
+                    for values in block]
+    return digests
+
+
+def get_store_path(store_dir:str, ds_name:str, var:str, data:xr.DataArray) -> str:
+    """Get path of the store file. Grid key is based on latitudes, longitudes
+       and sizes of other dimensions"""
+    other = '_'.join(
+        f'{dim}{data.sizes[dim]}' for dim in data.dims
+        if dim not in ('time', 'lat', 'lon'))
+    key = hashlib.md5(
+        f'{get_grid_key(data.lat.values, data.lon.values)}_{other}'.encode('utf-8')
+    ).hexdigest()
+    return os.path.join(store_dir, f'{ds_name}_{var}_{key}_stats.nc')
+
+
+def read_store(path:str) -> tuple[Optional[dict], Optional[dict]]:
+    """Read sufficient statistics from store:
+
+        Input variables:
+        path - Path of the store file
+
+        OUTPUT variables:
+        stats - Sufficient statistics (None if there is no store)
+        meta - Processed timesteps ('time'), their checksums ('digests') and
+               key of source stamp ('source')
+    """
+    if not os.path.exists(path):
+        return None, None
+    with xr.open_dataset(path) as store:
+        store = store.load()
+    stats = {name: store[name].values.astype(np.float64) for name in stats_names}
+    stats['t_ref'] = float(store.attrs['t_ref'])
+    meta = {
+        'time'   : store['time_done'].values,
+        'digests': store.attrs['digests'].split(','),
+        'source' : store.attrs.get('source', ''),
+    }
+    return stats, meta
+
+
+def write_store(
+        path:str, stats:dict, meta:dict, data:xr.DataArray,
+    ) -> None:
+    """Save sufficient statistics in store (NetCDF):
+
+        Input variables:
+        path - Path of the store file
+        stats - Sufficient statistics
+        meta - Processed timesteps ('time'), their checksums ('digests') and
+               key of source stamp ('source')
+        data - Research data (source of dimensions)
+    """
+    dims = [dim for dim in data.transpose('time', ...).dims if dim != 'time']
+    store = xr.Dataset(
+        {name: (dims, stats[name]) for name in stats_names},
+        coords = {'time_done': meta['time']},
+        attrs  = {
+            't_ref'  : stats['t_ref'],
+            'digests': ','.join(meta['digests']),
+            'source' : meta['source'],
+        },
+    )
+    makefolder(os.path.dirname(path))
+    store.to_netcdf(path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+def update_stat_store(
+        store_dir:str,
+        ds_name:str,
+        var:str,
+        data:xr.DataArray,
+        source: Optional[dict] = None,
+        noverlap: Optional[int] = 12,
+        ntime_block: Optional[int] = 12,
+    ) -> xr.Dataset:
+    """Update statistics with new timesteps and get mean, std and trend grids.
+       Processed timesteps are not read again if stamp of source was not
+       changed. Otherwise, checksums of the last processed timesteps (overlap
+       window) are compared. Statistics are calculated again for the whole
+       period if grid or time axis of processed timesteps were changed or
+       values of overlap window were revised:
+
+        Input variables:
+        store_dir - Folder for store of statistics
+        ds_name - Dataset name
+        var - Research parameter
+        data - Research data with time dimension (the whole period)
+        source - Stamp of source file (lib4dag.get_file_stamp: path, size and
+                 modification time). Default is None (overlap window is
+                 always compared)
+        noverlap - Number of processed timesteps in overlap window. Default is 12
+        ntime_block - Number of timesteps in one block. Default is 12
+
+        OUTPUT variables:
+        res - Dataset with 'mean', 'std', 'trends', 'intercept' and 'count'
+    """
+    data  = data.transpose('time', ...)
+    times = data.time.values
+    path  = get_store_path(store_dir, ds_name, var, data)
+    source_key = get_cache_key(**source) if source is not None else ''
+    stats, meta = read_store(path)
+    ndone = 0
+    if stats is not None:
+        ndone = len(meta['time'])
+        # -- Check that processed data were not revised:
+        reason = None
+        if stats['count'].shape != data.shape[1:]:
+            reason = 'grid was changed'
+        elif ndone > len(times) or not np.array_equal(times[:ndone], meta['time']):
+            reason = 'time axis was changed'
+        elif not source_key or source_key != meta['source']:
+            # -- Source was changed (for example: new NRT release), only overlap
+            #    window is read again:
+            jstart = max(ndone - noverlap, 0)
+            if (get_time_digests(data.isel(time = slice(jstart, ndone)), ntime_block) !=
+                    list(meta['digests'][jstart:ndone])):
+                reason = 'source data were revised'
+        if reason is not None:
+            print(f'{ds_name} {var}: {reason}, statistics are calculated again')
+            stats, meta, ndone = None, None, 0
+    if ndone < len(times):
+        new_data = data.isel(time = slice(ndone, None))
+        stats = update_suff_stats(new_data, stats, ntime_block = ntime_block)
+        meta = {
+            'time'   : times,
+            'digests': ((meta['digests'] if meta is not None else []) +
+                        get_time_digests(new_data, ntime_block)),
+            'source' : source_key,
+        }
+        write_store(path, stats, meta, data)
+        print(f'{ds_name} {var}: {len(times) - ndone} timesteps were added to statistics')
+    elif source_key != meta['source']:
+        # -- Stamp of source was changed without new timesteps:
+        write_store(path, stats, {**meta, 'source': source_key}, data)
+    return get_stats_grids(stats, data)
@@ -2,7 +2,11 @@
 import sys
 sys.path.append('../libraries')
 
+from .lib4cache import *
+from .lib4dag import *
 from .lib4postprocessing import *
+from .lib4regions import *
+from .lib4regrid import *
 from .lib4sys_support import *
 from .lib4upscaling_support import *
 from .lib4visualization import *
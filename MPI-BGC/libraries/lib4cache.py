@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    'get_cache_key',
+    'get_cache_path',
+    'read_cache',
+    'write_cache',
+    'evict_cache',
+    'clean_cache',
+    'set_grid_cache_dir',
+    'get_grid_key',
+    'get_grid_field',
+]
+"""
+Module has functions for the persistent on-disk cache of preprocessed datasets
+(results of lib4xarray.get_data). Cached data are saved in NetCDF format:
+    a. get_cache_key --> create cache key (hash) based on input parameters;
+    b. get_cache_path --> get path of the cached file;
+    c. read_cache --> read dataset from cache (None if there is no data);
+    d. write_cache --> save dataset in cache and apply size limit of cache;
+    e. evict_cache --> delete the least recently used files if cache is too big;
+    f. clean_cache --> delete all cached files (or files for one dataset and
+       research parameter);
+    g. set_grid_cache_dir --> set folder for fields of grids (cell area) on disk;
+    h. get_grid_key --> create key (hash) of grid based on lat/lon values;
+    i. get_grid_field --> get field of grid (cell area) from memory or disk cache.
+       Fields are computed only once for each grid and they are read-only.
+
+How to clean cache from command line:
+    python3 lib4cache.py                           -> delete all cached files
+    python3 lib4cache.py OCN_S2Prog_v4 burned_area -> delete cached files of one
+                                                      dataset and parameter
+
+Autors of project: Evgenii Churiulin, Ana Bastos
+
+Current Code Owner: MPI-BGC, Evgenii Churiulin
+phone:  +49  170 261-5104
+email:  evgenychur@bgc-jena.mpg.de
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-16 MPI-BGC
+           Initial release
+    1.2    2026-10-16 MPI-BGC
+           Added cache of grid fields (cell area)
+    1.3    2026-10-17 MPI-BGC
+           clean_cache: exact match of dataset name and research parameter
+           (files of datasets with the same prefix are not deleted)
+"""
+# =============================     Import modules     ==================
+import os
+import sys
+sys.path.append(os.path.join(os.getcwd(), '..'))
+import re
+import json
+import glob
+import hashlib
+import numpy as np
+import xarray as xr
+from typing import Optional
+# -- Personal modules:
+from settings import logical_settings, get_output_path
+from lib4sys_support import makefolder
+
+# -- Cache of grid fields in memory {(field name, grid key): array}:
+grid_cache = {}
+# -- Folder for grid fields on disk. Environment variable is used, because
+#    libraries are imported as a package and as single modules:
+grid_env = 'RECCAP2_GRID_CACHE'
+
+# =============================   Personal functions   ==================
+def get_cache_key(**kwargs) -> str:
+    """Create cache key (md5 hash) based on input parameters:
+
+        Input variables:
+        **kwargs - Parameters which define the cached data (source path, mtime,
+                   dataset name, research parameter, time settings and etc.)
+
+        OUTPUT variables:
+        key - Cache key
+    """
+    params = json.dumps(kwargs, sort_keys = True, default = str)
+    return hashlib.md5(params.encode('utf-8')).hexdigest()
+
+
+def get_cache_path(cache_dir:str, ds_name:str, var:str, key:str) -> str:
+    """Get path of the cached file (dataset name and parameter are in file name)"""
+    return os.path.join(cache_dir, f'{ds_name}_{var}_{key}.nc')
+
+
+def read_cache(
+        cache_dir:str, ds_name:str, var:str, key:str, chunks: Optional[dict] = None,
+    ) -> Optional[xr.Dataset]:
+    """Read dataset from cache:
+
+        Input variables:
+        cache_dir - Cache folder
+        ds_name - Dataset name
+        var - Research parameter
+        key - Cache key
+        chunks - Dask chunks (lazy mode). Default is None
+
+        OUTPUT variables:
+        nc - Cached dataset or None if there is no data in cache
+    """
+    path = get_cache_path(cache_dir, ds_name, var, key)
+    if not os.path.exists(path):
+        return None
+    # -- Update time of the last usage (for LRU eviction):
+    os.utime(path)
+    print(f'{ds_name} was read from cache: {path}')
+    return xr.open_dataset(path, chunks = chunks)
+
+
+def write_cache(
+        nc:xr.Dataset,
+        cache_dir:str,
+        ds_name:str,
+        var:str,
+        key:str,
+        max_size: Optional[float] = 50.0,
+    ) -> Optional[str]:
+    """Save dataset in cache and apply size limit of cache:
+
+        Input variables:
+        nc - Preprocessed dataset
+        cache_dir - Cache folder
+        ds_name - Dataset name
+        var - Research parameter
+        key - Cache key
+        max_size - Maximum size of cache in GB. Default is 50 GB
+
+        OUTPUT variables:
+        path - Path of the cached file or None if data were not saved
+    """
+    makefolder(cache_dir)
+    path = get_cache_path(cache_dir, ds_name, var, key)
+    tmp_path = path + '.tmp'
+    # -- Original encoding (dtype, scale_factor) is not actual after units convertation:
+    nc2save = nc.copy()
+    for item in nc2save.variables.values():
+        item.encoding = {}
+    try:
+        nc2save.to_netcdf(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as error:
+        # -- Problems with cache should not stop computations:
+        print(f'{ds_name} was not saved in cache: {error}')
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    evict_cache(cache_dir, max_size)
+    return path
+
+
+def evict_cache(cache_dir:str, max_size:float) -> list[str]:
+    """Delete the least recently used files if size of cache is bigger than max_size:
+
+        Input variables:
+        cache_dir - Cache folder
+        max_size - Maximum size of cache in GB
+
+        OUTPUT variables:
+        removed - Deleted files
+    """
+    # -- Local variables:
+    gb2bytes = 1024 ** 3
+    # -- Sort files by time of the last usage (the oldest is the first):
+    files = sorted(
+        glob.glob(os.path.join(cache_dir, '*.nc')), key = os.path.getmtime)
+    tot_size = sum(os.path.getsize(path) for path in files)
+    removed = []
+    for path in files:
+        if tot_size <= max_size * gb2bytes:
+            break
+        try:
+            tot_size -= os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            # -- File was already deleted by another worker (parallel get_data):
+            continue
+        removed.append(path)
+    return removed
+
+
+def clean_cache(
+        cache_dir:str, ds_name: Optional[str] = None, var: Optional[str] = None,
+    ) -> list[str]:
+    """Delete all cached files or only files for one dataset and research
+       parameter. Names of files are matched exactly (get_cache_path), because
+       names of datasets and parameters have '_' (for example: OCN_S2Prog and
+       OCN_S2Prog_v4):
+
+        Input variables:
+        cache_dir - Cache folder
+        ds_name - Dataset name. Default is None (all files)
+        var - Research parameter. It is needed if ds_name is set. Default is None
+
+        OUTPUT variables:
+        removed - Deleted files
+    """
+    if ds_name is None:
+        removed = glob.glob(os.path.join(cache_dir, '*.nc'))
+    elif var is None:
+        raise ValueError(f'Research parameter is not set for cleaning cache of {ds_name}')
+    else:
+        pattern = re.compile(rf'{re.escape(ds_name)}_{re.escape(var)}_[0-9a-f]{{32}}\.nc')
+        removed = [
+            path for path in glob.glob(os.path.join(cache_dir, f'{ds_name}_{var}_*.nc'))
+            if pattern.fullmatch(os.path.basename(path))
+        ]
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def set_grid_cache_dir(cache_dir: Optional[str] = None) -> None:
+    """Set folder for grid fields on disk (None - only memory cache is used)"""
+    if cache_dir is None:
+        os.environ.pop(grid_env, None)
+    else:
+        os.environ[grid_env] = cache_dir
+
+
+def get_grid_key(lat:np.array, lon:np.array) -> str:
+    """Create key (md5 hash) of grid based on latitude and longitude values"""
+    key = hashlib.md5()
+    for coord in (lat, lon):
+        coord = np.ascontiguousarray(np.squeeze(coord), dtype = np.float64)
+        key.update(str(coord.shape).encode('utf-8'))
+        key.update(coord.tobytes())
+    return key.hexdigest()
+
+
+def get_grid_field(name:str, lat:np.array, lon:np.array, func) -> np.array:
+    """Get field of grid (for example: cell area) from cache. Field is computed
+       only once for each grid and it is shared between all datasets:
+
+        Input variables:
+        name - Field name (for example: 'area')
+        lat, lon - Latitude and Longitude values from NetCDF file
+        func - Function for computation of field: func(lat, lon) -> np.array
+
+        OUTPUT variables:
+        field - Read-only field of grid
+    """
+    key = (name, get_grid_key(lat, lon))
+    if key in grid_cache:
+        return grid_cache[key]
+    # -- Try to get field from disk:
+    cache_dir = os.environ.get(grid_env)
+    path = (os.path.join(cache_dir, f'{name}_{key[1]}.npy')
+            if cache_dir is not None else None)
+    if path is not None and os.path.exists(path):
+        field = np.load(path)
+    else:
+        field = np.asarray(func(lat, lon))
+        if path is not None:
+            try:
+                makefolder(cache_dir)
+                with open(path + '.tmp', 'wb') as ncfile:
+                    np.save(ncfile, field)
+                os.replace(path + '.tmp', path)
+            except OSError as error:
+                print(f'{name} was not saved in cache: {error}')
+    # -- Shared array should not be changed by users:
+    field.setflags(write = False)
+    grid_cache[key] = field
+    return field
+
+
+if __name__ == '__main__':
+    # =============================   User settings   ==================
+    # -- Load basic logical settings:
+    lsets = logical_settings(lcluster = True)
+    # -- Dataset name and research parameter (all datasets if they are not set):
+    ds_name = sys.argv[1] if len(sys.argv) > 1 else None
+    var = sys.argv[2] if len(sys.argv) > 2 else None
+
+    # =============================    Main program   ==================
+    cache_dir = get_output_path(lsets).get('cache4get_data')
+    removed = clean_cache(cache_dir, ds_name, var)
+    print(f'{len(removed)} files were deleted from {cache_dir}')
+    # =============================    End of program   ================
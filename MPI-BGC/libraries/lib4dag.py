@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    'get_file_stamp',
+    'get_code_version',
+    'Pipeline',
+]
+"""
+Module has a dependency graph (DAG) of pipeline stages (make-style). Each stage
+has a key (md5 hash) based on its inputs: parameters (input files, sections of
+user settings and etc.), source code of functions and keys of the previous
+stages. Results of stages are saved on disk (NetCDF) with their keys. If inputs
+of stage were not changed, the stage is skipped and saved results are reused,
+otherwise the stage and all next stages run again:
+    a. get_file_stamp --> get stamp of input file (path, size, modification time);
+    b. get_code_version --> get version (hash) of source code of functions,
+                            classes or modules;
+    c. Pipeline --> dependency graph of stages:
+        - add_stage --> add new stage to graph;
+        - get_key --> get key of stage (hash of inputs and previous stages);
+        - is_done --> check that stage with actual key was done;
+        - run --> get results of stage (run only invalidated stages);
+        - get_report --> status of stages ('run', 'reused', 'skipped').
+
+Autors of project: Evgenii Churiulin, Ana Bastos
+
+Current Code Owner: MPI-BGC, Evgenii Churiulin
+phone:  +49  170 261-5104
+email:  evgenychur@bgc-jena.mpg.de
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-17 MPI-BGC
+           Initial release
+"""
+# =============================     Import modules     ==================
+import os
+import sys
+sys.path.append(os.path.join(os.getcwd(), '..'))
+import json
+import time
+import inspect
+import hashlib
+import pandas as pd
+import xarray as xr
+from typing import Optional, Callable
+# -- Personal modules:
+from lib4cache import get_cache_key
+from lib4sys_support import makefolder
+
+# =============================   Personal functions   ==================
+def get_file_stamp(path:str) -> dict:
+    """Get stamp of input file: path, size and modification time (file is not read)"""
+    if not os.path.exists(path):
+        return {'path': path, 'missing': True}
+    return {'path': path, 'size': os.path.getsize(path), 'mtime': os.path.getmtime(path)}
+
+
+def get_code_version(*objs) -> str:
+    """Get version (md5 hash) of source code of functions, classes or modules"""
+    code = []
+    for obj in objs:
+        try:
+            code.append(inspect.getsource(obj))
+        except (OSError, TypeError):
+            code.append(getattr(obj, '__qualname__', repr(obj)))
+    return hashlib.md5('\n'.join(code).encode('utf-8')).hexdigest()
+
+
+class Pipeline:
+    """Dependency graph (DAG) of pipeline stages. There are 3 types of stages:
+        1. Stages with saved results (lsave = True): result is xr.Dataset, it
+           is saved in NetCDF and reused while key of stage is not changed;
+        2. Stages with output files (outputs, for example: figures): stage is
+           skipped while key of stage is not changed and all files exist;
+        3. Other stages (lsave = False, no outputs): stage runs each time when
+           its result is needed (for example: reading of data with own cache).
+    Previous stages run only when their results are needed.
+    """
+    def __init__(self, cache_dir:str, lforce: Optional[bool] = False):
+        """Initialization:
+
+            Input variables:
+            cache_dir - Folder for results and keys of stages
+            lforce - Do you want to run all stages again? Default is False
+        """
+        self.cache_dir = makefolder(cache_dir)
+        self.lforce = lforce
+        self.stages = {}
+        self.keys = {}
+        self.results = {}
+        self.report = {}
+
+
+    def add_stage(
+            self,
+            name:str,
+            func:Callable,
+            deps: Optional[list[str]] = None,
+            params: Optional[dict] = None,
+            code: Optional[list] = None,
+            lsave: Optional[bool] = True,
+            outputs: Optional[list[str]] = None,
+        ) -> None:
+        """Add new stage to graph:
+
+            Input variables:
+            name - Name of stage (unique, it is used in file names)
+            func - Function of stage, arguments are results of deps (in order)
+            deps - Names of the previous stages. Default is None
+            params - Inputs of stage: input files (get_file_stamp), sections of
+                     user settings and etc. (JSON format). Default is None
+            code - Functions, classes or modules of stage (get_code_version).
+                   Default is None
+            lsave - Do you want to save results of stage (xr.Dataset)? Default
+                    is True (False if outputs are set)
+            outputs - Output files of stage (for example: figures). Default is None
+        """
+        self.stages[name] = {
+            'func'   : func,
+            'deps'   : deps if deps is not None else [],
+            'params' : params if params is not None else {},
+            'code'   : get_code_version(*code) if code else '',
+            'lsave'  : lsave and outputs is None,
+            'outputs': outputs,
+        }
+        self.keys.clear()
+
+
+    def get_key(self, name:str) -> str:
+        """Get key of stage (hash of parameters, code and keys of previous stages)"""
+        if name not in self.keys:
+            stage = self.stages.get(name)
+            self.keys[name] = get_cache_key(
+                name   = name,
+                params = stage.get('params'),
+                code   = stage.get('code'),
+                deps   = [self.get_key(dep) for dep in stage.get('deps')],
+            )
+        return self.keys.get(name)
+
+
+    def __get_paths(self, name:str) -> tuple[str, str]:
+        """Get paths of stage key (json) and stage results (NetCDF)"""
+        return (os.path.join(self.cache_dir, f'{name}.json'),
+                os.path.join(self.cache_dir, f'{name}_{self.get_key(name)}.nc'))
+
+
+    def is_done(self, name:str) -> bool:
+        """Check that stage with actual key was done (saved results or output
+           files exist)"""
+        stage = self.stages.get(name)
+        key_path, res_path = self.__get_paths(name)
+        if self.lforce or not os.path.exists(key_path):
+            return False
+        if not stage.get('lsave') and stage.get('outputs') is None:
+            return False
+        with open(key_path, 'r') as jfile:
+            if json.load(jfile).get('key') != self.get_key(name):
+                return False
+        if stage.get('lsave'):
+            return os.path.exists(res_path)
+        return all(os.path.exists(path) for path in stage.get('outputs'))
+
+
+    def run(self, name:str):
+        """Get results of stage. Stage runs only if it was invalidated (key of
+           stage was changed), previous stages run only if their results are
+           needed"""
+        if name in self.results:
+            return self.results.get(name)
+        stage = self.stages.get(name)
+        key_path, res_path = self.__get_paths(name)
+        tstart = time.perf_counter()
+        if self.is_done(name):
+            if stage.get('lsave'):
+                with xr.open_dataset(res_path) as ds:
+                    result = ds.load()
+                status = 'reused'
+            else:
+                result = None
+                status = 'skipped'
+        else:
+            result = stage.get('func')(*[self.run(dep) for dep in stage.get('deps')])
+            if stage.get('lsave'):
+                # -- Delete results of the previous version of stage:
+                if os.path.exists(key_path):
+                    with open(key_path, 'r') as jfile:
+                        old_path = json.load(jfile).get('path')
+                    if old_path and old_path != res_path and os.path.exists(old_path):
+                        os.remove(old_path)
+                result.to_netcdf(res_path + '.tmp')
+                os.replace(res_path + '.tmp', res_path)
+            if stage.get('lsave') or stage.get('outputs') is not None:
+                with open(key_path, 'w') as jfile:
+                    json.dump({'key': self.get_key(name),
+                               'path': res_path if stage.get('lsave') else None}, jfile)
+            status = 'run'
+        self.results[name] = result
+        self.report[name] = {'status': status, 'time': time.perf_counter() - tstart}
+        print(f'Stage {name}: {status}')
+        return result
+
+
+    def get_report(self) -> pd.DataFrame:
+        """Status ('run', 'reused', 'skipped') and wall time (seconds, with
+           previous stages) of stages"""
+        return pd.DataFrame.from_dict(self.report, orient = 'index').round(2)
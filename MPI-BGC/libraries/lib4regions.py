@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    'get_agg_settings',
+    'get_region_masks',
+    'aggregate_regions',
+    'read_region_labels',
+    'zonal_stats',
+    'get_annual_table',
+    'table2annual',
+]
+"""
+Module has functions for aggregation of research parameters over regions
+(for example: RECCAP2 domains). Regions are presented as a sparse matrix
+(region x grid cell), annual totals or mean values for all regions are
+calculated by one matrix product for each block of timesteps:
+    a. get_agg_settings --> settings for aggregation of research parameter
+                            (units coefficient, area weights, time method);
+    b. get_region_masks --> create sparse matrix (region x grid cell) based on
+                            2D masks of regions;
+    c. aggregate_regions --> annual values for all regions and datasets, tidy
+                             table (dataset, region, year, value);
+    d. read_region_labels --> read raster of region labels (int8, one label
+                              for each cell) on the grid of research data;
+    e. zonal_stats --> annual values for all regions and datasets based on
+                       raster of region labels (bincount, one pass over data);
+    f. get_annual_table --> annual sum or mean values of regions, tidy table;
+    g. table2annual --> get annual values of one region from tidy table (the
+                        same format as annual_mean).
+
+Autors of project: Evgenii Churiulin, Ana Bastos
+
+Current Code Owner: MPI-BGC, Evgenii Churiulin
+phone:  +49  170 261-5104
+email:  evgenychur@bgc-jena.mpg.de
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-16 MPI-BGC
+           Initial release
+    1.2    2026-10-16 MPI-BGC
+           Added zonal statistics based on raster of region labels
+    1.3    2026-10-17 MPI-BGC
+           read_region_labels: cells of research grid outside of raster (more
+           than half of raster step) are not labeled
+"""
+# =============================     Import modules     ==================
+import numpy as np
+import pandas as pd
+import xarray as xr
+import scipy.sparse as sp
+from typing import Optional
+
+# =============================   Personal functions   ==================
+def get_agg_settings(var:str) -> dict:
+    """Settings for aggregation of research parameter:
+
+        Input variables:
+        var - Research parameter (burned_area, gpp, npp and etc...)
+
+        OUTPUT variables:
+        settings - 'coef' (units: burned area, lai - no changes, cVeg - from
+                   kgC to PgC, other - from gC to PgC), 'larea' (values are
+                   multiplied by cell area), 'lnorm' (values are divided by
+                   area of region) and 'method' (annual 'sum' or 'mean')
+    """
+    # -- Define convertation coefficients:
+    orig    = 1.0   # use original units
+    kgc2pgc = 1e-12 # kgC --> PgC
+    gc2pgc  = 1e-15 #  gC --> PgC
+    set_rec_coef = {
+        'burned_area' : orig,
+        'lai' : orig,
+        'cVeg' : kgc2pgc,
+        'npp' : gc2pgc,
+        'gpp' : gc2pgc,
+        'nee' : gc2pgc,
+        'nbp' : gc2pgc ,
+        'fFire' : gc2pgc,
+    }
+    return {
+        'coef'  : set_rec_coef.get(var, orig),
+        'larea' : var != 'burned_area',
+        'lnorm' : var == 'lai',
+        'method': 'mean' if var in ('cVeg', 'lai') else 'sum',
+    }
+
+
+def get_region_masks(lst4masks:list[np.array]) -> sp.csr_matrix:
+    """Create sparse matrix (region x grid cell) based on 2D masks of regions
+       (1 or fraction of cell inside of region, 0 or NaN outside of region)"""
+    return sp.csr_matrix(
+        np.vstack([np.nan_to_num(np.asarray(mask, dtype = np.float64)).ravel()
+                   for mask in lst4masks])
+    )
+
+
+def aggregate_regions(
+        ds_data:list[xr.Dataset],
+        lst4dsnames:list[str],
+        var:str,
+        masks:sp.csr_matrix,
+        lst4regions:list[str],
+        ntime_block: Optional[int] = 120,
+    ) -> pd.DataFrame:
+    """ Annual values of research parameter for all regions and datasets.
+        Spatial aggregation is one matrix product (region x cell) @ (cell x
+        time) for each block of timesteps:
+
+        Input variables:
+        ds_data - Data from actual research datasets (time, lat, lon) with
+                  'area' field (results of get_interpol)
+        lst4dsnames - Names of datasets
+        var - Research parameter (burned_area, gpp, npp and etc...)
+        masks - Sparse matrix of regions (get_region_masks)
+        lst4regions - Names of regions at the same order as in masks
+        ntime_block - Number of timesteps in one block. Default is 120
+
+        OUTPUT variables:
+        table - Tidy table with columns: dataset, region, year, value
+    """
+    settings = get_agg_settings(var)
+    lst4tables = []
+    for ds_name, act_ds in zip(lst4dsnames, ds_data):
+        data = act_ds[var].transpose('time', 'lat', 'lon')
+        # -- Weights of grid cells (region x cell):
+        weights = masks
+        if settings.get('larea'):
+            area = np.nan_to_num(act_ds['area'].transpose('lat', 'lon').values.ravel())
+            weights = masks.multiply(area[None, :]).tocsr()
+        norm = (np.asarray(weights.sum(axis = 1)).ravel()
+                if settings.get('lnorm') else np.ones(len(lst4regions)))
+        # -- Spatial aggregation (NaN values are ignored):
+        ntime = data.sizes['time']
+        res = np.empty((ntime, len(lst4regions)))
+        for j in range(0, ntime, ntime_block):
+            block = data.isel(time = slice(j, j + ntime_block)).values
+            block = np.nan_to_num(block.reshape(block.shape[0], -1))
+            res[j:j + ntime_block] = (weights @ block.T).T * settings.get('coef') / norm
+        # -- Temporal aggregation:
+        lst4tables.append(get_annual_table(
+            res, data.time.dt.year.values, ds_name, lst4regions,
+            settings.get('method')))
+    return pd.concat(lst4tables, ignore_index = True)
+
+
+def read_region_labels(
+        path:str, target:xr.Dataset, var: Optional[str] = 'region',
+        nolabel: Optional[int] = -1,
+    ) -> tuple[np.array, list[str]]:
+    """Read raster of region labels (get_RECCAP2_mask_domains.py):
+
+        Input variables:
+        path - Path of NetCDF file with region labels
+        target - Dataset with grid of research data (labels are selected by
+                 the nearest cell, not further than half of raster step)
+        var - Name of labels in NetCDF file. Default is 'region'
+        nolabel - Label of cells outside of raster. Default is -1
+
+        OUTPUT variables:
+        labels - Labels of grid cells (lat, lon), int8. Cells outside of
+                 regions have negative labels
+        lst4regions - Names of regions (index of name is label of region)
+    """
+    with xr.open_dataset(path, mask_and_scale = False) as ds:
+        raster = ds[var].load()
+    # -- Raster is selected for each coordinate separately (different steps):
+    for coord in ('lat', 'lon'):
+        step = np.abs(np.diff(raster[coord].values)).min()
+        raster = raster.reindex(
+            {coord: target[coord]}, method = 'nearest',
+            tolerance = 0.5 * step, fill_value = nolabel)
+    labels = raster.transpose('lat', 'lon').values.astype(np.int8)
+    return labels, raster.attrs['flag_meanings'].split()
+
+
+def zonal_stats(
+        ds_data:list[xr.Dataset],
+        lst4dsnames:list[str],
+        var:str,
+        labels:np.array,
+        lst4regions:list[str],
+        ntime_block: Optional[int] = 120,
+    ) -> pd.DataFrame:
+    """ Annual values of research parameter for all regions and datasets based
+        on raster of region labels. Values of all regions are calculated by one
+        bincount for each block of timesteps (without masked copies of data):
+
+        Input variables:
+        ds_data - Data from actual research datasets (time, lat, lon) with
+                  'area' field (results of get_interpol)
+        lst4dsnames - Names of datasets
+        var - Research parameter (burned_area, gpp, npp and etc...)
+        labels - Labels of grid cells (lat, lon), results of read_region_labels
+        lst4regions - Names of regions (index of name is label of region)
+        ntime_block - Number of timesteps in one block. Default is 120
+
+        OUTPUT variables:
+        table - Tidy table with columns: dataset, region, year, value
+    """
+    settings = get_agg_settings(var)
+    nreg  = len(lst4regions)
+    # -- Cells inside of regions and their labels:
+    cells = np.flatnonzero((labels >= 0) & (labels < nreg))
+    ids   = labels.ravel()[cells].astype(np.int64)
+    lst4tables = []
+    for ds_name, act_ds in zip(lst4dsnames, ds_data):
+        data = act_ds[var].transpose('time', 'lat', 'lon')
+        # -- Weights of grid cells:
+        weights = np.ones(len(cells))
+        if settings.get('larea'):
+            weights = np.nan_to_num(
+                act_ds['area'].transpose('lat', 'lon').values.ravel()[cells])
+        norm = (np.bincount(ids, weights = weights, minlength = nreg)
+                if settings.get('lnorm') else np.ones(nreg))
+        # -- Spatial aggregation (NaN values are ignored):
+        ntime = data.sizes['time']
+        res = np.empty((ntime, nreg))
+        for j in range(0, ntime, ntime_block):
+            block = data.isel(time = slice(j, j + ntime_block)).values
+            block = np.nan_to_num(block.reshape(block.shape[0], -1)[:, cells]) * weights
+            # -- Label of each value in block: timestep * nreg + region label
+            bins = (np.arange(block.shape[0])[:, None] * nreg + ids[None, :]).ravel()
+            res[j:j + ntime_block] = np.bincount(
+                bins, weights = block.ravel(), minlength = block.shape[0] * nreg
+            ).reshape(-1, nreg) * settings.get('coef') / norm
+        # -- Temporal aggregation:
+        lst4tables.append(get_annual_table(
+            res, data.time.dt.year.values, ds_name, lst4regions,
+            settings.get('method')))
+    return pd.concat(lst4tables, ignore_index = True)
+
+
+def get_annual_table(
+        res:np.array, years:np.array, ds_name:str, lst4regions:list[str],
+        method: Optional[str] = 'sum',
+    ) -> pd.DataFrame:
+    """Annual sum or mean values of regions (res - values for each timestep
+       and region) in tidy table with columns: dataset, region, year, value"""
+    table = pd.DataFrame(res, columns = lst4regions)
+    table['year'] = years
+    table = (
+        table.groupby('year').agg(method)
+             .reset_index()
+             .melt(id_vars = 'year', var_name = 'region', value_name = 'value')
+    )
+    table['dataset'] = ds_name
+    return table[['dataset', 'region', 'year', 'value']]
+
+
+def table2annual(
+        table:pd.DataFrame, lst4dsnames:list[str], region:str,
+        name: Optional[str] = None,
+    ) -> list[xr.DataArray]:
+    """Get annual values of one region from tidy table (aggregate_regions) in
+       the same format as annual_mean (DataArrays with year coordinate)"""
+    annual_values = []
+    for ds_name in lst4dsnames:
+        act = table[(table['dataset'] == ds_name) & (table['region'] == region)]
+        annual_values.append(
+            xr.DataArray(
+                act['value'].values,
+                coords = {'year': act['year'].values},
+                dims = ['year'],
+                name = name,
+            )
+        )
+    return annual_values
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+__all__ = [
+    'get_cell_edges',
+    'get_overlap_1d',
+    'get_nearest_1d',
+    'get_regrid_weights',
+    'regrid',
+    'regrid_dataset',
+]
+"""
+Module has functions for regridding of data (lat/lon grids) with sparse
+weights. Weights are computed only once for each pair of grids (source ->
+target) and saved in memory and on disk (folder of grid fields, see
+lib4cache.set_grid_cache_dir). Each field is regridded for all timesteps by
+one sparse matrix multiplication:
+    a. get_cell_edges --> get cell edges based on cell centers;
+    b. get_overlap_1d --> get overlap of cells along one coordinate;
+    c. get_nearest_1d --> get nearest source cell along one coordinate;
+    d. get_regrid_weights --> get sparse weights (conservative or nearest)
+                              for pair of grids from cache;
+    e. regrid --> regridding of DataArray (area-weighted mean for intensive
+                  parameters, sum for extensive parameters);
+    f. regrid_dataset --> regridding of all Dataset variables to target grid.
+
+Source and target grids should use the same longitude convention (-180..180
+or 0..360).
+
+Autors of project: Evgenii Churiulin, Ana Bastos
+
+Current Code Owner: MPI-BGC, Evgenii Churiulin
+phone:  +49  170 261-5104
+email:  evgenychur@bgc-jena.mpg.de
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-16 MPI-BGC
+           Initial release
+    1.2    2026-10-17 MPI-BGC
+           Nearest source cell is selected as in xarray interp_like (ties)
+"""
+# =============================     Import modules     ==================
+import os
+import sys
+sys.path.append(os.path.join(os.getcwd(), '..'))
+import hashlib
+import numpy as np
+import xarray as xr
+import scipy.sparse as sp
+from typing import Optional
+# -- Personal modules:
+import lib4cache
+from lib4sys_support import makefolder
+
+# -- Cache of weights in memory {key: sparse matrix}:
+weights_cache = {}
+# -- Version of weights (part of cache key, weights on disk of previous
+#    versions are not used):
+weights_version = 2
+
+# =============================   Personal functions   ==================
+def get_cell_edges(coord:np.array, lat_lim: Optional[bool] = False) -> np.array:
+    """Get cell edges (n + 1 values) based on cell centers (n values). For
+       latitudes edges are limited by -90 and 90 degrees"""
+    coord = np.asarray(np.squeeze(coord), dtype = np.float64)
+    edges = np.empty(len(coord) + 1)
+    edges[1:-1] = 0.5 * (coord[:-1] + coord[1:])
+    edges[0]    = coord[0] - 0.5 * (coord[1] - coord[0])
+    edges[-1]   = coord[-1] + 0.5 * (coord[-1] - coord[-2])
+    if lat_lim:
+        edges = np.clip(edges, -90.0, 90.0)
+    return edges
+
+
+def get_overlap_1d(src_edges:np.array, dst_edges:np.array) -> np.array:
+    """Get overlap of target (rows) and source (columns) cells along one
+       coordinate. Order of coordinates (ascending or descending) is ignored"""
+    src_lo = np.minimum(src_edges[:-1], src_edges[1:])
+    src_hi = np.maximum(src_edges[:-1], src_edges[1:])
+    dst_lo = np.minimum(dst_edges[:-1], dst_edges[1:])
+    dst_hi = np.maximum(dst_edges[:-1], dst_edges[1:])
+    return np.maximum(
+        0.0,
+        np.minimum(dst_hi[:, None], src_hi[None, :]) -
+        np.maximum(dst_lo[:, None], src_lo[None, :])
+    )
+
+
+def get_nearest_1d(src:np.array, dst:np.array) -> np.array:
+    """Get matrix (target rows, source columns) with 1 for the nearest source
+       cell. Target cells outside of the source coordinates have no values.
+       Results are the same as xarray interp_like with method = 'nearest'
+       (scipy interp1d): if target point is in the middle between two source
+       cells, the cell with smaller coordinate is selected (for ascending
+       and descending coordinates)"""
+    src = np.asarray(np.squeeze(src), dtype = np.float64)
+    dst = np.asarray(np.squeeze(dst), dtype = np.float64)
+    weights = np.zeros((len(dst), len(src)))
+    inside  = (dst >= src.min()) & (dst <= src.max())
+    # -- Borders between sorted source cells, ties go to the left cell:
+    order   = np.argsort(src, kind = 'stable')
+    borders = 0.5 * (src[order][:-1] + src[order][1:])
+    nearest = order[np.searchsorted(borders, dst, side = 'left')]
+    weights[np.where(inside)[0], nearest[inside]] = 1.0
+    return weights
+
+
+def get_regrid_weights(
+        src_lat:np.array,
+        src_lon:np.array,
+        dst_lat:np.array,
+        dst_lon:np.array,
+        method: Optional[str] = 'conservative',
+    ) -> sp.csr_matrix:
+    """Get sparse weights for pair of grids (from memory or disk cache):
+
+        Input variables:
+        src_lat, src_lon - Latitude and Longitude values of source grid
+        dst_lat, dst_lon - Latitude and Longitude values of target grid
+        method - Regridding method:
+                 'conservative' -> area of overlap of source and target cells
+                                   in m2 (area-weighted regridding);
+                 'nearest'      -> 1 for the nearest source cell.
+                 Default is 'conservative'
+
+        OUTPUT variables:
+        weights - Sparse matrix (target cells, source cells). Cells are in
+                  order of flattened 2D (lat, lon) fields
+    """
+    # -- Local variables:
+    radius = 6.37122e6 # in meters
+    d2r = np.pi / 180.0
+
+    if method not in ('conservative', 'nearest'):
+        raise ValueError(f'Regridding method {method} is not supported')
+    key = hashlib.md5(
+        f'{method}_v{weights_version}_{lib4cache.get_grid_key(src_lat, src_lon)}_'
+        f'{lib4cache.get_grid_key(dst_lat, dst_lon)}'.encode('utf-8')
+    ).hexdigest()
+    if key in weights_cache:
+        return weights_cache[key]
+    # -- Try to get weights from disk:
+    cache_dir = os.environ.get(lib4cache.grid_env)
+    path = (os.path.join(cache_dir, f'weights_{method}_{key}.npz')
+            if cache_dir is not None else None)
+    if path is not None and os.path.exists(path):
+        weights = sp.load_npz(path).tocsr()
+    else:
+        if method == 'conservative':
+            # -- Latitude: overlap of sin(lat), longitude: overlap in radians
+            wlat = get_overlap_1d(
+                np.sin(get_cell_edges(src_lat, lat_lim = True) * d2r),
+                np.sin(get_cell_edges(dst_lat, lat_lim = True) * d2r))
+            wlon = get_overlap_1d(
+                get_cell_edges(src_lon) * d2r, get_cell_edges(dst_lon) * d2r)
+            wlat = wlat * radius ** 2
+        else:
+            wlat = get_nearest_1d(src_lat, dst_lat)
+            wlon = get_nearest_1d(src_lon, dst_lon)
+        # -- Weights for 2D fields (lat, lon):
+        weights = sp.kron(
+            sp.csr_matrix(wlat), sp.csr_matrix(wlon), format = 'csr')
+        if path is not None:
+            try:
+                makefolder(cache_dir)
+                with open(path + '.tmp', 'wb') as ncfile:
+                    sp.save_npz(ncfile, weights)
+                os.replace(path + '.tmp', path)
+            except OSError as error:
+                print(f'Regridding weights were not saved in cache: {error}')
+    weights_cache[key] = weights
+    return weights
+
+
+def regrid(
+        data:xr.DataArray,
+        dst_lat:np.array,
+        dst_lon:np.array,
+        method: Optional[str] = 'conservative',
+        lextensive: Optional[bool] = False,
+    ) -> xr.DataArray:
+    """Regridding of DataArray (all timesteps and other dimensions at once):
+
+        Input variables:
+        data - Research data with lat and lon dimensions
+        dst_lat, dst_lon - Latitude and Longitude values of target grid
+        method - Regridding method ('conservative' or 'nearest').
+                 Default is 'conservative'
+        lextensive - Is research parameter extensive (for example: burned area
+                     in each cell)? For conservative method extensive values are
+                     distributed by fraction of source cell in target cell (total
+                     values are kept), intensive values (for example: gpp in
+                     gC m-2 yr-1) are area-weighted mean values. Default is False
+
+        OUTPUT variables:
+        res - Data on target grid. Target cells without valid source data are NaN
+    """
+    # -- Local variables:
+    radius = 6.37122e6 # in meters
+    d2r = np.pi / 180.0
+
+    weights = get_regrid_weights(
+        data.lat.values, data.lon.values, dst_lat, dst_lon, method = method)
+    valid_weights = weights
+    if method == 'conservative' and lextensive:
+        # -- Fraction of source cell in target cell (area of source cell on sphere):
+        lat_edges = np.sin(get_cell_edges(data.lat.values, lat_lim = True) * d2r)
+        lon_edges = get_cell_edges(data.lon.values) * d2r
+        src_area = np.outer(
+            np.abs(np.diff(lat_edges)), np.abs(np.diff(lon_edges))).ravel()
+        weights = weights.multiply(1.0 / (src_area * radius ** 2)).tocsr()
+    nlat, nlon = len(np.squeeze(dst_lat)), len(np.squeeze(dst_lon))
+
+    def apply_weights(values):
+        # -- All timesteps and other dimensions in one matrix multiplication:
+        shape = values.shape[:-2]
+        values = values.reshape(-1, values.shape[-2] * values.shape[-1])
+        valid = ~np.isnan(values)
+        num = weights @ np.where(valid, values, 0.0).T
+        den = valid_weights @ valid.T.astype(np.float64)
+        if method == 'conservative' and lextensive:
+            res = np.where(den > 0, num, np.nan)
+        else:
+            res = np.where(den > 0, num / np.where(den > 0, den, 1.0), np.nan)
+        return res.T.reshape(shape + (nlat, nlon))
+
+    if data.chunks is not None:
+        # -- Lazy data: lat and lon should be in one chunk
+        data = data.chunk({'lat': -1, 'lon': -1})
+    res = xr.apply_ufunc(
+        apply_weights, data,
+        input_core_dims  = [['lat', 'lon']],
+        output_core_dims = [['lat', 'lon']],
+        exclude_dims = {'lat', 'lon'},
+        dask = 'parallelized',
+        output_dtypes = [np.float64],
+        dask_gufunc_kwargs = {'output_sizes': {'lat': nlat, 'lon': nlon}},
+    )
+    return (
+        res.assign_coords(lat = np.squeeze(dst_lat), lon = np.squeeze(dst_lon))
+           .transpose(*data.dims)
+           .rename(data.name)
+           .assign_attrs(data.attrs)
+    )
+
+
+def regrid_dataset(
+        dataset:xr.Dataset,
+        target:xr.Dataset,
+        method: Optional[str] = 'conservative',
+        lst4extensive: Optional[list[str]] = None,
+    ) -> xr.Dataset:
+    """Regridding of all Dataset variables with lat and lon dimensions to the
+       grid of target dataset:
+
+        Input variables:
+        dataset - Research dataset
+        target - Dataset with target grid (for example: OCN data)
+        method - Regridding method ('conservative' or 'nearest').
+                 Default is 'conservative'
+        lst4extensive - Names of extensive parameters (for example:
+                        ['burned_area']). Default is None (all parameters
+                        are intensive)
+
+        OUTPUT variables:
+        res - Dataset on target grid
+    """
+    lst4extensive = lst4extensive if lst4extensive is not None else []
+    res = {}
+    for name, item in dataset.data_vars.items():
+        if 'lat' in item.dims and 'lon' in item.dims:
+            res[name] = regrid(
+                item, target.lat.values, target.lon.values, method = method,
+                lextensive = name in lst4extensive)
+    return (
+        dataset.drop_vars(list(res.keys()))
+               .drop_dims([dim for dim in ('lat', 'lon') if dim in dataset.dims])
+               .assign_coords(lat = target.lat.values, lon = target.lon.values)
+               .assign(res)
+    )
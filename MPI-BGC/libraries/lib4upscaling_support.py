@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
 __all__ = [
     'get_upscaling_ba_veg_class',
+    'coarsen_block_sum',
+    'check_total',
     'get_upscaling_ba',
 ]
 """
 Module has functions for upscaling of burned area data:
     a. get_upscaling_ba_veg_class --> upscalling burned area PFT
-    b. get_upscaling_ba --> upscaling total burned area data
+    b. coarsen_block_sum --> sum data over lat/lon blocks (any factor, all timesteps)
+    c. check_total --> compare total values before and after upscaling
+    d. get_upscaling_ba --> upscaling total burned area data
 
 Autors of project: Evgenii Churiulin, Ana Bastos
 
@@ -25,6 +29,15 @@ Version    Date       Name
            Adapting module settings
     1.4    2023-05-05 Evgenii Churiulin, MPI-BGC
            Code refactoring
+    1.5    2026-10-16 MPI-BGC
+           get_upscaling_ba uses block sums over the whole array (coarsen_block_sum)
+           with upscaling factor, NaN policies and check of total values
+    1.6    2026-10-16 MPI-BGC
+           get_upscaling_ba_veg_class upscales all timesteps and vegetation classes
+           in one call (Dask-chunked data stay lazy), totals are vectorized reductions
+    1.7    2026-10-17 MPI-BGC
+           check_total: totals in float64, tolerance is scaled to precision of
+           data (float32 data of ESA-CCI)
 """
 
 # =============================== Import modules ======================
@@ -36,7 +49,6 @@ import numpy as np
 import xarray as xr
 import pandas as pd
 import matplotlib.pyplot as plt
-from datetime import datetime
 from typing import Optional
 # -- Persnol modules:
 from settings import get_path_in, get_output_path, logical_settings, config
@@ -47,10 +59,12 @@ import lib4xarray as xrlib
 # =============================== User functions ======================
 def get_upscaling_ba_veg_class(
     # Input variables:
-    dataset:xr.DataArray,            # Original ESA-CCI data (for example: BA_MODIS)
+    dataset:xr.Dataset,              # Original ESA-CCI data (for example: BA_MODIS)
     var:str,                         # Research parameter
     lreport: Optional[bool] = False, # Do you want to get more information about input and output data?
     lplot: Optional[bool] = False,   # Do you want to create data for control plot?
+    factor: Optional[int] = 2,       # Upscaling factor: (0.25 * 2) = 0.5
+    nan_policy: Optional[str] = 'skip', # NaN policy (see coarsen_block_sum)
     # OUTPUT variables:
     ) -> tuple [
         xr.DataArray,                # esa_ba -> Burned area over all PFT with 0.5 deg - resolution step
@@ -60,153 +74,144 @@ def get_upscaling_ba_veg_class(
         pd.DataFrame,                # y_baf05 -> total burned area fraction for grid (0.5 deg - resolution step)
     ]:
     """ Take 0.25 grid and upscale it to 0.5 grid - parameter
-    burned_area_by_vegetation class
+    burned_area_by_vegetation class. The (time, vegetation_class, lat, lon)
+    block is upscaled in one call, Dask-chunked data stay lazy.
     """
     # -- Local variables:
     ret_coef = 1e9
-    res_step = 2    # (0.25 * 2) = 0.5 
-    grid_step = 2
+    dims4tot = ['vegetation_class', 'lat', 'lon']
 
-    # -- Get time steps
-    time_steps = dataset.time
+    # -- Get time series (time, 0 - dates, 1 - values) from total values:
+    def ts2frame(ts:xr.DataArray) -> pd.DataFrame:
+        return pd.DataFrame({0: pd.to_datetime(ts.time.values), 1: ts.values})
 
-    tot_ba025  = [] # total burned area old
-    tot_ba05   = [] # total burned area new 
-    tot_baf025 = [] # total fraction (old)
-    tot_baf05  = [] # total fraction (new)
+    # -- Upscaling of all timesteps and vegetation classes:
+    esa_ba = (
+        coarsen_block_sum(dataset[var], factor = factor, nan_policy = nan_policy)
+            .transpose('time', 'vegetation_class', 'lat', 'lon')
+    )
+    # -- Get information about original and new data:
+    if lreport:
+        ba_old = dataset[var].isel(
+            lat = slice(0, esa_ba.sizes['lat'] * factor),
+            lon = slice(0, esa_ba.sizes['lon'] * factor),
+        )
+        check_total(ba_old, esa_ba, lreport = lreport)
 
-    data_xr = []
-    for tstep in range(len(time_steps)):
-        # -- Get burned area data
-        ba_old = dataset[var][tstep]
-        # -- Get information about original data
-        if lreport:
-            print('SUM before', ba_old.data.sum())
-        # -- Get coordinates
-        latitude  = int(len(ba_old.lat) / res_step)
-        longitude = int(len(ba_old.lon) / res_step)
-        veg_class = int(len(ba_old.vegetation_class))
-        # -- Create zero arrays for data
-        ba_new = np.zeros((veg_class, latitude, longitude))
-        lats   = np.zeros(latitude)
-        lons   = np.zeros(longitude)
-        pfts   = np.zeros(veg_class)
-        # -- Create time index
-        time = str(time_steps[tstep].data)
-        dt   = pd.to_datetime(datetime.strptime(time, "%Y-%m-%dT%H:%M:%S.000000000"))
-        # Create new grid:
-        for i in range(latitude):
-            lats[i] = (ba_old.lat[i * grid_step] + ba_old.lat[i * grid_step + 1]) / grid_step
-        
-        for j in range(longitude):
-            lons[j] = (ba_old.lon[j * grid_step] + ba_old.lon[j * grid_step + 1]) / grid_step
-
-        for z in range(veg_class):
-            pfts[z] = ba_old['vegetation_class'][z].data
-        
-        for z in range(veg_class):
-            for i in range(latitude):
-                for j in range(longitude):
-                    ba_new[z, i, j] = (ba_old.data[z, i * grid_step    , j * grid_step    ] +
-                                       ba_old.data[z, i * grid_step + 1, j * grid_step    ] +
-                                       ba_old.data[z, i * grid_step    , j * grid_step + 1] +
-                                       ba_old.data[z, i * grid_step + 1, j * grid_step + 1] )
-        # -- Create dataarray:
-        ba_array = xr.DataArray(ba_new, 
-                                coords = {'vegetation_class': pfts, 'lat': lats,'lon': lons},
-                                dims   = ["vegetation_class", "lat", "lon"])
-        # -- Add time step:
-        ba_array = ba_array.assign_coords(time = dt )
-        ba_array = ba_array.expand_dims(dim = "time")
-        # -- Add final data to the list over timesteps
-        data_xr.append(ba_array)
-
-        # -- Get info about new data:
-        if lreport:
-            print('SUM after', ba_new.sum(), '\n')
-
-        # -- Prepare data for linear plot:
-        if lplot:
-            ba_frac025 = (dataset['burned_area_in_vegetation_class'][tstep] * ret_coef) / dataset['area']
-            # -- Get new area for grid points
-            ba_frac05 = (ba_array * ret_coef) / xrlib.comp_area_lat_lon(ba_array.lat.values,
-                                                                        ba_array.lon.values)
-            # -- Get total values over time steps (burned area and burned fraction)
-            tot_ba025.append(
-                pd.concat([pd.Series(dt), pd.Series(ba_old.data.sum())], axis = 1))
-            tot_ba05.append(
-                pd.concat([pd.Series(dt), pd.Series(ba_new.sum())     ], axis = 1))
-            tot_baf025.append(
-                pd.concat([pd.Series(dt), pd.Series(ba_frac025.data.sum())], axis = 1))
-            tot_baf05.append(
-                pd.concat([pd.Series(dt), pd.Series(ba_frac05.data.sum())] , axis = 1))
-
-    # -- Get new dataset with 0.5 resolution grid (Burned area)
-    esa_ba = xr.concat(data_xr, dim = 'time')
     if lplot:
+        # -- Area of the new grid points:
+        area05 = xr.DataArray(
+            xrlib.comp_area_lat_lon(esa_ba.lat.values, esa_ba.lon.values),
+            coords = {'lat': esa_ba.lat.values, 'lon': esa_ba.lon.values},
+            dims = ['lat', 'lon'],
+        )
+        # -- Total values over time steps (burned area and burned fraction),
+        #    all of them are computed together in one pass:
+        totals = xr.Dataset({
+            'ba025' : dataset[var].sum(dim = dims4tot),
+            'baf025': ((dataset[var] * ret_coef) / dataset['area']).sum(dim = dims4tot),
+            'ba05'  : esa_ba.sum(dim = dims4tot),
+            'baf05' : ((esa_ba * ret_coef) / area05).sum(dim = dims4tot),
+        }).compute()
         # Create time series over timestep (burned area and burned fraction)
-        y_ba025  = pd.concat(tot_ba025 , axis = 0) # 0.25 grid step
-        y_baf025 = pd.concat(tot_baf025, axis = 0) # 0.25 grid step
-        y_ba05   = pd.concat(tot_ba05  , axis = 0) # 0.5 grid step
-        y_baf05  = pd.concat(tot_baf05 , axis = 0) # 0.5 grid step 
+        y_ba025  = ts2frame(totals['ba025'])  # 0.25 grid step
+        y_baf025 = ts2frame(totals['baf025']) # 0.25 grid step
+        y_ba05   = ts2frame(totals['ba05'])   # 0.5 grid step
+        y_baf05  = ts2frame(totals['baf05'])  # 0.5 grid step
         return esa_ba, y_ba025, y_baf025, y_ba05, y_baf05
     else:
         return esa_ba
 
-# 2.2: Function --> get_upscaling_ba
+# 2.2: Function --> coarsen_block_sum
+def coarsen_block_sum(
+        # Input variables:
+        data:xr.DataArray,                       # Data on the original grid (any dims + lat, lon)
+        factor: Optional[int] = 2,               # Number of cells in one block along lat and lon
+        nan_policy: Optional[str] = 'skip',      # NaN policy: 'skip', 'propagate' or 'min_count'
+        min_valid: Optional[int] = 1,            # Minimum number of valid cells in block ('min_count')
+        # OUTPUT variables:
+        ) -> xr.DataArray:                       # Block sums on the coarse grid
+    """ Sum data over non-overlapping (factor x factor) blocks of lat/lon cells.
+        All other dimensions (time, vegetation_class, ...) are processed in the
+        same call. New coordinates are the mean of the block coordinates.
+
+        NaN policies:
+        skip      - NaN cells are ignored, block is NaN only if all cells are NaN;
+        propagate - block is NaN if at least one cell is NaN;
+        min_count - block is NaN if it has less than min_valid valid cells.
+    """
+    if nan_policy not in ('skip', 'propagate', 'min_count'):
+        raise ValueError(f'Unknown nan_policy: {nan_policy}')
+    if not isinstance(factor, (int, np.integer)) or factor < 1:
+        raise ValueError('Upscaling factor has to be a positive integer')
+    # -- Incomplete blocks at the end of lat and lon are ignored (boundary = trim):
+    blocks = {'lat': factor, 'lon': factor}
+    if nan_policy == 'propagate':
+        return data.coarsen(blocks, boundary = 'trim').reduce(np.sum)
+    # -- Number of valid cells in each block:
+    nvalid = data.notnull().coarsen(blocks, boundary = 'trim').sum()
+    threshold = min_valid if nan_policy == 'min_count' else 1
+    return (
+        data.coarsen(blocks, boundary = 'trim')
+            .reduce(np.nansum)
+            .where(nvalid >= threshold)
+    )
+
+
+# 2.3: Function --> check_total
+def check_total(
+        # Input variables:
+        ba_old:xr.DataArray,                     # Data on the original grid
+        ba_new:xr.DataArray,                     # Data on the coarse grid
+        lreport: Optional[bool] = False,         # Do you want to print total values over timesteps?
+        rtol: Optional[float] = 1e-5,            # Relative tolerance for total values
+        # OUTPUT variables:
+        ) -> bool:                               # True if totals are the same
+    """ Compare total values (over lat and lon) before and after upscaling.
+        Totals are in float64, rtol is not smaller than rounding error of
+        block sums (eps of data type * number of original cells in one block)
+    """
+    tot_old = ba_old.sum(dim = ['lat', 'lon'], dtype = np.float64).values
+    tot_new = ba_new.sum(dim = ['lat', 'lon'], dtype = np.float64).values
+    dtype = np.result_type(ba_old.dtype, ba_new.dtype)
+    if np.issubdtype(dtype, np.floating):
+        nblock = ((ba_old.sizes['lat'] * ba_old.sizes['lon']) /
+                  (ba_new.sizes['lat'] * ba_new.sizes['lon']))
+        rtol = max(rtol, np.finfo(dtype).eps * nblock)
+    if lreport:
+        print('SUM before', tot_old.sum())
+        print('SUM after' , tot_new.sum(), '\n')
+    return bool(np.allclose(tot_old, tot_new, rtol = rtol, atol = 0.0))
+
+
+# 2.4: Function --> get_upscaling_ba
 def get_upscaling_ba(
         # Input variables:
-        dataset:xr.DataArray,                    # Original ESA-CCI data (for example: BA_MODIS).
+        dataset:xr.Dataset,                      # Original ESA-CCI data (for example: BA_MODIS).
         var:str,                                 # Research parameter
         lreport: Optional[bool] = False,         # Do you want to print total values over timesteps?
+        factor: Optional[int] = 2,               # Upscaling factor: (0.25 * 2) = 0.5
+        nan_policy: Optional[str] = 'skip',      # NaN policy (see coarsen_block_sum)
+        min_valid: Optional[int] = 1,            # Minimum number of valid cells ('min_count')
+        lcheck: Optional[bool] = True,           # Do you want to check total values?
         # OUTPUT variables:
         ) -> xr.DataArray:                       # Burned area over all PFT with 0.5 deg - resolution step.
-
-    # -- Local variables:
-    res_step = 2    # (0.25 * 2) = 0.5 
-    grid_step = 2
-    # -- Get time steps:
-    time_steps = dataset.time
-    data_xr = []
-    for tstep in range(len(time_steps)):
-        # -- Get burned area data
-        ba_old = dataset[var][tstep]
-        latitude  = int(len(ba_old.lat) / res_step)
-        longitude = int(len(ba_old.lon) / res_step)
-        # -- Get info about initial data
-        if lreport == True:
-            print('SUM before'  , ba_old.data.sum())
-        # -- Create zero arrays for data
-        ba_new = np.zeros((latitude, longitude))
-        lats   = np.zeros(latitude)
-        lons   = np.zeros(longitude)
-        # Create time index
-        time = str(time_steps[tstep].data)
-        dt   = pd.to_datetime(datetime.strptime(time, "%Y-%m-%dT%H:%M:%S.000000000"))
-        # Create new grid  (latitude, longitude, burned area)
-        for i in range(latitude):
-            lats[i] = (ba_old.lat[i * grid_step] + ba_old.lat[i * grid_step + 1]) / grid_step
-        for j in range(longitude):
-            lons[j] = (ba_old.lon[j * grid_step] + ba_old.lon[j * grid_step + 1]) / grid_step
-        for i in range(latitude):
-            for j in range(longitude):
-                ba_new[i, j] =(ba_old.data[i * grid_step    , j * grid_step    ] +
-                               ba_old.data[i * grid_step + 1, j * grid_step    ] +
-                               ba_old.data[i * grid_step    , j * grid_step + 1] +
-                               ba_old.data[i * grid_step + 1, j * grid_step + 1] )
-        # -- Get info about new data:
-        if lreport == True:
-            print('SUM after', ba_new.sum(), '\n')
-        # -- Create new dataarray:
-        ba_array = xr.DataArray(ba_new, coords = {'lat': lats,'lon': lons}, 
-                                        dims   = ["lat", "lon"])
-
-        ba_array = ba_array.assign_coords(time = dt )
-        ba_array = ba_array.expand_dims(dim = "time")
-        data_xr.append(ba_array)
-    # -- Get new dataset with 0.5 resolution grid
-    esa_ba = xr.concat(data_xr, dim = 'time')
-    return esa_ba
+    """ Take 0.25 grid and upscale it to (0.25 * factor) grid - total burned
+        area. All timesteps are processed in one call.
+    """
+    ba_new = coarsen_block_sum(
+        dataset[var], factor = factor, nan_policy = nan_policy, min_valid = min_valid)
+    # -- Original cells which were used for upscaling (incomplete blocks are ignored):
+    ba_old = dataset[var].isel(
+        lat = slice(0, ba_new.sizes['lat'] * factor),
+        lon = slice(0, ba_new.sizes['lon'] * factor),
+    )
+    # -- Total values should be the same (NaN cells are ignored only by 'skip'):
+    if lcheck or lreport:
+        lsame = check_total(ba_old, ba_new, lreport = lreport)
+        if lcheck and nan_policy == 'skip' and not lsame:
+            raise ValueError(f'Total values of {var} were changed after upscaling')
+    return ba_new
 
 if __name__ == '__main__':
     # ============================= Users settings =======================
@@ -10,7 +10,14 @@ __all__ = [
     'hist_settings',
     'plot_diff_hist',
     'TaylorDiagram',
+    'get_domain_settings',
+    'get_basemap',
+    'get_projected_grid',
+    'get_land_mask',
+    'export_land_mask',
     'select_domain',
+    'is_regular_grid',
+    'draw_grid',
     'vis_stations',
     'netcdf_grid',
     'netcdf_grid_series',
@@ -43,13 +50,24 @@ The program contains functions:
     1. Taylor diagram     ---> plot Taylor diagram  
 
     # Section for NetCDF grid visualizatuion (new)
-    1 select_domain       ---> domain settings for netcdf_grid and grid_series functions
-    2. vis_stations       ---> create global map with stations location;
-    3. netcdf_grid        ---> create map for selected research domain and parameter
+    1. get_domain_settings ---> projection settings of research domain;
+    2. get_basemap        ---> get Basemap of domain from cache (memory or pickle
+                               on disk), coastlines are read only once. Copy
+                               of Basemap is linked with axes;
+    3. get_projected_grid ---> get mesh grid and projected coordinates from cache;
+    4. get_land_mask      ---> get boolean land mask of grid from cache (instead of
+                               maskoceans for each plot);
+    5. export_land_mask   ---> land mask as DataArray (NetCDF) for statistics;
+    6. select_domain      ---> domain settings for netcdf_grid and grid_series functions
+    7. is_regular_grid    ---> check that projected grid is regular (image blit);
+    8. draw_grid          ---> draw 2D field on map (renderers: auto, image,
+                               pcolormesh, pcolor);
+    9. vis_stations       ---> create global map with stations location;
+   10. netcdf_grid        ---> create map for selected research domain and parameter
                                based on corresponding datasets with statistical data
                                (MEAN, STD, TIME TREND);
-    4. netcdf_grid_series ---> create maps for selected research domain and parameters
-    5. create_fast_xarray_plot --> create simple domain map based on xarray options
+   11. netcdf_grid_series ---> create maps for selected research domain and parameters
+   12. create_fast_xarray_plot --> create simple domain map based on xarray options
                                    for visualization;
 
     # Have to be corrected and modernized
@@ -88,10 +106,26 @@ Version    Date       Name
            new functions for domain settings and parameters settings were created
     1.6    2023.05.05 Evgenii Churiulin, MPI-BGC
            Code refactoring
+    1.7    2026-10-17 MPI-BGC
+           Cache of Basemap instances (coastlines are read once for each domain
+           and projection) and projected coordinates of grids for netcdf_grid
+           and netcdf_grid_series
+    1.8    2026-10-17 MPI-BGC
+           Land mask is computed once for each grid (lib4cache) and applied as
+           array mask in netcdf_grid and netcdf_grid_series (get_land_mask),
+           mask can be exported for statistics (export_land_mask)
+    1.9    2026-10-17 MPI-BGC
+           Fast raster path for netcdf_grid and netcdf_grid_series: regular
+           grids are drawn as image, other grids by pcolormesh (draw_grid)
+    1.10   2026-10-17 MPI-BGC
+           get_basemap returns copy of cached Basemap for axes with new state of
+           axes (cached Basemap doesn't keep references to axes and figures)
 """
 # =============================== Import modules ===================
 import os
 import sys
+import copy
+import pickle
 import numpy as np
 import pandas as pd
 import xarray as xr
@@ -111,6 +145,8 @@ warnings.filterwarnings("ignore")
 # Import personal module
 sys.path.append(os.path.join(os.getcwd(), '..'))
 from settings import config, get_settings4stations
+import lib4cache
+from lib4sys_support import makefolder
 
 # =============================   User settings   ========================
 # -- Additional parameters for X and Y axis for plots
@@ -121,6 +157,15 @@ years = mdates.YearLocator() #every year
 days = mdates.DayLocator(15)
 yearFmt = mdates.DateFormatter('%Y')
 
+# -- Cache of Basemap instances {key of projection: Basemap without axes}:
+basemap_cache = {}
+# -- State of Basemap for actual axes {attribute: initial value}, it is new for
+#    each copy of cached Basemap (get_basemap):
+basemap_axes_state = {
+    '_initialized_axes': set,
+    '_mapboundarydrawn': lambda: False,
+}
+
 # =============================   Personal functions   ===================
 
 # Section 1: Simple plots:
@@ -688,70 +733,257 @@ class TaylorDiagram(object):
 # Section 4: NetCDF plots and maps
 # ======================================================================
 
-# 1. select_domain --> Settings for research domain used in netcdf_grid and netcdf_grid_series
-def select_domain(
+# 1. get_domain_settings --> Projection settings of research domain
+def get_domain_settings(
         # Input variables:
         domain:str,                       # Research domain
-        ax:plt.Axes,                      # Axis-object of matplotlib-subplots
         lons:np.array,                    # 1D array with longitudes
         lats:np.array,                    # 1D array with latitudes
         # OUTPUT variables:
         ) -> tuple[
-            plt.Axes,                     # Final plot (Basemap object)
+            dict,                         # Basemap settings (projection, corners, resolution)
+            list[float],                  # Values for parallels
             list[float],                  # Values for meridians
-            list[float],                  # Values for parallels.
     ]:
     # -- Select domain:
     if   domain == 'Global':
-        m = Basemap(projection = 'moll', resolution  = 'l', lon_0 = 0.0, ax = ax)
+        bm_sets = {'projection': 'moll', 'resolution': 'l', 'lon_0': 0.0}
         # parameters for parallels and meridians
         params_paral = [ -90.0,  90.0, 30.0]
-        params_merid = [-180.0, 180.0, 60.0] 
+        params_merid = [-180.0, 180.0, 60.0]
 
     elif domain == 'Europe':
-        m = Basemap(projection = 'merc', resolution  = 'l'   ,
-                    llcrnrlon  =  -11.0, llcrnrlat   =   34.0,
-                    urcrnrlon  =   45.0, urcrnrlat   =   72.0,
-                    lat_1      =   10.0, lat_2       =   45.0,
-                    lon_0      =   20.0, area_thresh = 1000.0,
-                    ax         = ax                          )
+        bm_sets = {'projection': 'merc', 'resolution': 'l',
+                   'llcrnrlon' :  -11.0, 'llcrnrlat' :  34.0,
+                   'urcrnrlon' :   45.0, 'urcrnrlat' :  72.0,
+                   'lat_1'     :   10.0, 'lat_2'     :  45.0,
+                   'lon_0'     :   20.0, 'area_thresh': 1000.0}
         # parameters for parallels and meridians
         params_paral = [ 40.0,  80.1, 10.0]
-        params_merid = [  0.0,  50.0, 20.0] 
+        params_merid = [  0.0,  50.0, 20.0]
 
     elif domain == 'Tropics':
-        m = Basemap(projection = 'cyl' , resolution  = 'c'   ,
-                    llcrnrlon  = -180.0, llcrnrlat   = -23.0 ,
-                    urcrnrlon  =  180.0, urcrnrlat   =  23.0 ,
-                    ax         = ax                          )
+        bm_sets = {'projection': 'cyl' , 'resolution': 'c',
+                   'llcrnrlon' : -180.0, 'llcrnrlat' : -23.0,
+                   'urcrnrlon' :  180.0, 'urcrnrlat' :  23.0}
         # parameters for parallels and meridians
         params_paral = [ -15.0,  15.1, 15.0]
         params_merid = [-180.0, 180.0, 90.0]
 
     elif domain == 'NH':
-        m = Basemap(projection = 'cyl' , resolution  = 'c'   ,
-                    llcrnrlon  = -180.0, llcrnrlat   = 30.0  ,
-                    urcrnrlon  =  180.0, urcrnrlat   = 80.0  ,
-                    ax         = ax                          )
+        bm_sets = {'projection': 'cyl' , 'resolution': 'c',
+                   'llcrnrlon' : -180.0, 'llcrnrlat' : 30.0,
+                   'urcrnrlon' :  180.0, 'urcrnrlat' : 80.0}
         # parameters for parallels and meridians
         params_paral = [  35.0,  80.1, 15.0]
         params_merid = [-180.0, 180.0, 90.0]
 
     else:
-        m = Basemap(projection = 'merc'      , resolution  = 'l'            ,
-                    llcrnrlon  = np.min(lons), llcrnrlat   = np.nanmin(lats),
-                    urcrnrlon  = np.max(lons), urcrnrlat   = np.max(lats)   ,
-                    lat_1      = 40.0        , lat_2       =   45.0         ,
-                    lon_0      = 20.0        , area_thresh = 1000.0         ,
-                    ax         = ax                                         )
+        bm_sets = {'projection': 'merc', 'resolution': 'l',
+                   'llcrnrlon' : float(np.min(lons)), 'llcrnrlat'  : float(np.nanmin(lats)),
+                   'urcrnrlon' : float(np.max(lons)), 'urcrnrlat'  : float(np.max(lats)),
+                   'lat_1'     : 40.0               , 'lat_2'      : 45.0,
+                   'lon_0'     : 20.0               , 'area_thresh': 1000.0}
         # parameters for parallels and meridians
         params_paral = [ -90.0,  90.1,  30.0]
         params_merid = [-120.0, 120.1, 120.0]
 
+    return bm_sets, params_paral, params_merid
+# ----------------------------------------------------------------------
+
+# 2. get_basemap --> Get Basemap from memory or disk cache. Coastlines and country
+#                    boundaries are read only once for each projection. Folder of
+#                    disk cache is the same as for grid fields (lib4cache). If axes
+#                    are set, shallow copy of cached Basemap is linked with them:
+#                    geometry is shared, state of axes is new (basemap_axes_state).
+def get_basemap(
+        # Input variables:
+        bm_sets:dict,                     # Basemap settings (get_domain_settings)
+        ax:Optional[plt.Axes] = None,     # Axes for copy of Basemap. Default is None
+        # OUTPUT variables:
+    ) -> Basemap:                         # Copy of Basemap for ax or cached Basemap
+                                          # without axes (shared, don't change it)
+    key = lib4cache.get_cache_key(**bm_sets)
+    m = basemap_cache.get(key)
+    # -- Try to get Basemap from disk (pickle):
+    cache_dir = os.environ.get(lib4cache.grid_env)
+    path = (os.path.join(cache_dir, f'basemap_{key}.pkl')
+            if cache_dir is not None else None)
+    if m is None and path is not None and os.path.exists(path):
+        try:
+            with open(path, 'rb') as pfile:
+                m = pickle.load(pfile)
+        except Exception as error:
+            # -- Pickle of other Basemap version, Basemap is created again:
+            print(f'Basemap was not read from cache: {error}')
+    if m is None:
+        m = Basemap(**bm_sets)
+        if path is not None:
+            try:
+                makefolder(cache_dir)
+                with open(path + '.tmp', 'wb') as pfile:
+                    pickle.dump(m, pfile, protocol = pickle.HIGHEST_PROTOCOL)
+                os.replace(path + '.tmp', path)
+            except Exception as error:
+                print(f'Basemap was not saved in cache: {error}')
+                if os.path.exists(path + '.tmp'):
+                    os.remove(path + '.tmp')
+    basemap_cache[key] = m
+    if ax is None:
+        return m
+    # -- Copy for axes (references to axes are not kept in cached Basemap):
+    m = copy.copy(m)
+    for attr, init in basemap_axes_state.items():
+        if attr in vars(m):
+            setattr(m, attr, init())
+    m.ax = ax
+    return m
+# ----------------------------------------------------------------------
+
+# 3. get_projected_grid --> Get mesh grid and projected coordinates of grid. Arrays
+#                           are computed only once for each projection and grid
+#                           (lib4cache.get_grid_field), they are read-only.
+def get_projected_grid(
+        # Input variables:
+        m:Basemap,                        # Basemap (get_basemap or select_domain)
+        bm_sets:dict,                     # Basemap settings (get_domain_settings)
+        lons:np.array,                    # 1D array with longitudes
+        lats:np.array,                    # 1D array with latitudes
+        # OUTPUT variables:
+    ) -> tuple[np.array, np.array, np.array, np.array]: # lon, lat, xi, yi (2D arrays)
+    # -- Create mesh grib based on lat and lon (1d arrays):
+    lonlat = lib4cache.get_grid_field(
+        'lonlat', lats, lons, lambda lat, lon: np.stack(np.meshgrid(lon, lat)))
+    # -- Projected coordinates:
+    xy = lib4cache.get_grid_field(
+        f'xy_{lib4cache.get_cache_key(**bm_sets)}', lats, lons,
+        lambda lat, lon: np.stack(m(lonlat[0], lonlat[1])))
+    return lonlat[0], lonlat[1], xy[0], xy[1]
+# ----------------------------------------------------------------------
+
+# 4. get_land_mask --> Get boolean land mask of grid (True - land, False - ocean and
+#                      inland water objects, the same as maskoceans). Mask is computed
+#                      only once for each grid and saved with other grid fields (lib4cache)
+def get_land_mask(
+        # Input variables:
+        lat:np.array,                     # 1D array with latitudes
+        lon:np.array,                     # 1D array with longitudes
+        lcache:Optional[bool] = True,     # Do you want to use cache of grid fields?
+        # OUTPUT variables:
+    ) -> np.array:                        # Land mask (lat, lon), read-only if lcache
+    if lcache:
+        return lib4cache.get_grid_field(
+            'land', lat, lon, lambda lat, lon: get_land_mask(lat, lon, lcache = False))
+    lon2d, lat2d = np.meshgrid(np.squeeze(lon), np.squeeze(lat))
+    return ~np.ma.getmaskarray(maskoceans(lon2d, lat2d, np.ones(lon2d.shape)))
+# ----------------------------------------------------------------------
+
+# 5. export_land_mask --> Land mask of grid as DataArray for statistics (for example:
+#                         data.where(mask)). Mask can be saved in NetCDF file.
+def export_land_mask(
+        # Input variables:
+        lat:np.array,                     # 1D array with latitudes
+        lon:np.array,                     # 1D array with longitudes
+        path:Optional[str] = None,        # Path of output NetCDF file. Default is None
+        # OUTPUT variables:
+    ) -> xr.DataArray:                    # Land mask (lat, lon)
+    mask = xr.DataArray(
+        np.array(get_land_mask(lat, lon)),
+        coords = {'lat': np.squeeze(lat), 'lon': np.squeeze(lon)},
+        dims   = ['lat', 'lon'],
+        name   = 'land',
+        attrs  = {'long_name': 'land mask (1 - land, 0 - ocean and inland water)'},
+    )
+    if path is not None:
+        makefolder(os.path.dirname(path))
+        mask.astype(np.int8).to_netcdf(path)
+    return mask
+# ----------------------------------------------------------------------
+
+# 6. select_domain --> Settings for research domain used in netcdf_grid and netcdf_grid_series
+def select_domain(
+        # Input variables:
+        domain:str,                       # Research domain
+        ax:plt.Axes,                      # Axis-object of matplotlib-subplots
+        lons:np.array,                    # 1D array with longitudes
+        lats:np.array,                    # 1D array with latitudes
+        # OUTPUT variables:
+        ) -> tuple[
+            plt.Axes,                     # Final plot (Basemap object)
+            list[float],                  # Values for meridians
+            list[float],                  # Values for parallels.
+    ]:
+    # -- Get Basemap from cache, copy of Basemap is linked with actual axes
+    #    (geometry of coastlines and boundaries is shared):
+    bm_sets, params_paral, params_merid = get_domain_settings(domain, lons, lats)
+    m = get_basemap(bm_sets, ax = ax)
     return m, params_paral, params_merid
 # ----------------------------------------------------------------------
 
-# 2. vis_stations --> create a map with localion of stations
+# 7. is_regular_grid --> Check that projected grid is regular: rows of xi and columns
+#                        of yi are the same and steps are constant (for example: lat/lon
+#                        grid in cylindrical projection). Regular grid can be drawn as image.
+def is_regular_grid(
+        # Input variables:
+        xi:np.array,                      # 2D array with projected x coordinates
+        yi:np.array,                      # 2D array with projected y coordinates
+        rtol:Optional[float] = 1e-4,      # Tolerance (fraction of grid step). Default is 1e-4
+        # OUTPUT variables:
+    ) -> bool:                            # Is grid regular?
+    if np.ndim(xi) != 2 or min(np.shape(xi)) < 2 or np.ma.is_masked(xi) or np.ma.is_masked(yi):
+        return False
+    xi = np.asarray(xi); yi = np.asarray(yi)
+    dx = xi[0, 1] - xi[0, 0]
+    dy = yi[1, 0] - yi[0, 0]
+    if dx == 0.0 or dy == 0.0:
+        return False
+    return (np.allclose(xi, xi[0, None, :], rtol = 0.0, atol = rtol * abs(dx)) and
+            np.allclose(yi, yi[:, 0, None], rtol = 0.0, atol = rtol * abs(dy)) and
+            np.allclose(np.diff(xi[0]), dx, rtol = 0.0, atol = rtol * abs(dx)) and
+            np.allclose(np.diff(yi[:, 0]), dy, rtol = 0.0, atol = rtol * abs(dy)))
+# ----------------------------------------------------------------------
+
+# 8. draw_grid --> Draw 2D field on map. Cells are centered on grid points (the same
+#                  as m.pcolor). Renderers:
+#                  image      - one image for regular grids (is_regular_grid), the fastest;
+#                  pcolormesh - one mesh of quadrilaterals for any grid;
+#                  pcolor     - one polygon for each cell (the previous version, slow);
+#                  auto       - image for regular grids, otherwise pcolormesh.
+def draw_grid(
+        # Input variables:
+        m:Basemap,                        # Basemap with axes (select_domain)
+        xi:np.array,                      # 2D array with projected x coordinates
+        yi:np.array,                      # 2D array with projected y coordinates
+        var:np.array,                     # 2D array with data (masked values are not shown)
+        renderer:Optional[str] = 'auto',  # Renderer: auto, image, pcolormesh, pcolor
+        **kwargs,                         # Settings of plot: cmap, vmin, vmax and etc.
+        # OUTPUT variables:
+    ):                                    # Plot object for colorbar
+    if renderer == 'auto':
+        renderer = 'image' if is_regular_grid(xi, yi) else 'pcolormesh'
+    if renderer == 'pcolor':
+        return m.pcolor(xi, yi, var, **kwargs)
+    if renderer == 'pcolormesh':
+        return m.pcolormesh(xi, yi, var, **kwargs)
+    if renderer != 'image':
+        raise ValueError(f'Renderer {renderer} is not supported (auto, image, pcolormesh, pcolor)')
+    if not is_regular_grid(xi, yi):
+        raise ValueError('Renderer image is possible only for regular grids, use pcolormesh')
+    # -- Image rows are ordered from the bottom, columns from the left:
+    dx = xi[0, 1] - xi[0, 0]
+    dy = yi[1, 0] - yi[0, 0]
+    var = var[::int(np.sign(dy)), ::int(np.sign(dx))]
+    extent = [np.min(xi[0]) - 0.5 * abs(dx), np.max(xi[0]) + 0.5 * abs(dx),
+              np.min(yi[:, 0]) - 0.5 * abs(dy), np.max(yi[:, 0]) + 0.5 * abs(dy)]
+    ax = m.ax if m.ax is not None else plt.gca()
+    cs = ax.imshow(var, extent = extent, origin = 'lower', interpolation = 'nearest',
+                   **kwargs)
+    # -- Limits of map (imshow changes them):
+    m.set_axes_limits(ax = ax)
+    return cs
+# ----------------------------------------------------------------------
+
+# 9. vis_stations --> create a map with localion of stations
 def vis_stations(
         # Input variables:
         data_OUT:str,                     # Output path
@@ -772,7 +1004,7 @@ def vis_stations(
     fig  = plt.figure(figsize = (12,7))
     ax   = fig.add_subplot(111) 
 
-    m    = Basemap(projection ='robin', resolution = 'l', lon_0 = 0.0, ax = ax);
+    m    = get_basemap({'projection': 'robin', 'resolution': 'l', 'lon_0': 0.0}, ax = ax)
     x, y = m(lons, lats)
 
     m.scatter(x, y, marker = 's', s = 25, color = 'm')
@@ -806,7 +1038,7 @@ def vis_stations(
     plt.gcf().clear()
 # ----------------------------------------------------------------------
 
-# 3. netcdf_grid --> Visualization of 2d array for one moment of time, in different
+# 10. netcdf_grid --> Visualization of 2d array for one moment of time, in different
 #                    projections depending on research region.
 def netcdf_grid(
         # Input variables:
@@ -823,6 +1055,8 @@ def netcdf_grid(
         ltitle: Optional[bool] = False,       # Do you want to add plot title? Default is False
         lplt_contour: Optional[bool] = False, # Do you want to use contourof or pcolor scheme? Default scheme is
                                               # pcover and lplt_contour is False.
+        renderer: Optional[str] = 'auto',     # Renderer of pcolor scheme (auto, image, pcolormesh, pcolor).
+                                              # Default is auto (image for regular grids, see draw_grid)
         # OUTPUT variables:
     ) -> plt.Axes:                            # Final plot (Basemap object)
 
@@ -841,17 +1075,19 @@ def netcdf_grid(
     # -- Select settings for research domain:
     m, params_paral, params_merid = select_domain(domain, axes, lons = lons,
                                                                 lats = lats)
-    # -- Create mesh grib based on lat and lon (1d arrays):
-    lon, lat = np.meshgrid(lons, lats)
-    xi, yi   = m(lon, lat)
-    # -- Define parameter for visualization (It should be a 2d array):
-    var = maskoceans(lon, lat, data)
+    # -- Mesh grid and projected coordinates (cached for each projection and grid):
+    lon, lat, xi, yi = get_projected_grid(
+        m, get_domain_settings(domain, lons, lats)[0], lons, lats)
+    # -- Define parameter for visualization (It should be a 2d array), ocean is
+    #    masked by land mask of grid (cached):
+    var = np.ma.masked_array(np.asarray(data), mask = ~get_land_mask(lats, lons))
     # -- Define method for visualization:
     if lplt_contour == True:
         levels = MaxNLocator(nbins = 12).tick_values(min_value, max_value) 
         cs = m.contourf(xi, yi, var, cmap = colormap, levels = levels, extend = 'both')
     else:
-        cs = m.pcolor(  xi, yi, var, cmap = colormap, vmin = min_value,vmax = max_value)
+        cs = draw_grid(m, xi, yi, var, renderer, cmap = colormap, vmin = min_value,
+                                                                  vmax = max_value)
     # -- Add parallels and meridians:
     # labels = [left,right,top,bottom]
     m.drawparallels(np.arange(params_paral[0], params_paral[1], params_paral[2]),
@@ -876,7 +1112,7 @@ def netcdf_grid(
     return m
 # ----------------------------------------------------------------------
 
-# 4. netcdf_grid_series --> Visualization of NetCDF data on subplots, in different
+# 11. netcdf_grid_series --> Visualization of NetCDF data on subplots, in different
 #                           projections depending on research region.
 def netcdf_grid_series(
         # Input variables:
@@ -890,6 +1126,9 @@ def netcdf_grid_series(
         colormap:str,                     # Color scheme for data
         data_OUT:str,                     # Output path
         plot_title:str,                   # Plot title
+        renderer:Optional[str] = 'auto',  # Renderer: contour (the previous version: contourf and
+                                          # pcolormesh), auto, image, pcolormesh, pcolor (draw_grid).
+                                          # Default is auto
         # OUTPUT variables:
     ):                                    # Create new figure in output folder
     # -- Local variables:
@@ -905,27 +1144,36 @@ def netcdf_grid_series(
         for j in range(egrid[1]):
             ax_list.append(plt.subplot2grid(egrid, (i, j), rowspan = 1,
                                                            colspan = 1))
+    # -- Land mask of grid (cached, the same for all subplots):
+    land = get_land_mask(lats, lons)
     # -- Show data on the subplots:
     for i in range(len(years)):
         # -- Select domain:
         m, params_paral, params_merid = select_domain(domain, ax_list[i], lons = lons,
                                                                           lats = lats)
-        # -- Create mesh grib based on lat and lon (1d arrays):
-        lon, lat = np.meshgrid(lons, lats)
-        xi, yi   = m(lon, lat)
+        # -- Mesh grid and projected coordinates (cached for each projection and grid):
+        lon, lat, xi, yi = get_projected_grid(
+            m, get_domain_settings(domain, lons, lats)[0], lons, lats)
 
         # -- Define parameter for visualization (It should be a 3d array):
-        var = maskoceans(lon, lat, data.sel(time = years[i])[0]) * re_range
+        var = np.ma.masked_array(np.asarray(data.sel(time = years[i])[0]),
+                                 mask = ~land) * re_range
         
         # -- Start visualization:
-        cs = m.contourf(xi, yi, var, cmap = colormap, extend = 'both')
+        if renderer == 'contour':
+            cs = m.contourf(xi, yi, var, cmap = colormap, extend = 'both')
+        else:
+            # -- One layer of data (the same for data and legend):
+            colormesh = draw_grid(m, xi, yi, var, renderer, vmin = 0.0, vmax = 1.4,
+                                                            cmap = colormap)
         # -- Add water objects mask:
         m.drawlsmask(land_color  = 'coral', ocean_color = 'aqua' ,
                      lakes       = True   , alpha       = 0.1    )
         # -- Add titles for each plot:
         plt.title(f'{years[i]}')
         # -- Add legend for each plot:
-        colormesh = m.pcolormesh(lon, lat, var, vmin = 0.0, vmax = 1.4, cmap = colormap)
+        if renderer == 'contour':
+            colormesh = m.pcolormesh(lon, lat, var, vmin = 0.0, vmax = 1.4, cmap = colormap)
 
         if domain in ('Tropics', 'NH'):
             #       location        label      pad    size
@@ -947,7 +1195,7 @@ def netcdf_grid_series(
     plt.gcf().clear()
 # ----------------------------------------------------------------------
 
-# 5. create_fast_xarray_plot --> create 2D maps based on input NetCDF data and
+# 12. create_fast_xarray_plot --> create 2D maps based on input NetCDF data and
 #                                xarray options for visualization (simple plot):
 def create_fast_xarray_plot(
         # Input variables:
@@ -5,31 +5,56 @@ __all__ = [
     'read_ocn',
     'read_jules',
     'read_orchidee',
+    'get_ds_family',
+    'get_var_pairs',
+    'read_dataset',
+    'load_dataset',
+    'load_datasets',
     'get_data',
+    'get_data_vars',
     'get_interpol',
     'annual_mean',
 ]
 """
 Module with functions for reading and processing data from NetCDF files:
-    a. weighted_temporal_mean --> Calculating the yearly average with the
+    a. weighted_temporal_mean --> Calculating the yearly (seasonal, fire season,
+                                  hydrological year) average with the
                                   corresponding weights of days in each month;
-    b. comp_area_lat_lon      --> Creatin mesh grid with cell-area for actual coordinates;
+    b. comp_area_lat_lon      --> Creatin mesh grid with cell-area for actual coordinates
+                                  (area is cached for each grid);
     c. read_ocn               --> Reading NetCDF data with OCN model information and convert
                                   units to the same units as JULES and ORCHIDEE models;
     d. read_jules             --> Reading NetCDF data with JULES model information and convert
                                   units to the same units as OCN and ORCHIDEE models;
     e. read_orchidee          --> Reading NetCDF data with ORCHIDEE model information and
                                   convert units to the same units as OCN and JULES models;
-    f. get_data               --> Opening NetCDF data, get initial information
-                                  about data from file;
+    f. get_ds_family          --> Get dataset family (OCN, JUL, ORC, ESA, GFED);
+       get_var_pairs          --> Get pairs of research parameters and their
+                                  names into NetCDF (one or several parameters);
+       read_dataset           --> Opening NetCDF data of one dataset and initial
+                                  data preprocessing (units, resampling) for one
+                                  or several research parameters;
+       load_dataset           --> Loading of one dataset (from cache or NetCDF)
+                                  with report of wall time;
+       load_datasets          --> Loading of several datasets (one after another
+                                  or in thread or process pool);
+       get_data               --> Opening NetCDF data, get initial information
+                                  about data from file. Preprocessed data can be
+                                  saved in cache (lib4cache). Datasets can be
+                                  loaded in parallel (thread or process pool);
+       get_data_vars          --> The same as get_data for several research
+                                  parameters: each NetCDF file is opened and
+                                  preprocessed only once for all parameters;
     g. get_interpolation      --> Upscaling or downscaling data to the same grid as OCN
+                                  (nearest or conservative regridding with cached
+                                  sparse weights) for one or several parameters
     h. annual_mean            --> Calculation of annual values for research
                                   parameters. Values from this subrotine are used
                                   only for linear plots which you can generate from
                                   fire_xarray.py and one_linear_plot.py. Function
                                   has an ***additional algorithm for convertation
                                   units*** into a special format which is applying
-                                  for linear plots.
+                                  for linear plots (lib4regions).
 
 Autors of project: Evgenii Churiulin, Ana Bastos
 
@@ -58,73 +83,134 @@ Version    Date       Name
            Code refactoring
     1.6    2023-11-10 Evgenii Churiulin, MPI-BGC
            Adapted library for package import and added the user class with settings
+    1.7    2026-10-16 MPI-BGC
+           Preprocessing of one dataset was moved to read_dataset. get_data can
+           use the on-disk cache of preprocessed data (lib4cache) and lazy
+           (Dask) reading of data by chunks. Added parallel loading of datasets and
+           cache of cell area. get_interpol uses regridding with cached sparse
+           weights (lib4regrid). annual_mean uses aggregation engine (lib4regions).
+           weighted_temporal_mean supports seasons, fire season and hydrological
+           year, weights are computed from the time index (lazy for Dask data)
+    1.8    2026-10-17 MPI-BGC
+           Added get_data_vars: several research parameters are read from one
+           open, time axis fix and preprocessing of each file. get_interpol
+           regrids several parameters in one call
 """
 # =============================     Import modules     ==================
 import os
 import sys
 sys.path.append(os.path.join(os.getcwd(), '..'))
+import time
 import numpy as np
 import pandas as pd
 import xarray as xr
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import warnings
 warnings.filterwarnings("ignore")
 from settings import (get_path_in, get_settings4ds_time_limits,
-    get_settings4domains,get_settings4ocn_orc_ndep,config, logical_settings)
+    get_settings4domains,get_settings4ocn_orc_ndep,get_settings4chunks,config,
+    logical_settings)
 import lib4upscaling_support as lib4ups
+import lib4cache
+import lib4regrid
+import lib4regions
 # =============================   Personal functions   ==================
 
-def weighted_temporal_mean(ds:xr.DataArray, var:str) -> xr.DataArray:
-    """Calculating the yearly average with the corresponding weights of days in each month.
+def weighted_temporal_mean(
+        ds:xr.Dataset,
+        var:str,
+        period: Optional[str] = 'year',
+        hydro_start: Optional[int] = 10,
+        fire_months: Optional[list[int]] = None,
+    ) -> xr.Dataset:
+    """Calculating the average for aggregation periods with the corresponding
+       weights of days in each month. Weights are computed from the time index,
+       data are reduced by one weighted sum over time (lazy for Dask data):
 
-        Input:
-        ds -> Input data
-        var -> Research variable
-        Output:
-        average_weighted_temp -> The weighted average dataArray
-    """
-    # -- Determine the month length:
-    month_length = ds.time.dt.days_in_month
-    # -- Calculate the weights:
-    wgts = month_length.groupby("time.year") / month_length.groupby("time.year").sum()
-    # -- Make sure the weights in each year add up to 1:
-    test = (
-        pd.DataFrame(
-            wgts.groupby("time.year").sum(xr.ALL_DIMS).values
-        ).apply(lambda x: x.mean())[0]
-    )
+        Input variables:
+        ds - Input data (monthly values)
+        var - Research variable
+        period - Aggregation period:
+                 'year'        -> calendar year;
+                 'season'      -> DJF, MAM, JJA, SON (December is used for
+                                  DJF of the next year);
+                 'hydro_year'  -> hydrological year from hydro_start month;
+                 'fire_season' -> fire_months of each season (season starts
+                                  from the first month of fire_months).
+                 Default is 'year'
+        hydro_start - First month of hydrological year. Default is 10 (October)
+        fire_months - Months of fire season (for example: [11, 12, 1, 2, 3]).
+                      Default is None (required for 'fire_season')
 
-    if test == 1:
-        print('Sum of each year’s weights is equal to 1!')
-    else:
-        print('Sum of each year’s weights is not equal to 1!')
+        OUTPUT variables:
+        average_weighted_temp - The weighted average values (time is the
+                                first day of each period)
+    """
+    # -- Start month and length (months) of aggregation periods:
+    set4periods = {
+        'year'       : (1, 12),
+        'season'     : (12, 3),
+        'hydro_year' : (hydro_start, 12),
+        'fire_season': (fire_months[0] if fire_months else 1, 12),
+    }
+    if period not in set4periods or (period == 'fire_season' and not fire_months):
+        raise ValueError(f'Aggregation period {period} is not supported or fire_months are not set')
+    start, length = set4periods.get(period)
+
+    # -- Determine the month length and the first month of periods:
+    days   = ds.time.dt.days_in_month.values.astype(np.float64)
+    years  = ds.time.dt.year.values
+    months = ds.time.dt.month.values
+    pmonth = months - (months - start) % length
+    pyear  = np.where(pmonth <= 0, years - 1, years)
+    pmonth = np.where(pmonth <= 0, pmonth + 12, pmonth)
+    valid  = (np.isin(months, fire_months) if period == 'fire_season'
+              else np.ones(len(months), dtype = bool))
+    # -- Weights (periods x timesteps), weights of each period add up to 1
+    #    after division by the weights of valid values:
+    labels, index = np.unique(pyear[valid] * 100 + pmonth[valid], return_inverse = True)
+    wgts = np.zeros((len(labels), len(months)))
+    wgts[index, np.flatnonzero(valid)] = days[valid]
+    wgts = xr.DataArray(wgts, dims = ['period', 'time'])
 
     # -- Subset our dataset for our variable:
     obs = ds[var]
-    # -- Setup our masking for nan values:
-    cond = obs.isnull()
-    ones = xr.where(cond, 0.0, 1.0)
-    # -- Calculate the numerator:
-    obs_sum =   (obs * wgts).resample(time = "AS").sum(dim = "time")
-    # -- Calculate the denominator:
-    ones_out = (ones * wgts).resample(time = "AS").sum(dim = "time")
+    # -- Calculate the numerator and the denominator (weights of non-NaN values):
+    obs_sum  = xr.dot(wgts, obs.fillna(0.0), dims = 'time')
+    ones_out = xr.dot(wgts, obs.notnull().astype(np.float64), dims = 'time')
     # -- Get weighted average:
-    average_weighted_temp = obs_sum / ones_out
-    # -- Average_weighted_temp = xr.DataArray(average_weighted_temp, name = var):
+    average_weighted_temp = (
+        (obs_sum / ones_out.where(ones_out > 0))
+            .rename({'period': 'time'})
+            .assign_coords(time = pd.to_datetime(
+                {'year': labels // 100, 'month': labels % 100, 'day': 1}).values)
+            .transpose(*obs.dims)
+    )
+    if period == 'season':
+        average_weighted_temp = average_weighted_temp.assign_coords(
+            season = ('time', np.array(['DJF', 'MAM', 'JJA', 'SON'])[(labels % 100 % 12) // 3]))
     average_weighted_temp = average_weighted_temp.to_dataset(name = var)
     return average_weighted_temp
 
 
-def comp_area_lat_lon(lat:np.array, lon:np.array) -> np.array:
+def comp_area_lat_lon(
+        lat:np.array, lon:np.array, lcache: Optional[bool] = True) -> np.array:
     """ Create mesh grid for actual coordinates:
 
         Author: Ana Bastos
 
         Input:
         lat, lon -> Latitude and Longitude values from NetCDF file
+        lcache -> Do you want to use cache of grid fields (lib4cache)? Area
+                  is computed only once for each grid and the read-only array
+                  is shared. Default is True
         Output:
         area -> area 2D array.
     """
+    if lcache:
+        return lib4cache.get_grid_field(
+            'area', lat, lon, lambda lat, lon: comp_area_lat_lon(lat, lon, lcache = False))
     # Start computations:
     radius = 6.37122e6 # in meters
 
@@ -156,7 +242,8 @@ def comp_area_lat_lon(lat:np.array, lon:np.array) -> np.array:
 
 
 def read_ocn(
-    path:str, ds_name:str, param:str, var:str, uconfig:config) -> xr.DataArray:
+    path:str, ds_name:str, param:str, var:str, uconfig:config,
+    chunks: Optional[dict] = None) -> xr.DataArray:
     """Read NetCDF data with OCN model information and convert
     units to the same units as JULES and ORCHIDEE models:
 
@@ -164,8 +251,11 @@ def read_ocn(
         path - Input path
         ds_name - Dataset name
         param - Attribute name of the research parameter in current NetCDF
+                (or list of names)
         var - Attribute name for the new dataset and futher computations
+              (or list of names)
         uconfig - Class with user settings
+        chunks - Dask chunks (lazy mode). Default is None (data are not chunked)
         # OUTPUT variables:
         nc - Research dataset with correct units
     """
@@ -178,7 +268,7 @@ def read_ocn(
     ds_tlm = get_settings4ocn_orc_ndep(uconfig)
     # -- Read data
     nc = (
-        xr.open_dataset(path, decode_times = False)
+        xr.open_dataset(path, decode_times = False, chunks = chunks)
           .assign_coords(
             {'time': pd.date_range(
                 ds_tlm.get(ds_name)[0],
@@ -193,15 +283,16 @@ def read_ocn(
                       comp_area_lat_lon(nc.lat.values, nc.lon.values))},
                       coords = {'lat' : nc.lat.values, 'lon' : nc.lon.values}))
     # -- convert units to correct format
-    if var in ('gpp', 'npp', 'fFire', 'nbp', 'nee'):
-        # Convert kg C m-2 s-1  to gC m-2 yr-1
-        nc[param] = (nc[param] * g_in_kg * hour_in_day * sec_in_hour *
-                     nc[param].time.dt.days_in_month)
-    elif var == 'burned_area':
-        nc['burned_area'] = (nc[param] * nc['area'] * rec_coef * 
-                             nc[param].time.dt.days_in_month)
-    #else:  
-        # cVeg and LAI parameters should be the same as it was before
+    for var, param in get_var_pairs(var, param):
+        if var in ('gpp', 'npp', 'fFire', 'nbp', 'nee'):
+            # Convert kg C m-2 s-1  to gC m-2 yr-1
+            nc[param] = (nc[param] * g_in_kg * hour_in_day * sec_in_hour *
+                         nc[param].time.dt.days_in_month)
+        elif var == 'burned_area':
+            nc['burned_area'] = (nc[param] * nc['area'] * rec_coef *
+                                 nc[param].time.dt.days_in_month)
+        #else:
+            # cVeg and LAI parameters should be the same as it was before
 
     #print(len(nc[var]))
     #nc = nc.sel(time = slice('1960-01-01','2023-10-01'))
@@ -210,7 +301,8 @@ def read_ocn(
 
 
 def read_jules(
-    path:str, ds_name:str, param:str,var:str) -> xr.DataArray:
+    path:str, ds_name:str, param:str,var:str,
+    chunks: Optional[dict] = None) -> xr.DataArray:
     """Read NetCDF data with JULES model information and convert
        units to the same units as OCN and ORCHIDEE models:
 
@@ -218,7 +310,10 @@ def read_jules(
         path - Input path
         ds_name - Dataset name
         param - Attribute name of the research parameter in current NetCDF
+                (or list of names)
         var - Attribute name for the new dataset and futher computations
+              (or list of names)
+        chunks - Dask chunks (lazy mode). Default is None (data are not chunked)
         # OUTPUT variables:
         nc - Research dataset with correct units
     """
@@ -228,7 +323,7 @@ def read_jules(
     g_in_kg     = 1000.0      # gramms in 1 kg
     rec_coef    = 1e-9        # m2 to 1000 km2
     # -- Read data
-    nc = xr.open_dataset(path)
+    nc = xr.open_dataset(path, chunks = chunks)
     # -- Rename attributes
     #nc = nc.rename({'longitude':'lon', 'latitude':'lat'})
     # -- Add a new field with area information to current datasets
@@ -236,21 +331,23 @@ def read_jules(
                       comp_area_lat_lon(nc.lat.values, nc.lon.values))},
                       coords = {'lat' : nc.lat.values, 'lon' : nc.lon.values}))
     # -- convert units to correct format
-    if var in ('gpp', 'npp', 'fFire', 'nbp'):
-        # Convert kg C m-2 s-1  to gC m-2 yr-1
-        nc[param] = (nc[param] * g_in_kg * hour_in_day  * sec_in_hour * 
-                     nc[param].time.dt.days_in_month)
-    elif var == 'burned_area':
-        nc['burned_area'] = ((nc[param] / 100) * nc['area'] * rec_coef) #*
-                             #nc[param].time.dt.days_in_month)# * hour_in_day * 
-                             #sec_in_hour)
+    for var, param in get_var_pairs(var, param):
+        if var in ('gpp', 'npp', 'fFire', 'nbp'):
+            # Convert kg C m-2 s-1  to gC m-2 yr-1
+            nc[param] = (nc[param] * g_in_kg * hour_in_day  * sec_in_hour *
+                         nc[param].time.dt.days_in_month)
+        elif var == 'burned_area':
+            nc['burned_area'] = ((nc[param] / 100) * nc['area'] * rec_coef) #*
+                                 #nc[param].time.dt.days_in_month)# * hour_in_day *
+                                 #sec_in_hour)
     #else:  jul_nc[jres_param[0]] / 100)* jul_nc['area'] * rec_coef
         # cVeg and LAI parameters should be the same as it was before  
     return nc
 
 
 def read_orchidee(
-    path:str, ds_name:str, param:str, var:str, uconfig:config) -> xr.DataArray :
+    path:str, ds_name:str, param:str, var:str, uconfig:config,
+    chunks: Optional[dict] = None) -> xr.DataArray :
     """Read NetCDF data with ORCHIDEE model information and convert units to the
         same units as OCN and JULES models
 
@@ -259,8 +356,11 @@ def read_orchidee(
         path - Input path
         ds_name - Dataset name
         param - Attribute name of the research parameter in current NetCDF
+                (or list of names)
         var - Attribute name for the new dataset and futher computations
+              (or list of names)
         uconfig - Class with user settings
+        chunks - Dask chunks (lazy mode). Default is None (data are not chunked)
 
         OUTPUT variables:
         nc - Research dataset with correct units
@@ -275,7 +375,7 @@ def read_orchidee(
     ds_tlm = get_settings4ocn_orc_ndep(uconfig)
     # -- Read data
     nc_orh = (
-        xr.open_dataset(path, decode_times = False)
+        xr.open_dataset(path, decode_times = False, chunks = chunks)
           .assign_coords({'time': pd.date_range(ds_tlm.get(ds_name)[0],
                                                 ds_tlm.get(ds_name)[1],
                                          freq = ds_tlm.get(ds_name)[2])})
@@ -288,43 +388,77 @@ def read_orchidee(
                                                 nc_orh.lon.values))},
                               coords = {'lat' : nc_orh.lat.values,
                                         'lon' : nc_orh.lon.values}))
+    lst4pairs = get_var_pairs(var, param)
     # -- Replace NaN values to NaN:
-    nc = nc_orh.where(nc_orh[param] != nan_values)
+    if len(lst4pairs) == 1:
+        nc = nc_orh.where(nc_orh[lst4pairs[0][1]] != nan_values)
+    else:
+        # -- Mask of each research parameter is applied only to its values:
+        nc = nc_orh.assign(
+            {param: nc_orh[param].where(nc_orh[param] != nan_values)
+             for var, param in lst4pairs})
     # -- Convert units to correct format:
-    if var in ('gpp', 'fFire', 'nbp'):
-        # Convert kg C m-2 s-1  to gC m-2 yr-1
-        nc[param] = (nc[param] * g_in_kg * hour_in_day * sec_in_hour *
-                     nc[param].time.dt.days_in_month)
-    elif var == 'burned_area':
-        nc['burned_area'] = (
-            nc[param] * nc['area'] * rec_coef * nc[param].time.dt.days_in_month)
+    for var, param in lst4pairs:
+        if var in ('gpp', 'fFire', 'nbp'):
+            # Convert kg C m-2 s-1  to gC m-2 yr-1
+            nc[param] = (nc[param] * g_in_kg * hour_in_day * sec_in_hour *
+                         nc[param].time.dt.days_in_month)
+        elif var == 'burned_area':
+            nc['burned_area'] = (
+                nc[param] * nc['area'] * rec_coef * nc[param].time.dt.days_in_month)
     return nc
 
 
-def get_data(
-        lst4pathin:list[str],
-        lst4dsnames:list[str],
+def get_ds_family(ds_name:str) -> str:
+    """Get dataset family (OCN, JUL, ORC, ESA, GFED or Other) based on
+       dataset name. Families are used for chunk settings (lazy mode):"""
+    if ds_name[0:3] in ('OCN', 'JUL', 'ORC'):
+        return ds_name[0:3]
+    elif ds_name == 'NDEP':
+        return 'OCN'
+    elif ds_name.startswith(('BA_', 'ESA')):
+        return 'ESA'
+    elif ds_name.startswith('GFED'):
+        return 'GFED'
+    else:
+        return 'Other'
+
+
+def get_var_pairs(var, param) -> list[tuple[str, str]]:
+    """Get pairs (research parameter, name of parameter into NetCDF). var and
+       param are names of one research parameter or lists of names"""
+    if isinstance(var, str):
+        return [(var, param)]
+    if len(var) != len(param):
+        raise ValueError('Number of research parameters and their names into NetCDF are different')
+    return list(zip(var, param))
+
+
+def read_dataset(
+        pathin:str,
+        ds_name:str,
         var:str,
-        param_var:list[str],
+        param:str,
         user_params: config,
-        linfo: Optional[bool] = False,
         lresmp: Optional[bool] = True,
-    ) -> list[xr.DataArray]:
-    """Open NetCDF data, get initial information about data from file and run
-        algorithms for an initial data preprocessing
+        chunks: Optional[dict] = None,
+    ) -> xr.Dataset:
+    """Open NetCDF data of one dataset and run algorithms for an initial data
+        preprocessing (units convertation, resampling)
 
         Input variables:
 
-        lst4pathin - Dataset paths
-        lst4dsnames - Dataset names
-        var - Research parameter
-        param_var - Name of the research parameter into actual dataset
+        pathin - Dataset path
+        ds_name - Dataset name
+        var - Research parameter (or list of parameters from the same file)
+        param - Name of the research parameter into actual dataset (or list
+                of names at the same order as var)
         user_params - User settings (class object)
-        linfo - Do you want to get information about NetCDF? Default is False
         lresmp - Do you want to get annual values? Default is True
+        chunks - Dask chunks (lazy mode). Default is None (data are not chunked)
 
         OUTPUT variables:
-        nc_data - Preprocessed data for each dataset
+        ncfile - Preprocessed data
     """
     # -- Local variables:
     ocn_id = 'OCN'
@@ -334,66 +468,272 @@ def get_data(
     # -- Recalculation coefficients:
     rec_coef = 1e-9  # m2 in 1000 km2
     g2kg = 1000      # g in kg
-    # -- Preprocessing of netcdf data:
-    nc_data = []
-    for i in range(len(lst4dsnames)):
-        print(lst4dsnames[i])
 
-        # -- Read and convert units of OCN and NDEP data:
-        if ((lst4dsnames[i][0:3] == ocn_id) or (lst4dsnames[i] == 'NDEP')):
-            ncfile = read_ocn(
-                lst4pathin[i], lst4dsnames[i], param_var[i], var, user_params)
-        # -- Read and convert units of JULES data:
-        elif lst4dsnames[i][0:3] == jul_id:
-            ncfile = read_jules(lst4pathin[i], lst4dsnames[i], param_var[i], var)
-        # -- Read and convert units of ORCHIDEE data:
-        elif lst4dsnames[i][0:3] == orc_id:
-            ncfile = read_orchidee(
-                lst4pathin[i], lst4dsnames[i], param_var[i], var, user_params)
-        else:
-            # -- Read satellute datasets and other model experiments
-            ncfile = xr.open_dataset(lst4pathin[i])
-            # -- Add a new field with area information to current datasets
-            ncfile = ncfile.assign(
-                xr.Dataset(
-                    {'area': (('lat', 'lon'),
-                        comp_area_lat_lon(ncfile.lat.values,ncfile.lon.values))
-                    },
-                coords = {'lat' : ncfile.lat.values, 'lon' : ncfile.lon.values}
-                )
+    # -- Read and convert units of OCN and NDEP data:
+    if ((ds_name[0:3] == ocn_id) or (ds_name == 'NDEP')):
+        ncfile = read_ocn(pathin, ds_name, param, var, user_params, chunks = chunks)
+    # -- Read and convert units of JULES data:
+    elif ds_name[0:3] == jul_id:
+        ncfile = read_jules(pathin, ds_name, param, var, chunks = chunks)
+    # -- Read and convert units of ORCHIDEE data:
+    elif ds_name[0:3] == orc_id:
+        ncfile = read_orchidee(pathin, ds_name, param, var, user_params, chunks = chunks)
+    else:
+        # -- Read satellute datasets and other model experiments
+        ncfile = xr.open_dataset(pathin, chunks = chunks)
+        # -- Add a new field with area information to current datasets
+        ncfile = ncfile.assign(
+            xr.Dataset(
+                {'area': (('lat', 'lon'),
+                    comp_area_lat_lon(ncfile.lat.values,ncfile.lon.values))
+                },
+            coords = {'lat' : ncfile.lat.values, 'lon' : ncfile.lon.values}
             )
-            # -- Covert units to correct format:
-
-            # a. Fire datasets: Original data from BA_AVHRR, GFED4.1s are in 
-            #    fraction. We have to convert data to burned area. Data from 
-            #    BA_MODIS are burned area  
-            if var == 'burned_area':
-                if lst4dsnames[i] in ('GFED4.1s', 'GFED_TOT', 'GFED_FL'):
+        )
+        # -- Covert units to correct format:
+        for act_var, act_param in get_var_pairs(var, param):
+            # a. Fire datasets: Original data from BA_AVHRR, GFED4.1s are in
+            #    fraction. We have to convert data to burned area. Data from
+            #    BA_MODIS are burned area
+            if act_var == 'burned_area':
+                if ds_name in ('GFED4.1s', 'GFED_TOT', 'GFED_FL'):
                     ncfile['burned_area'] = (
-                        ncfile[param_var[i]] * ncfile['area'] * rec_coef)
+                        ncfile[act_param] * ncfile['area'] * rec_coef)
                 else:
-                    # -- MODIS data has original values 
-                    ncfile[param_var[i]] = ncfile[param_var[i]] * rec_coef
+                    # -- MODIS data has original values
+                    ncfile[act_param] = ncfile[act_param] * rec_coef
 
             # b. Fire emission datasets:
-            elif (var == 'fFire' and lst4dsnames[i] == 'GFED4.1s'):
-                ncfile['fFire'] = ncfile[param_var[i]] 
+            elif (act_var == 'fFire' and ds_name == 'GFED4.1s'):
+                ncfile['fFire'] = ncfile[act_param]
 
-            elif ((var == 'npp' or var == 'gpp') and 
-                  (lst4dsnames[i] in ('MOD17A2HGFv061', 'MOD17A3HGFv061'))):
+            elif ((act_var == 'npp' or act_var == 'gpp') and
+                  (ds_name in ('MOD17A2HGFv061', 'MOD17A3HGFv061'))):
                 # Convert kg C m-2 m-1 to gC m-2 yr-1
-                ncfile[var] = ncfile[param_var[i]] * g2kg
+                ncfile[act_var] = ncfile[act_param] * g2kg
             #else:
                 # You can add more options here
 
-        # -- Convert monthly data to yearly
-        if lresmp == True:
-            if var in ('lai', 'cVeg') :
-                ncfile = ncfile.resample(time = 'A').mean('time')
-            else:
-                ncfile = ncfile.resample(time = 'A').sum('time')
-        # -- Add data to the new list
-        nc_data.append(ncfile)
+    # -- Convert monthly data to yearly
+    if lresmp == True:
+        lst4pairs = get_var_pairs(var, param)
+        lst4mean = [item for item in lst4pairs if item[0] in ('lai', 'cVeg')]
+        if len(lst4mean) == len(lst4pairs):
+            ncfile = ncfile.resample(time = 'A').mean('time')
+        elif len(lst4mean) == 0:
+            ncfile = ncfile.resample(time = 'A').sum('time')
+        else:
+            # -- Parameters with mean and sum values are in the same file:
+            names4mean = [name for name in set(np.ravel(lst4mean)) if name in ncfile]
+            ncfile = xr.merge([
+                ncfile[names4mean].resample(time = 'A').mean('time'),
+                ncfile.drop_vars(names4mean).resample(time = 'A').sum('time'),
+            ])
+    return ncfile
+
+
+def load_dataset(
+        pathin:str,
+        ds_name:str,
+        var:str,
+        param:str,
+        user_params: config,
+        lresmp: Optional[bool] = True,
+        cache_dir: Optional[str] = None,
+        max_cache_size: Optional[float] = 50.0,
+        chunks: Optional[dict] = None,
+    ) -> xr.Dataset:
+    """Load one dataset: read preprocessed data from cache or open NetCDF data
+        and run algorithms for an initial data preprocessing. Wall time of
+        loading is printed for each dataset.
+
+        Input variables:
+
+        pathin - Dataset path
+        ds_name - Dataset name
+        var - Research parameter (or list of parameters from the same file)
+        param - Name of the research parameter into actual dataset (or list)
+        user_params - User settings (class object)
+        lresmp - Do you want to get annual values? Default is True
+        cache_dir - Folder for cache of preprocessed data. Default is None
+        max_cache_size - Maximum size of cache in GB. Default is 50 GB
+        chunks - Dask chunks (lazy mode). Default is None (data are not chunked)
+
+        OUTPUT variables:
+        ncfile - Preprocessed data
+    """
+    tstart = time.perf_counter()
+    ncfile = None
+    # -- Name of parameters in cache file:
+    cache_var = var if isinstance(var, str) else '-'.join(var)
+    # -- Try to get preprocessed data from cache:
+    if cache_dir is not None:
+        key = lib4cache.get_cache_key(
+            path = os.path.abspath(pathin),
+            mtime = os.path.getmtime(pathin),
+            ds_name = ds_name,
+            var = var,
+            param = param,
+            time_axis_settings = get_settings4ocn_orc_ndep(user_params).get(ds_name),
+            lresmp = lresmp,
+        )
+        ncfile = lib4cache.read_cache(cache_dir, ds_name, cache_var, key, chunks = chunks)
+    if ncfile is None:
+        # -- Read data and convert units:
+        ncfile = read_dataset(
+            pathin, ds_name, var, param, user_params, lresmp = lresmp, chunks = chunks)
+        # -- Save preprocessed data in cache:
+        if cache_dir is not None:
+            lib4cache.write_cache(
+                ncfile, cache_dir, ds_name, cache_var, key, max_size = max_cache_size)
+    print(f'{ds_name} was loaded in {time.perf_counter() - tstart:.2f} s')
+    return ncfile
+
+
+def load_datasets(
+        lst4args:list[tuple],
+        nworkers: Optional[int] = 1,
+        lprocess: Optional[bool] = False,
+    ) -> list[xr.Dataset]:
+    """Load several datasets (load_dataset) one after another or in parallel:
+
+        Input variables:
+        lst4args - Arguments of load_dataset for each dataset
+        nworkers - Number of parallel workers. Default is 1 (datasets are
+                   loaded one after another)
+        lprocess - Do you want to use a process pool instead of a thread pool?
+                   Default is False (thread pool)
+
+        OUTPUT variables:
+        nc_data - Preprocessed data (the same order as lst4args)
+    """
+    tstart = time.perf_counter()
+    if nworkers is None or nworkers <= 1 or len(lst4args) <= 1:
+        nc_data = [load_dataset(*args) for args in lst4args]
+    else:
+        pool = ProcessPoolExecutor if lprocess else ThreadPoolExecutor
+        with pool(max_workers = min(nworkers, len(lst4args))) as executor:
+            # -- map keeps the order of datasets:
+            nc_data = list(executor.map(load_dataset, *zip(*lst4args)))
+    print(f'{len(nc_data)} datasets were loaded in {time.perf_counter() - tstart:.2f} s')
+    return nc_data
+
+
+def get_data(
+        lst4pathin:list[str],
+        lst4dsnames:list[str],
+        var:str,
+        param_var:list[str],
+        user_params: config,
+        linfo: Optional[bool] = False,
+        lresmp: Optional[bool] = True,
+        cache_dir: Optional[str] = None,
+        max_cache_size: Optional[float] = 50.0,
+        llazy: Optional[bool] = False,
+        nworkers: Optional[int] = 1,
+        lprocess: Optional[bool] = False,
+    ) -> list[xr.DataArray]:
+    """Open NetCDF data, get initial information about data from file and run
+        algorithms for an initial data preprocessing
+
+        Input variables:
+
+        lst4pathin - Dataset paths
+        lst4dsnames - Dataset names
+        var - Research parameter
+        param_var - Name of the research parameter into actual dataset
+        user_params - User settings (class object)
+        linfo - Do you want to get information about NetCDF? Default is False
+        lresmp - Do you want to get annual values? Default is True
+        cache_dir - Folder for cache of preprocessed data (for example:
+                    get_output_path(lsets).get('cache4get_data')). Default is
+                    None (cache is not used)
+        max_cache_size - Maximum size of cache in GB. Default is 50 GB
+        llazy - Do you want to read data lazily by Dask chunks? Chunk sizes for
+                dataset families are in user settings (get_settings4chunks).
+                Computations run only when values are needed (plots, output
+                files). Default is False
+        nworkers - Number of parallel workers for loading of datasets. Default
+                   is 1 (datasets are loaded one after another)
+        lprocess - Do you want to use a process pool instead of a thread pool
+                   for parallel loading? Default is False (thread pool)
+
+        OUTPUT variables:
+        nc_data - Preprocessed data for each dataset (the same order as lst4dsnames)
+    """
+    # -- Chunk sizes for lazy mode:
+    ds_chunks = get_settings4chunks(user_params) if llazy else {}
+    # -- Arguments for loading of each dataset:
+    lst4args = [
+        (lst4pathin[i], lst4dsnames[i], var, param_var[i], user_params, lresmp,
+         cache_dir, max_cache_size,
+         ds_chunks.get(get_ds_family(lst4dsnames[i])) if llazy else None)
+        for i in range(len(lst4dsnames))
+    ]
+    # -- Preprocessing of netcdf data:
+    return load_datasets(lst4args, nworkers = nworkers, lprocess = lprocess)
+
+
+def get_data_vars(
+        lst4pathin:list[list[str]],
+        lst4dsnames:list[str],
+        lst4vars:list[str],
+        param_var:list[list[str]],
+        user_params: config,
+        linfo: Optional[bool] = False,
+        lresmp: Optional[bool] = True,
+        cache_dir: Optional[str] = None,
+        max_cache_size: Optional[float] = 50.0,
+        llazy: Optional[bool] = False,
+        nworkers: Optional[int] = 1,
+        lprocess: Optional[bool] = False,
+    ) -> list[xr.Dataset]:
+    """Open NetCDF data and run algorithms for an initial data preprocessing
+        for several research parameters. Each NetCDF file is opened, decoded
+        (time axis fix, cell area) and preprocessed only once for all
+        parameters which are in this file. Other arguments are the same as in
+        get_data:
+
+        Input variables:
+
+        lst4pathin - Dataset paths for each research parameter (the same order
+                     as lst4vars), for example: [get_path_in(...)[0] for var in lst4vars]
+        lst4dsnames - Dataset names
+        lst4vars - Research parameters
+        param_var - Names of the research parameters into actual datasets for
+                    each research parameter (the same order as lst4vars)
+        user_params - User settings (class object)
+
+        OUTPUT variables:
+        nc_data - Preprocessed data with all research parameters for each
+                  dataset (the same order as lst4dsnames)
+    """
+    # -- Chunk sizes for lazy mode:
+    ds_chunks = get_settings4chunks(user_params) if llazy else {}
+    # -- Arguments for loading of each file (parameters from the same file
+    #    are loaded together):
+    lst4args, lst4ids = [], []
+    for i in range(len(lst4dsnames)):
+        set4files = {}
+        for j in range(len(lst4vars)):
+            set4files.setdefault(lst4pathin[j][i], []).append((lst4vars[j], param_var[j][i]))
+        for path, lst4pairs in set4files.items():
+            lst4args.append(
+                (path, lst4dsnames[i], [item[0] for item in lst4pairs],
+                 [item[1] for item in lst4pairs], user_params, lresmp,
+                 cache_dir, max_cache_size,
+                 ds_chunks.get(get_ds_family(lst4dsnames[i])) if llazy else None)
+            )
+            lst4ids.append(i)
+    # -- Preprocessing of netcdf data:
+    nc_files = load_datasets(lst4args, nworkers = nworkers, lprocess = lprocess)
+    # -- Merge parameters from different files of the same dataset:
+    nc_data = []
+    for i in range(len(lst4dsnames)):
+        lst4files = [nc_files[j] for j in range(len(nc_files)) if lst4ids[j] == i]
+        nc_data.append(
+            lst4files[0] if len(lst4files) == 1 else
+            xr.merge(lst4files, compat = 'override', join = 'inner'))
     return nc_data
 
 
@@ -403,6 +743,7 @@ def get_interpol(
         domain:str,
         var:str,
         user_params: config,
+        method: Optional[str] = 'nearest',
     ) -> list[xr.DataArray]:
     """Get data from NetCDF at the same grid as OCN:
 
@@ -411,8 +752,11 @@ def get_interpol(
     lst4data - Data from the actual datasets
     lst4dsnames -Names of the research datasets
     domain - Research region
-    var - Research parameter.
+    var - Research parameter (or list of parameters, results of get_data_vars).
+          Data are selected for the common time period of all parameters
     user_params - User settings (class object)
+    method - Regridding method: 'nearest' or 'conservative' (area-weighted,
+             total burned area is kept). Default is 'nearest'
 
     OUTPUT variables:
 
@@ -426,6 +770,7 @@ def get_interpol(
     # Dataset time limits (correct format):
     dom_lim = get_settings4domains(user_params)
     tim_lim = get_settings4ds_time_limits(user_params)
+    lst4vars = [var] if isinstance(var, str) else list(var)
 
     # -- Get simular grids for research domain:
     grid4domain = []
@@ -436,6 +781,9 @@ def get_interpol(
             ds_name = lst4dsnames[i][0:3]
         else:
             ds_name = lst4dsnames[i]
+        # -- Common time period of research parameters:
+        tstart = max(tim_lim.get(item).get(ds_name)[0] for item in lst4vars)
+        tstop  = min(tim_lim.get(item).get(ds_name)[1] for item in lst4vars)
         # -- Get simular datasets:
         act_ds = lst4data[i].sel(
             # -- Slice by latitudes:
@@ -443,15 +791,14 @@ def get_interpol(
             # -- Slice by longitudes:
             lon  = slice(dom_lim.get(domain)[2], dom_lim.get(domain)[3]),
             # -- Time slice
-            time = slice(f'{tim_lim.get(var).get(ds_name)[0]}',
-                         f'{tim_lim.get(var).get(ds_name)[1]}')
+            time = slice(f'{tstart}', f'{tstop}')
         )
         # -- Define grid for interpolation (on this grid will be interpolation)
         if lst4dsnames[i][0:3] == ocn_id:
             inter2grid = act_ds
 
-        if ((lst4dsnames[i] == 'JUL_S2Diag') and (var == 'burned_area')):
-            act_ds = act_ds / 13.5
+        if ((lst4dsnames[i] == 'JUL_S2Diag') and ('burned_area' in lst4vars)):
+            act_ds['burned_area'] = act_ds['burned_area'] / 13.5
         # -- Add new data to the list:
         grid4domain.append(act_ds)
 
@@ -459,15 +806,27 @@ def get_interpol(
     for i in range(len(lst4dsnames)):
         # -- Select no OCN simulations
         if lst4dsnames[i][0:3] != ocn_id:
+            lst4parts = [grid4domain[i].drop_vars('area', errors = 'ignore')]
             # 2.1: Run upscalling for burned area
-            if ((var == 'burned_area') and (lst4dsnames[i][0:3] != orc_id) and
+            if (('burned_area' in lst4vars) and (lst4dsnames[i][0:3] != orc_id) and
                 (lst4dsnames[i][0:3] != jul_id)):
 
-                res360_720 = lib4ups.get_upscaling_ba(grid4domain[i], var, lreport = False)
-                grid4domain[i] = res360_720.to_dataset(name = var)
-            # 2.2: Run interpolation to OCN grid (all parameters) -> time ignore
-            grid4domain[i] = grid4domain[i].interp_like(
-                inter2grid.drop_dims('time'), method = 'nearest')
+                # -- Check of totals computes data, it is skipped in lazy mode:
+                res360_720 = lib4ups.get_upscaling_ba(
+                    grid4domain[i], 'burned_area', lreport = False,
+                    lcheck = grid4domain[i]['burned_area'].chunks is None)
+                # -- Other parameters are regridded from the original grid:
+                lst4parts = [res360_720.to_dataset(name = 'burned_area')] + (
+                    [lst4parts[0].drop_vars('burned_area')] if len(lst4vars) > 1 else [])
+            # 2.2: Run regridding to OCN grid (all parameters). Weights are
+            #      computed once for each pair of grids (lib4regrid):
+            lst4parts = [
+                lib4regrid.regrid_dataset(
+                    part, inter2grid, method = method, lst4extensive = ['burned_area'])
+                for part in lst4parts
+            ]
+            grid4domain[i] = (lst4parts[0] if len(lst4parts) == 1 else
+                              xr.merge(lst4parts, compat = 'override'))
             # 2.3: Add a new field with area information to current datasets
             grid4domain[i] = (
                 grid4domain[i].assign(
@@ -497,42 +856,17 @@ def annual_mean(ds_data:list[xr.Dataset], var:str) -> list[xr.Dataset]:
 
         annual_values - Annual values of the research parameter
      """
-    # -- Get year sum or mean values: ds - actual dataset, method: mean or sum
-    def agg(ds, method):
-        if method == 'sum':
-            return ds.sum(dim = {'lat', 'lon'}).groupby('time.year').sum()
-        else:
-            return ds.sum(dim = {'lat', 'lon'}).groupby('time.year').mean()
-    # -- Define convertation coefficients:
-    orig    = 1.0   # use original units
-    no_area = 1.0   # cases when research parameters doesn't depend on area
-    kgc2pgc = 1e-12 # kgC --> PgC
-    gc2pgc  = 1e-15 #  gC --> PgC
-    set_rec_coef = {
-        'burned_area' : orig,
-        'lai' : orig,
-        'cVeg' : kgc2pgc,
-        'npp' : gc2pgc,
-        'gpp' : gc2pgc,
-        'nee' : gc2pgc,
-        'nbp' : gc2pgc ,
-        'fFire' : gc2pgc,
-    }
-    # -- Convert units into correct format: In case of: burned area - no changes
-    # lai - values by area , cVeg --> from gC m-2 to PgC, other --> from kgC m-2 to PgC
+    # -- Units, area weights and time method are in lib4regions.get_agg_settings:
+    # burned area - no changes, lai - values by area, cVeg --> from kgC m-2 to PgC,
+    # other --> from gC m-2 to PgC. Whole domain is one region:
     annual_values = []
     for act_ds in ds_data:
-        # -- Define area - values
-        area = act_ds['area'] if var != 'burned_area' else no_area
-        param = act_ds[var] * area * set_rec_coef.get(var)
-        # -- Define final values:
-        if   var == 'cVeg':
-            annual_values.append(agg(param, 'mean'))
-        elif var == 'lai':
-            temp = param / area.sum(dim = {'lat', 'lon'})
-            annual_values.append(agg(temp, 'mean'))
-        else:
-            annual_values.append(agg(param, 'sum'))
+        masks = lib4regions.get_region_masks(
+            [np.ones((act_ds.sizes['lat'], act_ds.sizes['lon']))])
+        table = lib4regions.aggregate_regions(
+            [act_ds], ['domain'], var, masks, ['domain'])
+        annual_values.extend(
+            lib4regions.table2annual(table, ['domain'], 'domain', name = var))
     return annual_values
 
 
@@ -36,19 +36,20 @@ Version    Date       Name
            Code refactoring + transfered get_figure4lcc function to vis_controls module
     1.6    2023-11-13 Evgwenii Churiulin, MPI-BGC
            Updated code according to packedge import and changes in user_settings
+    1.7    2026-10-16 MPI-BGC
+           get_trend uses NaN-aware trend engine (get_linear_trend)
 """
 
 # =============================     Import modules     ===================
 import os
 import sys
 sys.path.append(os.path.join(os.getcwd(), '..'))
-import numpy as np
 import xarray as xr
 import warnings
 warnings.filterwarnings("ignore")
 from settings import logical_settings, get_path_in, get_output_path, get_modis_pft, config
 from libraries import makefolder, get_data
-from calc import get_figure4lcc
+from calc import get_figure4lcc, get_linear_trend
 
 # =============================   Personal functions   ==================
 
@@ -102,18 +103,8 @@ def get_trend(
     lst4trends = []
     for vclass in veg_classes:
         if vclass['index'] in (numb):
-            # Get data
-            data4trend = ds[:, vclass['index'], :, :].values
-            year4trend = ds[:, vclass['index'], :, :].time.dt.year.values
-            # Reshape to an array with as many rows as years and as
-            # many columns as there are pixels
-            val = data4trend.reshape(len(year4trend), -1)
-            # Do a first-degree polyfit
-            regressions = np.polyfit(year4trend, val, 1)
-            # Get the coefficients back
-            trends = regressions[0,:].reshape(data4trend.shape[1],
-                                              data4trend.shape[2])
-            trends = xr.DataArray(trends, name = 'trends')
+            # Linear trend (NaN values are masked for each grid point)
+            trends = get_linear_trend(ds[:, vclass['index'], :, :])['trends']
             lst4trends.append(trends)
     return lst4trends
 
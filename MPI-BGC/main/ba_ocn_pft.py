@@ -18,13 +18,14 @@ Version    Date       Name
            Set enviroments to personal modules, adapted to global MPI-BGC project
     1.3    2023-05-15 Evgenii Churiulin, MPI-BGC
            Code rafactoring + transfered get_figure4lcc function to vis_controls module
+    1.4    2026-10-16 MPI-BGC
+           Time trends are calculated by NaN-aware trend engine (get_linear_trend)
 """
 
 # =============================     Import modules     ===================
 # 1.1: Standard modules
 import os
 import sys
-import numpy as np
 import pandas as pd
 import xarray as xr
 
@@ -32,7 +33,7 @@ import xarray as xr
 sys.path.append(os.path.join(os.getcwd(), '..'))
 from settings import logical_settings, get_path_in, get_output_path, config, get_ocn_pft
 from libraries import makefolder, comp_area_lat_lon
-from calc import get_figure4lcc
+from calc import get_figure4lcc, get_linear_trend
 
 # =============================   Personal functions   ===================
 
@@ -128,17 +129,8 @@ if __name__ == '__main__':
         lst4mean.append(ba_pft[:, vclass['index'], :, :].mean('time'))
         # -- Calculating STD values:
         lst4std.append(ba_pft[ :, vclass['index'], :, :].std('time' ))
-        # -- Calculating TREND values:
-        data4trend = ba_pft[:, vclass['index'], :, :].values
-        year4trend = ba_pft[:, vclass['index'], :, :].time.dt.year.values
-        # Reshape to an array with as many rows as years and as many columns as there are pixels:
-        val = data4trend.reshape(len(year4trend), -1)
-        # Do a first-degree polyfit
-        regressions = np.polyfit(year4trend, val, 1)
-        # Get the coefficients back
-        trends = regressions[0,:].reshape(data4trend.shape[1], data4trend.shape[2])
-        trends = xr.DataArray(trends, name = 'trends')
-        lst4trend.append(trends)
+        # -- Calculating TREND values (NaN values are masked for each grid point):
+        lst4trend.append(get_linear_trend(ba_pft[:, vclass['index'], :, :])['trends'])
 
     # -- Visualization:
     if lplot  == True:
@@ -25,6 +25,9 @@ Version    Date       Name
            Code refactoring
     1.7    2023-11-13 Evgenii Churiulin, MPI-BGC
            Make changes in user settings and functions due to changes in import modules
+    1.8    2026-10-17 MPI-BGC
+           Burned area and fFire are read from one open and regridding pass
+           for each dataset (get_data_vars)
 """
 # =============================     Import modules     =================
 import os
@@ -34,41 +37,41 @@ import warnings
 warnings.filterwarnings("ignore")
 from settings import (logical_settings, config, get_path_in, get_output_path,
     get_settings4ds_time_limits)
-from libraries import get_data, get_interpol, makefolder
+from libraries import get_data_vars, get_interpol, makefolder
 from libraries import create_fast_xarray_plot as xrplot
 from calc import Statistic, collage_plot
 
 # =============================   Personal functions   =================
 def read_data(
-    region:str, lst4datasets:list[str], var :str, lsettings:dict[bool],
+    region:str, lst4datasets:list[str], lst4vars:list[str], lsettings:dict[bool],
     uconfig:config) -> tuple[list]:
-    """Get data presented on OCN grid for your research parameter:
+    """Get data presented on OCN grid for your research parameters:
 
         **Input variables:**
         region - Research domain (Global, Europe, Other..);
         lst4datasets - Research dataset names;
-        var - Research parameter (common for all -> nc attribute);
+        lst4vars - Research parameters (common for all -> nc attribute);
         lsettings - Logical parameters?
         uconfig - Class object with user settings
 
         ** Output variables:**
-        lst4data -
+        lst4data - Data with all research parameters for each dataset
     """
     # -- Start computations:
     # -- Get data paths and NetCDF attributes:
-    ipaths, res_param = get_path_in(lst4datasets, var, lsettings)
-    # -- Read data:
-    lst4data = get_data(
-        ipaths,
+    lst4paths = [get_path_in(lst4datasets, var, lsettings) for var in lst4vars]
+    # -- Read data (each file is opened only once for all parameters):
+    lst4data = get_data_vars(
+        [item[0] for item in lst4paths],
         lst4datasets,
-        var,
-        res_param,
+        lst4vars,
+        [item[1] for item in lst4paths],
         uconfig,
         linfo = lsettings.get('lnc_info'),
         lresmp = True,
     )
     # -- Upscalling data:
-    lst4data = get_interpol(lst4data, lst4datasets, region, var, uconfig)
+    lst4data = get_interpol(lst4data, lst4datasets, region, lst4vars, uconfig)
     return lst4data
 
 
@@ -154,14 +157,13 @@ if __name__ == '__main__':
     # =============================    Main program   ======================
     print('START program')
     # -- Get burned area and fFire data:
-    lst4ba = read_data(region, dtset_list, param_ba, lsets, tlm)
-    lst4fFire = read_data(region, dtset_list, param_fFire, lsets, tlm)
+    lst4data = read_data(region, dtset_list, [param_ba, param_fFire], lsets, tlm)
     # -- Test for coefficients
-    ba_coef = ((lst4ba[1]['burned_area']).mean('time') /
-               (lst4ba[0]['burned_area']).mean('time') )
+    ba_coef = ((lst4data[1]['burned_area']).mean('time') /
+               (lst4data[0]['burned_area']).mean('time') )
 
-    ffire_coef = ((lst4fFire[1]['fFire']).mean('time') /
-                  (lst4fFire[0]['fFire']).mean('time') )
+    ffire_coef = ((lst4data[1]['fFire']).mean('time') /
+                  (lst4data[0]['fFire']).mean('time') )
     # -- Create simple plots for understanding:
     xrplot(ba_coef, 'plot_BA_diff', plt_settings)
     xrplot(ffire_coef, 'plot_fFire_diff', plt_settings)
@@ -170,8 +172,8 @@ if __name__ == '__main__':
     for i in range(len(dtset_list)):
         # gC m-2 yr-1 --> gC yr-1:
         temp_res = (
-            (lst4fFire[i]['fFire'] * lst4fFire[i]['area'] * g2kg) /
-            (lst4ba[i]['burned_area'] * km2m))
+            (lst4data[i]['fFire'] * lst4data[i]['area'] * g2kg) /
+            (lst4data[i]['burned_area'] * km2m))
         data_final.append(temp_res)
     # -- Get statistical values (MEAN, STR, TRENDs):
     lst4mean = stat.timmean(dtset_list, data_final, var = None)
@@ -59,19 +59,46 @@ Version    Date       Name
            Code refactoring
     1.6    2023-11-13 Evgenii Churiulin, MPI-BGC
            Code refactoring
+    1.7    2026-10-16 MPI-BGC
+           Main program was split into functions (get_run_settings, load_data,
+           run_postprocessing) with wall time of each stage. Functions are used
+           by batch driver fire_xarray_batch.py (all domains and parameters in
+           one process)
+    1.8    2026-10-17 MPI-BGC
+           Added dependency graph of stages (build_pipeline, run_pipeline):
+           stages with unchanged inputs are skipped, results are reused
+    1.9    2026-10-17 MPI-BGC
+           Figures of run_postprocessing are rendered by queue of plot jobs in
+           pool of processes (nplot)
+    1.10   2026-10-17 MPI-BGC
+           Difference maps are calculated by Statistic.get_skill_matrix (get_diff_stats,
+           all references against all datasets in one pass), bias, RMSE and
+           pattern correlation are saved into *_skill.csv
+    1.11   2026-10-17 MPI-BGC
+           Store of statistics has own flag (lstore), lcache is used only for
+           cache of preprocessed data (load_data, build_pipeline)
 """
 # =============================     Import modules     ==================
 import os
 import sys
+import time
+from contextlib import contextmanager
+import xarray as xr
+from typing import Optional
 sys.path.append(os.path.join(os.getcwd(), '..'))
 import warnings
 warnings.filterwarnings("ignore")
 
 from settings import (logical_settings, lcalc_settings, config, get_settigs4_annual_plots,
-    get_settings4maps, get_path_in, get_output_path, get_settings4ds_time_limits,
-    get_settings4diff_data, get_parameters)
-from libraries import makefolder, get_data, get_interpol, annual_mean
-from calc import Statistic, one_point_calc, one_linear_plot, one_plot, collage_plot
+    get_settings4maps, get_path_in, get_output_path, get_settings4diff_data,
+    get_parameters, get_settings4ds_time_limits, get_settings4ocn_orc_ndep,
+    get_settings4domains, get_settings4plots, get_settigs4subplots, get_settigs4maps,
+    get_settigs4maps_diff, get_limits4annual_plots)
+from libraries import (makefolder, get_data, get_interpol, annual_mean, set_grid_cache_dir,
+    Pipeline, get_file_stamp, get_ds_family, lib4xarray, lib4regrid, lib4upscaling_support,
+    lib4visualization)
+from calc import (Statistic, one_point_calc, one_linear_plot, one_plot, collage_plot,
+                  stack_datasets, update_suff_stats, get_stats_grids, RenderQueue)
 # =============================   Personal functions   ==================
 
 def plt_title_and_output_name(
@@ -100,46 +127,81 @@ def plt_title_and_output_name(
     # -- Difference plot
     elif (stp == 'DIFF'):
         title = (
-            f'Difference ({refer} - {comp_ds}) in {svname} '
-            f'over {region} region ({yr1} - {yr2})')
+            f'Difference ({ref} - {comp}) in {svn} '
+            f'over {reg} region ({yr1} - {yr2})')
         path_OUT = (pout + f'Diff_{svn}_{ref}_{comp}_{reg}.{ptf}')
     else: # wildcard
         raise TypeError('Incorrect type of statistical parameter')
     return title, path_OUT
 
 
-if __name__ == '__main__':
-    # ================   User settings (have to be adapted)  ================
-    # -- Settings for research domain and parameter:
-    #    You can run this script manually for your research domain and parameter or
-    #    you can set them in run_ocn_postprocessing.sh script.
-
-    # -- Manual mode (uncomment these lines):
-    #start_year = 2003
-    #end_year = 2010
-    #region = 'Global'
-    #param_var = 'burned_area'
-
-    # -- Automatic mode (uncomment these lines)
-    start_year = int(sys.argv[1])
-    end_year = int(sys.argv[2])
-    region  = sys.argv[3]
-    param_var = sys.argv[4]
-    print('Actual research domain - fire_xarray:',region)
-    print('Actual research parameter - fire_xarray:', param_var)
-
-    # -- Load basic logical settings:
-    lsets = logical_settings(
-        lcluster = True,        # Are you working on cluster?
-        lnc_info = False,       # Do you want to get more information about data?
-        station_mode = False,   # Do you want to get values for stations
-        lvis_lines = False,      # Do you want to visualize data (line plots)
-        lBasemap_moment = True,# Do you want to visualize data on grid for one moment?
+@contextmanager
+def stage_time(timer:dict, stage:str):
+    """Add wall time of the stage (with block) to timer {stage: seconds}"""
+    tstart = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer[stage] = timer.get(stage, 0.0) + time.perf_counter() - tstart
+
+
+def get_diff_stats(
+        stat:Statistic, lst4dsnames:list[str], refer:str, comp_ds:str,
+        lst4mean:list[xr.DataArray], lst4std:list[xr.DataArray],
+        lst4trends:list[xr.DataArray], path_OUT:str,
+    ) -> tuple[list[xr.DataArray], list[xr.DataArray], list[xr.DataArray]]:
+    """Differences (refer - comp_ds) of mean, std and trends. Skill matrix
+    (get_skill_matrix) is calculated once for all references (refer and all
+    observations: ESA and GFED datasets) against all datasets, pair of refer
+    and comp_ds is selected from it. Bias, RMSE and pattern correlation of all
+    pairs are saved into path_OUT (csv). Output lists are the same as lists of
+    Statistic.get_difference: [reference_ds, comparison_ds, diff]"""
+    lst4refer = [refer] + [
+        ds_name for ds_name in lst4dsnames
+        if ds_name != refer and get_ds_family(ds_name) in ('ESA', 'GFED')]
+    lst4stats = {'mean': lst4mean, 'std': lst4std, 'trends': lst4trends}
+    stat4all = xr.Dataset({
+        name: xr.concat(
+            [lst4data[i].drop_vars(['dataset', 'area'], errors = 'ignore')
+             for i in range(len(lst4dsnames))],
+            dim = xr.DataArray(lst4dsnames, dims = 'dataset', name = 'dataset'),
+            join = 'inner', coords = 'minimal', compat = 'override')
+        for name, lst4data in lst4stats.items()
+    })
+    skill = stat.get_skill_matrix(stat4all, lst4refer)
+    skill[[f'{name}_{score}' for name in lst4stats for score in ('bias', 'rmse', 'corr')]
+          ].to_dataframe().to_csv(path_OUT)
+    iref  = lst4dsnames.index(refer)
+    icomp = lst4dsnames.index(comp_ds)
+    return tuple(
+        [lst4data[iref], lst4data[icomp],
+         skill[f'{name}_diff'].sel(refer = refer, dataset = comp_ds, drop = True
+            ).transpose(*lst4data[iref].dims).rename(lst4data[iref].name)]
+        for name, lst4data in lst4stats.items()
     )
-    # -- Load other logical parameters:
-    lmodis_nat = True          # Use natural PFT or all
-    lfire = True                # Is fire_xarray script active?
 
+
+def get_run_settings(
+        start_year:int,
+        end_year:int,
+        param_var:str,
+        lsets:dict,
+        lmodis_nat: Optional[bool] = True,
+    ) -> dict:
+    """Get settings of research parameter (the same for all domains):
+
+        Input variables:
+        start_year, end_year - Time period
+        param_var - Research parameter
+        lsets - Basic logical settings (logical_settings)
+        lmodis_nat - Use natural PFT or all for BA_MODIS. Default is True
+
+        OUTPUT variables:
+        sets - Settings: user class with settings ('tlm'), dataset names
+               ('lst4dsnames'), input paths ('ipaths') and NetCDF attributes
+               ('res_param'), output path ('data_OUT') and names and units of
+               research parameter ('svname', 'lvname', 'lp_units', 'cp_units')
+    """
     # -- Load basic user settings:
     # -- There is not a strict time rule to time axis:
     if lsets.get('lvis_lines'):
@@ -200,23 +262,112 @@ if __name__ == '__main__':
     # lp_units - Units for 2D plots, cp_units - Units for 3D plots
     svname, lvname, lp_units, cp_units = get_parameters(
         lst4dsnames, param_var, lsets)
+    return {
+        'tlm'         : tlm,
+        'lst4dsnames' : lst4dsnames,
+        'ipaths'      : ipaths,
+        'res_param'   : res_param,
+        'data_OUT'    : data_OUT,
+        'svname'      : svname,
+        'lvname'      : lvname,
+        'lp_units'    : lp_units,
+        'cp_units'    : cp_units,
+    }
+
+
+def load_data(
+        sets:dict,
+        param_var:str,
+        lsets:dict,
+        lcache: Optional[bool] = True,
+        llazy: Optional[bool] = False,
+        nworkers: Optional[int] = 4,
+    ) -> list[xr.Dataset]:
+    """Get data from NetCDF files (global data, the same for all domains):
+
+        Input variables:
+        sets - Settings of research parameter (get_run_settings)
+        param_var - Research parameter
+        lsets - Basic logical settings (logical_settings)
+        lcache - Do you want to use cache of preprocessed data? Default is True
+        llazy - Do you want to read data lazily (Dask chunks)? Default is False
+        nworkers - Number of workers for parallel loading of datasets. Default is 4
+
+        OUTPUT variables:
+        lst4data - Data from the actual datasets
+    """
+    # -- Cell area of grids is saved on disk:
+    if lcache:
+        set_grid_cache_dir(get_output_path(lsets).get('cache4grids'))
+    return get_data(
+        sets.get('ipaths'), sets.get('lst4dsnames'), param_var,
+        sets.get('res_param'), sets.get('tlm'),
+        cache_dir = get_output_path(lsets).get('cache4get_data') if lcache else None,
+        llazy = llazy, nworkers = nworkers)
+
+
+def run_postprocessing(
+        lst4data:list[xr.Dataset],
+        sets:dict,
+        start_year:int,
+        end_year:int,
+        region:str,
+        param_var:str,
+        lsets:dict,
+        lcalc: Optional[dict] = None,
+        lstore: Optional[bool] = True,
+        lfire: Optional[bool] = True,
+        regrid_method: Optional[str] = 'nearest',
+        timer: Optional[dict] = None,
+        nplot: Optional[int] = 1,
+        lstack: Optional[bool] = False,
+    ) -> dict:
+    """Run all stages of postprocessing (regridding, stations, annual plots,
+       statistics and maps) for one research domain. Figures are collected as
+       plot jobs and rendered at the end (RenderQueue):
+
+        Input variables:
+        lst4data - Data from the actual datasets (load_data). Data are not
+                   changed, research domain is selected from them
+        sets - Settings of research parameter (get_run_settings)
+        start_year, end_year - Time period
+        region - Research domain
+        param_var - Research parameter
+        lsets - Basic logical settings (logical_settings)
+        lcalc - Logical settings for computation (lcalc_settings). Important
+                if lBasemap_moment is True. Default is None
+        lstore - Do you want to use store of statistics (statistics are updated
+                 only with new timesteps)? Default is True
+        lfire - Is fire_xarray script active? Default is True
+        regrid_method - Regridding to OCN grid: 'nearest' or 'conservative'.
+                        Default is 'nearest'
+        timer - Wall time of stages {stage: seconds}, new values are added.
+                Default is None (new timer)
+        nplot - Number of processes for rendering of figures. Default is 1
+                (figures are rendered in actual process)
+        lstack - Do you want to calculate statistics for all datasets at once
+                 (stack_datasets, store of statistics is not used)? All
+                 datasets are copied into one array (peak memory is about
+                 the sum of all datasets). Default is False (dataset by dataset)
+
+        OUTPUT variables:
+        timer - Wall time of stages {stage: seconds}. ValueError is raised
+                if some figures were not rendered (after all plot jobs)
+    """
+    timer = timer if timer is not None else {}
+    lcalc = lcalc if lcalc is not None else {}
+    queue = RenderQueue(nprocs = nplot)
+    tlm = sets.get('tlm')
+    lst4dsnames = sets.get('lst4dsnames')
+    data_OUT = sets.get('data_OUT')
+    svname, lvname = sets.get('svname'), sets.get('lvname')
+    print('Actual research domain - fire_xarray:', region)
+    print('Actual research parameter - fire_xarray:', param_var)
 
-    # -- Load extra logical settings for computation (active if lBasemap_moment if True):
+    # -- Settings for maps (active if lBasemap_moment if True):
     if lsets.get('lBasemap_moment'):
-        lcalc = lcalc_settings(
-            lstat = True,           # Activate algorithm for mean, std and trends calculations?
-            lmean_plot = False,      # Activate algorithm for mean visualization (one figure)?
-            lstd_plot = False,       # Activate algorithm for std visualization (one figure)?
-            ltrend_plot = False,     # Activate algorithm for trends visualization (one figure)?
-            lcollage = True,        # Activate algorithm for collage plots: mean, std, trend
-            ldiff_calc = True,      # Activate algorithm for difference calculations?
-        )
         # -- Define y axis labal for all figures (plots):
-        bm_ylabel = f'{svname}, {cp_units}'
-        # -- Get time limits for plot titles and output names:
-        frs_yr = get_settings4ds_time_limits(tlm).get(param_var).get('OCN')[0]
-        lst_yr = get_settings4ds_time_limits(tlm).get(param_var).get('OCN')[1]
-
+        bm_ylabel = f'{svname}, {sets.get("cp_units")}'
         # -- Get title and output names for maps (MEAN, STD, TREND, COLLAGE):
         m_title, m_path_OUT = plt_title_and_output_name(
             lst4dsnames, data_OUT,
@@ -261,56 +412,57 @@ if __name__ == '__main__':
             )
             # -- Fast control: Check datasets (refer and comp_ds) in lst4dsnames:
             if ((refer not in lst4dsnames) and (comp_ds not in lst4dsnames)):
-                print('There are no datasets (reference or experiment) in lst4dsnames.'
-                      ' Please, correct data in user_settings \n')
-                sys.exit()
-
+                raise ValueError('There are no datasets (reference or experiment) in '
+                                 'lst4dsnames. Please, correct data in user_settings')
 
-    # =============================    Main program   =======================
-    print('START program')
-    # -- Get data from NetCDF files:
-    lst4data = get_data(ipaths, lst4dsnames, param_var, res_param, tlm)
     # -- Convert data to one grid size (upscalling or interpolation):
-    lst4data = get_interpol(lst4data, lst4dsnames, region, param_var, tlm)
+    with stage_time(timer, 'get_interpol'):
+        lst4data = get_interpol(
+            lst4data, lst4dsnames, region, param_var, tlm, method = regrid_method)
 
     # -- Step 1: Create annual plots for stations and for selected domains:
     # -- Get one point data
     if lsets.get('station_mode') and region == 'Global':
         print(f'One point mode - domain {region} \n')
-        points_test = one_point_calc(
-            lst4dsnames,
-            lst4data,
-            param_var,
-            lvname,
-            svname,
-            data_OUT,
-            region,
-            tlm,
-            tstart = start_year,
-        )
+        with stage_time(timer, 'stations'):
+            one_point_calc(
+                lst4dsnames,
+                lst4data,
+                param_var,
+                lvname,
+                svname,
+                data_OUT,
+                region,
+                tlm,
+                tstart = start_year,
+                queue = queue,
+            )
 
     # -- Preparing data and creating linear annual plots based on them:
     if lsets.get('lvis_lines'):
         # -- Get user settings for annual plots (title, y label, output name, legend location):
         user_plt_settings = {
             'title' : f'{lvname} over {region} region ',
-            'ylabel' : f'{svname}, {lp_units}',
+            'ylabel' : f'{svname}, {sets.get("lp_units")}',
             'output_name' : f'{svname}_{region}.png',
             'legend_pos' : 'upper left',
         }
-        # -- Get annual mean data
-        amean = annual_mean(lst4data, param_var)
-        # -- Create plots:
-        one_linear_plot(
-            lst4dsnames,
-            region,
-            param_var,
-            amean,
-            user_plt_settings,
-            data_OUT,
-            tlm,
-            tstart = start_year,
-        )
+        with stage_time(timer, 'annual_plots'):
+            # -- Get annual mean data
+            amean = annual_mean(lst4data, param_var)
+            # -- Create plots:
+            queue.add(
+                data_OUT + user_plt_settings.get('output_name'),
+                one_linear_plot,
+                lst4dsnames,
+                region,
+                param_var,
+                amean,
+                user_plt_settings,
+                data_OUT,
+                tlm,
+                tstart = start_year,
+            )
 
     # -- Step 2: Create maps based on grid points:
     if lsets.get('lBasemap_moment'):
@@ -319,95 +471,433 @@ if __name__ == '__main__':
         # -- Get actual latitudes and longitudes for each dataset:
         lst4lat = [lst4data[i].lat.values for i in range(len(lst4data))]
         lst4lon = [lst4data[i].lon.values for i in range(len(lst4data))]
+        # -- Statistical parameters (maps are created only if they were calculated):
+        lst4mean = lst4std = lst4trends = None
 
         # -- Statistical parameters calculations (MEAN, STD, Time TREND):
         if lcalc.get('lstat'):
-            lst4mean = stat.timmean(lst4dsnames, lst4data, param_var, fire_xarray = lfire)
-            lst4std  = stat.timstd(lst4dsnames, lst4data, param_var, fire_xarray = lfire)
-            lst4trends = stat.timtrend(lst4dsnames, lst4data, param_var, fire_xarray = lfire)
-        # -- Visualization of statistical parameters (MAP for each parameter):
-        # -- Create 2D  MEAN map:
-        if lcalc.get('lmean_plot'):
-            one_plot(
-                lst4dsnames,
-                'mean',
-                region, lst4lon, lst4lat,
-                lst4mean,
-                param_var,
-                bm_ylabel, m_title, m_path_OUT,
-                tlm,
-            )
-        # -- Create 2D STD map:
-        if lcalc.get('lstd_plot'):
-            one_plot(
-                lst4dsnames,
-                'std',
-                region, lst4lon, lst4lat,
-                lst4std,
-                param_var,
-                bm_ylabel, s_title, s_path_OUT,
-                tlm,
-            )
-        # -- Create 2D TREND map:
-        if lcalc.get('ltrend_plot'):
-            one_plot(
-                lst4dsnames,
-                'trend',
-                region, lst4lon, lst4lat,
-                lst4trends,
-                param_var,
-                bm_ylabel, t_title, t_path_OUT,
-                tlm,
-            )
-        # -- Create collage figure with 2D maps (mean, std, trend):
-        if lcalc.get('lcollage'):
-            collage_plot(
-                # datasets
-                lst4dsnames,
-                # region, lon, lat
-                region, lst4lon, lst4lat,
-                # MEAN, STD, TREND stat. data
-                lst4mean, lst4std, lst4trends,
-                # parameter
-                param_var,
-                # y label, plot title, output path
-                bm_ylabel, c_title, c_path_OUT,
-                # user class with settings
-                tlm,
-                # diff mode = False
-                ldiff = False,
-            )
+            with stage_time(timer, 'statistics'):
+                # -- Data are read only once for all parameters. With store,
+                #    statistics are updated only with new timesteps:
+                if lstack:
+                    # -- All datasets are processed at once (stacked along 'dataset'
+                    #    dimension), lst4mean[i] is data of lst4dsnames[i]:
+                    stat4all = stat.timstats_stacked(
+                        stack_datasets(lst4dsnames, lst4data, param_var, fire_xarray = lfire))
+                    lst4mean = stat4all['mean'].rename(param_var)
+                    lst4std  = stat4all['std'].rename(param_var)
+                    lst4trends = stat4all['trends']
+                else:
+                    if lstore:
+                        lst4stat = stat.timstats_store(
+                            lst4dsnames, lst4data, param_var,
+                            get_output_path(lsets).get('cache4stats'),
+                            lst4sources = [get_file_stamp(path) for path in sets.get('ipaths')],
+                            fire_xarray = lfire)
+                    else:
+                        lst4stat = stat.timstats(
+                            lst4dsnames, lst4data, param_var, fire_xarray = lfire)
+                    lst4mean = [ds['mean'].rename(param_var) for ds in lst4stat]
+                    lst4std  = [ds['std'].rename(param_var) for ds in lst4stat]
+                    lst4trends = [ds['trends'] for ds in lst4stat]
+        # -- Visualization of statistical parameters (MAP for each parameter),
+        #    one plot job for each figure:
+        with stage_time(timer, 'maps'):
+            for p_mode, lplot, lst4stat, title, path_OUT in (
+                    ('mean', 'lmean_plot', lst4mean, m_title, m_path_OUT),
+                    ('std', 'lstd_plot', lst4std, s_title, s_path_OUT),
+                    ('trend', 'ltrend_plot', lst4trends, t_title, t_path_OUT)):
+                if not lcalc.get(lplot) or lst4stat is None:
+                    continue
+                # -- Create 2D map (MEAN, STD or TREND) for each dataset:
+                for i in range(len(lst4dsnames)):
+                    queue.add(
+                        path_OUT[i],
+                        one_plot,
+                        [lst4dsnames[i]],
+                        p_mode,
+                        region, [lst4lon[i]], [lst4lat[i]],
+                        [lst4stat[i]],
+                        param_var,
+                        bm_ylabel, [title[i]], [path_OUT[i]],
+                        tlm,
+                    )
+            # -- Create collage figure with 2D maps (mean, std, trend):
+            if lcalc.get('lcollage') and lst4mean is not None:
+                queue.add(
+                    c_path_OUT,
+                    collage_plot,
+                    # datasets
+                    lst4dsnames,
+                    # region, lon, lat
+                    region, lst4lon, lst4lat,
+                    # MEAN, STD, TREND stat. data
+                    lst4mean, lst4std, lst4trends,
+                    # parameter
+                    param_var,
+                    # y label, plot title, output path
+                    bm_ylabel, c_title, c_path_OUT,
+                    # user class with settings
+                    tlm,
+                    # diff mode = False
+                    ldiff = False,
+                )
 
         # -- Create collage plot with 2D difference maps (Refer - simulation):
+        if lcalc.get('ldiff_calc') and lst4mean is not None:
+            with stage_time(timer, 'difference'):
+                # -- Get values for difference (mean, std, trend):
+                lst4comp_mean, lst4comp_std, lst4comp_trend = get_diff_stats(
+                    stat, lst4dsnames, refer, comp_ds, lst4mean, lst4std, lst4trends,
+                    dif_path_OUT.replace('.png', '_skill.csv'))
+                # -- Get actual latitude and longitude values:
+                lst4lon = [lst4comp_mean[i].lon.values for i in range(len(lst4comp_mean))]
+                lst4lat = [lst4comp_mean[i].lat.values for i in range(len(lst4comp_mean))]
+                # -- Create difference plot:
+                queue.add(
+                    dif_path_OUT,
+                    collage_plot,
+                    # datasets
+                    lst4comp_mean,
+                    # region, lon, lat
+                    region, lst4lon, lst4lat,
+                    # DIFF MEAN, STR, TREND data
+                    lst4comp_mean, lst4comp_std, lst4comp_trend,
+                    # parameter
+                    param_var,
+                    # y label, title, path out
+                    bm_ylabel, dif_title, dif_path_OUT,
+                    # user class
+                    tlm,
+                    # diff mode = True
+                    ldiff = True,
+                    # reference dataset
+                    refer = refer,
+                    # dataset for comparison
+                    comp_ds = comp_ds,
+                )
+    # -- Step 3: Render all figures (plot jobs):
+    with stage_time(timer, 'render'):
+        report = queue.run()
+    # -- Failed figures are failures of task (status of task in batch summary):
+    lst4failed = report.index[report['status'] != 'OK'].tolist()
+    if lst4failed:
+        raise ValueError(f'{len(lst4failed)} of {len(report)} figures were not '
+                         f'rendered: {", ".join(lst4failed)}')
+    return timer
+
+
+def build_pipeline(
+        sets:dict,
+        start_year:int,
+        end_year:int,
+        region:str,
+        param_var:str,
+        lsets:dict,
+        lcalc: Optional[dict] = None,
+        lcache: Optional[bool] = True,
+        llazy: Optional[bool] = False,
+        lfire: Optional[bool] = True,
+        regrid_method: Optional[str] = 'nearest',
+        lforce: Optional[bool] = False,
+    ) -> tuple[Pipeline, list[str]]:
+    """Create dependency graph of postprocessing stages for one research domain
+       (load --> interpolation --> statistics --> plots). Stages of data are
+       created for each dataset, keys of stages are based on input files,
+       sections of user settings and source code of stage functions. Input
+       variables are the same as in **run_postprocessing**, lforce - run all
+       stages again (default is False).
+
+        OUTPUT variables:
+        dag - Dependency graph of stages (Pipeline)
+        targets - Names of final stages (plots)
+    """
+    lcalc = lcalc if lcalc is not None else {}
+    tlm = sets.get('tlm')
+    lst4dsnames = sets.get('lst4dsnames')
+    data_OUT = sets.get('data_OUT')
+    svname, lvname = sets.get('svname'), sets.get('lvname')
+    bm_ylabel = f'{svname}, {sets.get("cp_units")}'
+    tim_lim = get_settings4ds_time_limits(tlm).get(param_var)
+    # -- Short names of datasets (OCN, JUL, ORC) are used in time settings:
+    short = {name: name[0:3] if name[0:3] in ('OCN', 'JUL', 'ORC') else name
+             for name in lst4dsnames}
+    # -- The last OCN dataset defines the grid for interpolation (get_interpol):
+    ocn_ref = [name for name in lst4dsnames if name[0:3] == 'OCN'][-1]
+    dag = Pipeline(
+        os.path.join(get_output_path(lsets).get('cache4dag'), param_var, region),
+        lforce = lforce)
+    # -- Sections of user settings for plots (only for actual parameter):
+    set4plots = {
+        'colors'  : get_settings4plots(tlm),
+        'subplots': get_settigs4subplots(tlm).get(region),
+        'maps'    : [item for item in get_settigs4maps(tlm).get(region)
+                     if item.get('mode') == param_var],
+        'years'   : [start_year, end_year],
+    }
+
+    # -- Stages of data (for each dataset):
+    for i, ds_name in enumerate(lst4dsnames):
+        def load(i = i, ds_name = ds_name):
+            # -- Data have own cache (lib4cache), stage runs if data are needed
+            return get_data(
+                [sets.get('ipaths')[i]], [ds_name], param_var, [sets.get('res_param')[i]],
+                tlm, llazy = llazy,
+                cache_dir = get_output_path(lsets).get('cache4get_data') if lcache else None)[0]
+
+        def interp(data, ocn = None, ds_name = ds_name):
+            if ocn is None:
+                return get_interpol([data], [ds_name], region, param_var, tlm,
+                                    method = regrid_method)[0]
+            return get_interpol([data, ocn], [ds_name, ocn_ref], region, param_var, tlm,
+                                method = regrid_method)[0]
+
+        def stats(data, ds_name = ds_name):
+            return Statistic().timstats([ds_name], [data], param_var, fire_xarray = lfire)[0]
+
+        dag.add_stage(
+            f'load_{ds_name}', load,
+            params = {
+                'file'     : get_file_stamp(sets.get('ipaths')[i]),
+                'attribute': sets.get('res_param')[i],
+                'time_axis': get_settings4ocn_orc_ndep(tlm).get(short.get(ds_name)),
+                'llazy'    : llazy,
+            },
+            code = [lib4xarray, lib4upscaling_support], lsave = False)
+        dag.add_stage(
+            f'interp_{ds_name}', interp,
+            deps = ([f'load_{ds_name}'] if ds_name[0:3] == 'OCN'
+                    else [f'load_{ds_name}', f'load_{ocn_ref}']),
+            params = {
+                'domain'     : get_settings4domains(tlm).get(region),
+                'time_limits': tim_lim.get(short.get(ds_name)),
+                'method'     : regrid_method,
+            },
+            code = [get_interpol, lib4regrid, lib4upscaling_support])
+        dag.add_stage(
+            f'stats_{ds_name}', stats, deps = [f'interp_{ds_name}'],
+            params = {'lfire': lfire}, code = [Statistic, update_suff_stats, get_stats_grids])
+
+    # -- Stages of plots:
+    targets = []
+    lst4stats = [f'stats_{ds_name}' for ds_name in lst4dsnames]
+    lst4lat = lambda lst4data: [ds.lat.values for ds in lst4data]
+    lst4lon = lambda lst4data: [ds.lon.values for ds in lst4data]
+    if lsets.get('station_mode') and region == 'Global':
+        # -- Output files of stations are not known, stage runs each time:
+        dag.add_stage(
+            'stations',
+            lambda *lst4data: one_point_calc(
+                lst4dsnames, list(lst4data), param_var, lvname, svname, data_OUT,
+                region, tlm, tstart = start_year),
+            deps = [f'interp_{ds_name}' for ds_name in lst4dsnames], lsave = False)
+        targets.append('stations')
+    if lsets.get('lvis_lines'):
+        user_plt_settings = {
+            'title' : f'{lvname} over {region} region ',
+            'ylabel' : f'{svname}, {sets.get("lp_units")}',
+            'output_name' : f'{svname}_{region}.png',
+            'legend_pos' : 'upper left',
+        }
+        dag.add_stage(
+            'annual_plots',
+            lambda *lst4data: one_linear_plot(
+                lst4dsnames, region, param_var, annual_mean(list(lst4data), param_var),
+                user_plt_settings, data_OUT, tlm, tstart = start_year),
+            deps = [f'interp_{ds_name}' for ds_name in lst4dsnames],
+            params = {
+                'plot'  : user_plt_settings,
+                'colors': set4plots.get('colors'),
+                'limits': get_limits4annual_plots(start_year, tlm).get(region).get(param_var),
+            },
+            code = [annual_mean, one_linear_plot, lib4visualization],
+            outputs = [data_OUT + user_plt_settings.get('output_name')])
+        targets.append('annual_plots')
+    if lsets.get('lBasemap_moment') and lcalc.get('lstat'):
+        # -- Maps of one statistical parameter (MEAN, STD, TREND):
+        for stat_param, name, lplot in (('MEAN', 'mean', 'lmean_plot'),
+                                        ('STD', 'std', 'lstd_plot'),
+                                        ('TREND', 'trends', 'ltrend_plot')):
+            if not lcalc.get(lplot):
+                continue
+            title, path_OUT = plt_title_and_output_name(
+                lst4dsnames, data_OUT, stat_param = stat_param,
+                long_name = lvname, short_name = svname, region = region,
+                frs_yr = start_year, lst_yr = end_year)
+            dag.add_stage(
+                f'{name}_plot',
+                lambda *lst4stat, name = name, title = title, path_OUT = path_OUT: one_plot(
+                    lst4dsnames, name[:5] if name == 'trends' else name, region,
+                    lst4lon(lst4stat), lst4lat(lst4stat),
+                    [ds[name].rename(param_var) for ds in lst4stat],
+                    param_var, bm_ylabel, title, path_OUT, tlm),
+                deps = lst4stats, params = {'title': title, **set4plots},
+                code = [one_plot, lib4visualization], outputs = path_OUT)
+            targets.append(f'{name}_plot')
+        # -- Collage figure with 2D maps (mean, std, trend):
+        if lcalc.get('lcollage'):
+            c_title, c_path_OUT = plt_title_and_output_name(
+                lst4dsnames, data_OUT, stat_param = 'COLLAGE',
+                long_name = lvname, short_name = svname, region = region,
+                frs_yr = start_year, lst_yr = end_year)
+            dag.add_stage(
+                'collage',
+                lambda *lst4stat: collage_plot(
+                    lst4dsnames, region, lst4lon(lst4stat), lst4lat(lst4stat),
+                    [ds['mean'].rename(param_var) for ds in lst4stat],
+                    [ds['std'].rename(param_var) for ds in lst4stat],
+                    [ds['trends'] for ds in lst4stat],
+                    param_var, bm_ylabel, c_title, c_path_OUT, tlm, ldiff = False),
+                deps = lst4stats, params = {'title': c_title, **set4plots},
+                code = [collage_plot, lib4visualization], outputs = [c_path_OUT])
+            targets.append('collage')
+        # -- Collage plot with 2D difference maps (Refer - simulation), stage
+        #    depends on statistics of all datasets (skill matrix):
         if lcalc.get('ldiff_calc'):
-            # -- Get values for difference (mean, std, trend):
-            lst4comp_mean  = stat.get_difference(lst4dsnames, refer, comp_ds, lst4mean)
-            lst4comp_std   = stat.get_difference(lst4dsnames, refer, comp_ds, lst4std)
-            lst4comp_trend = stat.get_difference(lst4dsnames, refer, comp_ds, lst4trends)
-            # -- Get actual latitude and longitude values:
-            lst4lon = [lst4comp_mean[i].lon.values for i in range(len(lst4comp_mean))]
-            lst4lat = [lst4comp_mean[i].lat.values for i in range(len(lst4comp_mean))]
-            # -- Create difference plot:
-            collage_plot(
-                # datasets
-                lst4comp_mean,
-                # region, lon, lat
-                region, lst4lon, lst4lat,
-                # DIFF MEAN, STR, TREND data
-                lst4comp_mean, lst4comp_std, lst4comp_trend,
-                # parameter
-                param_var,
-                # y label, title, path out
-                bm_ylabel, dif_title, dif_path_OUT,
-                # user class
-                tlm,
-                # diff mode = True
-                ldiff = True,
-                # reference dataset
-                refer = refer,
-                # dataset for comparison
-                comp_ds = comp_ds,
-            )
+            refer, comp_ds = get_settings4diff_data(
+                ba_refer = 'BA_MODIS', ba_comp = 'OCN_S2Diag_v4',
+                ffire_refer = 'GFED4.1s', ffire_comp = 'OCN_S2Diag_v4').get(param_var)
+            if refer in lst4dsnames and comp_ds in lst4dsnames:
+                dif_title, dif_path_OUT = plt_title_and_output_name(
+                    lst4dsnames, data_OUT, stat_param = 'DIFF',
+                    long_name = lvname, short_name = svname, region = region,
+                    frs_yr = start_year, lst_yr = end_year,
+                    ds4refer = refer, ds4comp = comp_ds)
+
+                def diff_plot(*lst4stat):
+                    # -- Skill matrix: all references against all datasets:
+                    lst4comp_mean, lst4comp_std, lst4comp_trend = get_diff_stats(
+                        Statistic(), lst4dsnames, refer, comp_ds,
+                        [ds['mean'].rename(param_var) for ds in lst4stat],
+                        [ds['std'].rename(param_var) for ds in lst4stat],
+                        [ds['trends'] for ds in lst4stat],
+                        dif_path_OUT.replace('.png', '_skill.csv'))
+                    collage_plot(
+                        lst4comp_mean, region, lst4lon(lst4comp_mean), lst4lat(lst4comp_mean),
+                        lst4comp_mean, lst4comp_std, lst4comp_trend,
+                        param_var, bm_ylabel, dif_title, dif_path_OUT, tlm,
+                        ldiff = True, refer = refer, comp_ds = comp_ds)
+
+                dag.add_stage(
+                    'difference', diff_plot,
+                    deps = lst4stats,
+                    params = {
+                        'title': dif_title,
+                        'maps' : [item for item in get_settigs4maps_diff(tlm).get(region)
+                                  if item.get('mode') == param_var],
+                        **{key: value for key, value in set4plots.items() if key != 'maps'},
+                    },
+                    code = [collage_plot, lib4visualization, get_diff_stats, Statistic],
+                    outputs = [dif_path_OUT, dif_path_OUT.replace('.png', '_skill.csv')])
+                targets.append('difference')
+            else:
+                print('There are no datasets (reference or experiment) in lst4dsnames.'
+                      ' Please, correct data in user_settings \n')
+    return dag, targets
+
+
+def run_pipeline(
+        sets:dict,
+        start_year:int,
+        end_year:int,
+        region:str,
+        param_var:str,
+        lsets:dict,
+        timer: Optional[dict] = None,
+        **kwargs,
+    ) -> dict:
+    """Run postprocessing for one research domain as dependency graph of
+       stages (build_pipeline). Only invalidated stages run again, unchanged
+       results are reused from disk. kwargs - settings of build_pipeline
+
+        OUTPUT variables:
+        timer - Wall time of final stages {stage: seconds}
+    """
+    timer = timer if timer is not None else {}
+    print('Actual research domain - fire_xarray:', region)
+    print('Actual research parameter - fire_xarray:', param_var)
+    # -- Cell area of grids is saved on disk:
+    if kwargs.get('lcache', True):
+        set_grid_cache_dir(get_output_path(lsets).get('cache4grids'))
+    dag, targets = build_pipeline(
+        sets, start_year, end_year, region, param_var, lsets, **kwargs)
+    for target in targets:
+        with stage_time(timer, target):
+            dag.run(target)
+    print(dag.get_report().to_string())
+    return timer
+
+
+if __name__ == '__main__':
+    # ================   User settings (have to be adapted)  ================
+    # -- Settings for research domain and parameter:
+    #    You can run this script manually for your research domain and parameter or
+    #    you can set them in run_ocn_postprocessing.sh script. For all domains and
+    #    parameters in one process use fire_xarray_batch.py
 
+    # -- Manual mode (uncomment these lines):
+    #start_year = 2003
+    #end_year = 2010
+    #region = 'Global'
+    #param_var = 'burned_area'
+
+    # -- Automatic mode (uncomment these lines)
+    start_year = int(sys.argv[1])
+    end_year = int(sys.argv[2])
+    region  = sys.argv[3]
+    param_var = sys.argv[4]
+
+    # -- Load basic logical settings:
+    lsets = logical_settings(
+        lcluster = True,        # Are you working on cluster?
+        lnc_info = False,       # Do you want to get more information about data?
+        station_mode = False,   # Do you want to get values for stations
+        lvis_lines = False,      # Do you want to visualize data (line plots)
+        lBasemap_moment = True,# Do you want to visualize data on grid for one moment?
+    )
+    # -- Load other logical parameters:
+    lmodis_nat = True          # Use natural PFT or all
+    lfire = True                # Is fire_xarray script active?
+    lcache = True               # Do you want to use cache of preprocessed data?
+    lstore = True               # Do you want to use store of statistics (only new timesteps)?
+    llazy = False               # Do you want to read data lazily (Dask chunks)?
+    nworkers = 4                # Number of workers for parallel loading of datasets
+    regrid_method = 'nearest'   # Regridding to OCN grid: 'nearest' or 'conservative'
+    ldag = False                # Do you want to run only changed stages (dependency graph)?
+    nplot = 4                   # Number of processes for rendering of figures
+
+    # -- Load extra logical settings for computation (active if lBasemap_moment if True):
+    lcalc = lcalc_settings(
+        lstat = True,           # Activate algorithm for mean, std and trends calculations?
+        lmean_plot = False,      # Activate algorithm for mean visualization (one figure)?
+        lstd_plot = False,       # Activate algorithm for std visualization (one figure)?
+        ltrend_plot = False,     # Activate algorithm for trends visualization (one figure)?
+        lcollage = True,        # Activate algorithm for collage plots: mean, std, trend
+        ldiff_calc = True,      # Activate algorithm for difference calculations?
+    )
+
+    # =============================    Main program   =======================
+    print('START program')
+    timer = {}
+    # -- Get settings for research parameter:
+    sets = get_run_settings(start_year, end_year, param_var, lsets, lmodis_nat = lmodis_nat)
+    if ldag:
+        # -- Only stages with changed inputs (files, settings, code) run again:
+        run_pipeline(
+            sets, start_year, end_year, region, param_var, lsets, timer = timer,
+            lcalc = lcalc, lcache = lcache, llazy = llazy, lfire = lfire,
+            regrid_method = regrid_method)
+    else:
+        # -- Get data from NetCDF files:
+        with stage_time(timer, 'get_data'):
+            lst4data = load_data(
+                sets, param_var, lsets, lcache = lcache, llazy = llazy, nworkers = nworkers)
+        # -- Run postprocessing for research domain:
+        run_postprocessing(
+            lst4data, sets, start_year, end_year, region, param_var, lsets,
+            lcalc = lcalc, lstore = lstore, lfire = lfire,
+            regrid_method = regrid_method, timer = timer, nplot = nplot)
+    for stage, wtime in timer.items():
+        print(f'{stage:<14}: {wtime:8.2f} s')
     print('END program')
 # =============================    End of program   =====================
@@ -17,20 +17,25 @@ Version    Date       Name
            Initial release
     1.2    2023-11-13 Evgenii Churiulin, MPI-BGC
            Code refactoring + add package import
+    1.3    2026-10-16 MPI-BGC
+           Annual values for all RECCAP2 domains are calculated at once
+           (region x cell matrix, lib4regions)
+    1.4    2026-10-16 MPI-BGC
+           Zonal statistics based on raster of region labels (one pass over
+           data, RECCAP2_regions.nc)
 
 """
 # =============================     Import modules     ==================
 import os
 import sys
 import warnings
-import xarray as xr
 import pandas as pd
 warnings.filterwarnings("ignore")
 sys.path.append(os.path.join(os.getcwd(), '..'))
 from settings import (logical_settings, config, get_path_in, get_output_path,
-    get_parameters, get_settigs4_annual_plots, get_settings4reccap2_domains,
-    get_settings4plots)
-from libraries import get_data, get_interpol, annual_mean, makefolder
+    get_parameters, get_settigs4_annual_plots, get_settings4reccap2_domains)
+from libraries import (get_data, get_interpol, makefolder, read_region_labels,
+    zonal_stats, table2annual)
 from calc import one_linear_plot, seaborn_char_plot
 # =============================   Personal functions   ==================
 
@@ -131,15 +136,15 @@ if __name__ == '__main__':
             param_var,
             tlm,
         )
-        # -- Open dataset with domain mask:
+        # -- Open raster of region labels (get_RECCAP2_mask_domains.py):
+        # PATH WAS CORRECTED -> !!!!!!!!!!
+        labels, lst4regions = read_region_labels(
+            '../RECCAP2_regions.nc', lst4data[0])
+        # -- Get annual sum / mean data for all domains and datasets at once:
+        print('Annual sum / mean values: \n')
+        table = zonal_stats(
+            lst4data, lst4dsnames, param_var, labels, lst4regions)
         for zone in reccap_zone:
-            # PATH WAS CORRECTED -> !!!!!!!!!!
-            ds_mask = xr.open_dataset(
-                f'../{zone}_domain.nc')
-            lst4data_domain = []
-            for i in range(len(lst4data)):
-                lst4data[i]['mask'] = ds_mask['mask']
-                lst4data_domain.append(lst4data[i].where(lst4data[i]['mask'] == 1))
             # -- Get plot settings (title, y_axis_label, output path, legend location):
             user_plt_settings = {
                 'title'       : f'{lvname} over {zone} RECCAP2 domain ',
@@ -154,8 +159,7 @@ if __name__ == '__main__':
                 'legend_pos'  : 'upper left',
             }
             # -- Get annual mean data:
-            print('Annual sum / mean values: \n')
-            amean = annual_mean(lst4data_domain, param_var)
+            amean = table2annual(table, lst4dsnames, zone, name = param_var)
             # -- Create linear plot:
             one_linear_plot(
                 lst4dsnames,
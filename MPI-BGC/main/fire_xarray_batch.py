@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+Batch driver for the main postprocessing system (fire_xarray.py). Script runs
+all research domains and parameters in one process (instead of the loop in
+run_ocn_postprocessing.sh): modules are imported only once, datasets of each
+research parameter are read from NetCDF files only once and all domains are
+selected from data in memory. Results (figures) are the same as results of
+run_ocn_postprocessing.sh. Wall time of each stage is printed and saved in
+timing report (csv).
+
+Tasks (research parameter, domain) can be run in parallel by a process pool
+(nprocs > 1). Number of running tasks is limited by memory budget (mem_budget,
+GB), memory of task is estimated based on the shapes of input datasets (path
+catalogs). Failure of one task doesn't stop other tasks, summary of all tasks
+is printed and saved (tasks_summary.csv).
+
+How to use this script:
+    1. Set your settings in user_settings (the same as for fire_xarray.py);
+    2. Set research domains, parameters and time period in section "User
+       settings" or use command line:
+       python3 fire_xarray_batch.py 2003 2020 Global,Europe,Tropics burned_area,cVeg
+
+Autors of project: Evgenii Churiulin, Ana Bastos
+
+Current Code Owner: MPI-BGC, Evgenii Churiulin
+phone:  +49  170 261-5104
+email:  evgenychur@bgc-jena.mpg.de
+
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-16 MPI-BGC
+           Initial release
+    1.2    2026-10-16 MPI-BGC
+           Added process pool for tasks with memory budget and summary of tasks
+    1.3    2026-10-17 MPI-BGC
+           Tasks can run as dependency graph of stages (ldag)
+    1.4    2026-10-17 MPI-BGC
+           Number of processes for rendering of figures (nplot)
+    1.5    2026-10-17 MPI-BGC
+           Data of research parameter are not kept in pool workers after task
+           (memory of workers is inside of memory budget)
+    1.6    2026-10-17 MPI-BGC
+           Store of statistics has own flag (lstore)
+"""
+# =============================     Import modules     ==================
+import os
+import sys
+import time
+import shutil
+import traceback
+import numpy as np
+import pandas as pd
+import xarray as xr
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+sys.path.append(os.path.join(os.getcwd(), '..'))
+import warnings
+warnings.filterwarnings("ignore")
+
+from settings import logical_settings, lcalc_settings, get_output_path
+from libraries import makefolder
+from fire_xarray import (get_run_settings, load_data, run_postprocessing, run_pipeline,
+    stage_time)
+
+# -- Data of the last research parameter in actual process {param_var: lst4data}:
+data_cache = {}
+
+# =============================   Personal functions   ==================
+
+def estimate_memory(
+        ipaths:list[str], res_param:list[str], factor: Optional[float] = 4.0,
+    ) -> float:
+    """Estimate memory (GB) of task based on shapes of input datasets (only
+       NetCDF headers are read). factor - number of data copies (regridding,
+       statistics). If data can't be opened, file size is used"""
+    nbytes = 0
+    for path, attr in zip(ipaths, res_param):
+        try:
+            with xr.open_dataset(path, decode_times = False) as ds:
+                nbytes += ds[attr].size * np.dtype(np.float64).itemsize
+        except (OSError, KeyError, ValueError):
+            nbytes += os.path.getsize(path) if os.path.exists(path) else 0
+    return nbytes * factor / 1024 ** 3
+
+
+def run_task(param_var:str, region:str, run_args:dict) -> dict:
+    """Run postprocessing for one task (research parameter, domain). Data of
+       research parameter are reused by the next task of the same process
+       (only if 'lkeep_data' is True):
+
+        Input variables:
+        param_var - Research parameter
+        region - Research domain
+        run_args - Settings: 'start_year', 'end_year', 'lsets', 'lcalc',
+                   'lmodis_nat', 'lcache', 'lstore', 'llazy', 'nworkers', 'lfire',
+                   'regrid_method', 'ldag' (dependency graph of stages),
+                   'nplot' (processes for rendering of figures), 'lkeep_data'
+                   (keep data in data_cache after task, default is True)
+
+        OUTPUT variables:
+        timer - Wall time of stages {stage: seconds}
+    """
+    timer = {}
+    start_year, end_year = run_args.get('start_year'), run_args.get('end_year')
+    lsets = run_args.get('lsets')
+    sets = get_run_settings(
+        start_year, end_year, param_var, lsets, lmodis_nat = run_args.get('lmodis_nat'))
+    if run_args.get('ldag'):
+        # -- Only stages with changed inputs run, data are read only if needed:
+        return run_pipeline(
+            sets, start_year, end_year, region, param_var, lsets, timer = timer,
+            lcalc = run_args.get('lcalc'), lcache = run_args.get('lcache'),
+            llazy = run_args.get('llazy'), lfire = run_args.get('lfire'),
+            regrid_method = run_args.get('regrid_method'))
+    try:
+        if param_var not in data_cache:
+            data_cache.clear()
+            with stage_time(timer, 'get_data'):
+                data_cache[param_var] = load_data(
+                    sets, param_var, lsets, lcache = run_args.get('lcache'),
+                    llazy = run_args.get('llazy'), nworkers = run_args.get('nworkers'))
+        return run_postprocessing(
+            data_cache.get(param_var), sets, start_year, end_year, region, param_var,
+            lsets, lcalc = run_args.get('lcalc'), lstore = run_args.get('lstore', True),
+            lfire = run_args.get('lfire'), regrid_method = run_args.get('regrid_method'),
+            timer = timer, nplot = run_args.get('nplot', 1))
+    finally:
+        if not run_args.get('lkeep_data', True):
+            data_cache.clear()
+
+
+def run_tasks(
+        lst4tasks:list[tuple],
+        run_args:dict,
+        nprocs: Optional[int] = 1,
+        mem_budget: Optional[float] = None,
+    ) -> list[dict]:
+    """Run tasks (research parameter, domain) in process pool. Tasks are
+       started while memory of running tasks is less than memory budget (at
+       least one task is running). Failed tasks don't stop other tasks:
+
+        Input variables:
+        lst4tasks - Tasks: (research parameter, domain, memory of task in GB)
+        run_args - Settings of tasks (see run_task)
+        nprocs - Number of processes. Default is 1 (tasks run in actual process)
+        mem_budget - Memory budget (GB). Default is None (no limit)
+
+        OUTPUT variables:
+        lst4results - Results of tasks: 'param', 'region', 'status' ('OK' or
+                      'FAILED'), 'error' and wall time of stages
+    """
+    mem_budget = mem_budget if mem_budget is not None else np.inf
+    lst4results = []
+
+    def add_result(task, timer = None, error = None):
+        status = 'OK' if error is None else 'FAILED'
+        print(f'Task {task[0]} - {task[1]}: {status}')
+        lst4results.append({
+            'param': task[0], 'region': task[1], 'status': status,
+            'error': '' if error is None else repr(error), **(timer or {})})
+
+    # -- Tasks in actual process (data of research parameter are read once):
+    if nprocs <= 1:
+        for task in lst4tasks:
+            try:
+                add_result(task, timer = run_task(task[0], task[1], run_args))
+            except Exception as error:
+                traceback.print_exc()
+                add_result(task, error = error)
+        return lst4results
+
+    # -- Tasks in process pool. Memory budget is used only for running tasks,
+    #    workers don't keep data of research parameter after task:
+    run_args = {**run_args, 'lkeep_data': False}
+    pending = list(lst4tasks)
+    running = {}
+    executor = ProcessPoolExecutor(max_workers = nprocs)
+    while pending or running:
+        # -- Start tasks while they fit into memory budget:
+        used = sum(task[2] for task in running.values())
+        for task in list(pending):
+            if len(running) >= nprocs:
+                break
+            if running and used + task[2] > mem_budget:
+                continue
+            if not running and task[2] > mem_budget:
+                print(f'Task {task[0]} - {task[1]} ({task[2]:.1f} GB) is bigger '
+                      f'than memory budget ({mem_budget} GB)')
+            running[executor.submit(run_task, task[0], task[1], run_args)] = task
+            pending.remove(task)
+            used += task[2]
+        # -- Get results of finished tasks:
+        done, _ = wait(running, return_when = FIRST_COMPLETED)
+        lbroken = False
+        for future in done:
+            task = running.pop(future)
+            try:
+                add_result(task, timer = future.result())
+            except BrokenProcessPool as error:
+                # -- Worker was killed (for example: out of memory)
+                lbroken = True
+                add_result(task, error = error)
+            except Exception as error:
+                add_result(task, error = error)
+        if lbroken:
+            # -- All running tasks of the broken pool are failed, new pool for
+            #    other tasks:
+            for future, task in running.items():
+                add_result(task, error = BrokenProcessPool('process pool was broken'))
+            running = {}
+            executor.shutdown(wait = False, cancel_futures = True)
+            executor = ProcessPoolExecutor(max_workers = nprocs)
+    executor.shutdown()
+    return lst4results
+
+
+def get_timing_report(lst4results:list[dict]) -> pd.DataFrame:
+    """Create timing report: wall time (seconds) of each stage for each
+       research parameter and domain ('get_data' - only when data of research
+       parameter were read)"""
+    report = (
+        pd.DataFrame([res for res in lst4results if res.get('status') == 'OK'])
+          .drop(columns = ['status', 'error'])
+          .set_index(['param', 'region'])
+          .fillna(0.0)
+    )
+    report['total'] = report.sum(axis = 1)
+    return report.round(2)
+
+
+if __name__ == '__main__':
+    # ================   User settings (have to be adapted)  ================
+    # -- Research domains and parameters (the same as in run_ocn_postprocessing.sh):
+    start_year = 2003
+    end_year = 2020
+    lst4domains = ['Global', 'Europe', 'Tropics']
+    lst4vars = ['burned_area', 'cVeg', 'npp', 'gpp', 'lai', 'nee', 'nbp', 'fFire']
+    # -- Parameters for output folder (define only name of output folder). If
+    #    lmove is False, results are not moved:
+    nlines = 5
+    lmove = True
+    # -- Command line: start year, end year, domains and parameters:
+    if len(sys.argv) > 4:
+        start_year = int(sys.argv[1])
+        end_year = int(sys.argv[2])
+        lst4domains = sys.argv[3].split(',')
+        lst4vars = sys.argv[4].split(',')
+    fout_name = f'MAIN_{start_year}_{end_year}_{nlines}lines_24' if lmove else None
+    # -- Parallel tasks (research parameter, domain):
+    nprocs = 1                  # Number of processes (1 - all tasks in one process)
+    mem_budget = 64.0           # Memory budget for running tasks, GB
+    mem_factor = 4.0            # Memory of task = size of input data * mem_factor
+
+    # -- Load basic logical settings (the same as in fire_xarray.py):
+    lsets = logical_settings(
+        lcluster = True,        # Are you working on cluster?
+        lnc_info = False,       # Do you want to get more information about data?
+        station_mode = False,   # Do you want to get values for stations
+        lvis_lines = False,      # Do you want to visualize data (line plots)
+        lBasemap_moment = True,# Do you want to visualize data on grid for one moment?
+    )
+    # -- Load other logical parameters:
+    lmodis_nat = True          # Use natural PFT or all
+    lfire = True                # Is fire_xarray script active?
+    lcache = True               # Do you want to use cache of preprocessed data?
+    lstore = True               # Do you want to use store of statistics (only new timesteps)?
+    llazy = False               # Do you want to read data lazily (Dask chunks)?
+    nworkers = 4                # Number of workers for parallel loading of datasets
+    regrid_method = 'nearest'   # Regridding to OCN grid: 'nearest' or 'conservative'
+    ldag = False                # Do you want to run only changed stages (dependency graph)?
+    nplot = 1                   # Number of processes for rendering of figures (for each task)
+
+    # -- Load extra logical settings for computation (active if lBasemap_moment if True):
+    lcalc = lcalc_settings(
+        lstat = True,           # Activate algorithm for mean, std and trends calculations?
+        lmean_plot = False,      # Activate algorithm for mean visualization (one figure)?
+        lstd_plot = False,       # Activate algorithm for std visualization (one figure)?
+        ltrend_plot = False,     # Activate algorithm for trends visualization (one figure)?
+        lcollage = True,        # Activate algorithm for collage plots: mean, std, trend
+        ldiff_calc = True,      # Activate algorithm for difference calculations?
+    )
+
+    # =============================    Main program   =======================
+    print('START program')
+    tstart = time.perf_counter()
+    pOUT = get_output_path(lsets).get('fire_xarray')
+    run_args = {
+        'start_year'   : start_year,
+        'end_year'     : end_year,
+        'lsets'        : lsets,
+        'lcalc'        : lcalc,
+        'lmodis_nat'   : lmodis_nat,
+        'lcache'       : lcache,
+        'lstore'       : lstore,
+        'llazy'        : llazy,
+        'nworkers'     : nworkers,
+        'lfire'        : lfire,
+        'regrid_method': regrid_method,
+        'ldag'         : ldag,
+        'nplot'        : nplot,
+    }
+    # -- Tasks (research parameter, domain, memory): tasks of one parameter are
+    #    neighbours, data of parameter are reused by the next task (nprocs = 1):
+    lst4tasks = []
+    for param_var in lst4vars:
+        sets = get_run_settings(start_year, end_year, param_var, lsets, lmodis_nat = lmodis_nat)
+        memory = estimate_memory(sets.get('ipaths'), sets.get('res_param'), factor = mem_factor)
+        print(f'{param_var}: estimated memory of task {memory:.2f} GB')
+        lst4tasks.extend([(param_var, region, memory) for region in lst4domains])
+    lst4results = run_tasks(lst4tasks, run_args, nprocs = nprocs, mem_budget = mem_budget)
+
+    # -- Move folders with parameters results to the new one:
+    if fout_name is not None:
+        fout = makefolder(os.path.join(pOUT, fout_name))
+        for param_var in lst4vars:
+            if os.path.exists(os.path.join(pOUT, param_var)):
+                shutil.move(os.path.join(pOUT, param_var), fout)
+    else:
+        fout = makefolder(pOUT)
+
+    # -- Summary of tasks and timing report:
+    summary = pd.DataFrame(lst4results)[['param', 'region', 'status', 'error']]
+    summary.to_csv(fout + 'tasks_summary.csv', index = False)
+    nfailed = (summary['status'] != 'OK').sum()
+    print(f'Tasks: {len(summary)}, successful: {len(summary) - nfailed}, failed: {nfailed}')
+    if nfailed > 0:
+        print(summary[summary['status'] != 'OK'].to_string(index = False))
+    if nfailed < len(summary):
+        report = get_timing_report(lst4results)
+        print('Wall time of stages (seconds):')
+        print(report.to_string())
+        report.to_csv(fout + 'timing_report.csv')
+    print(f'Total wall time: {time.perf_counter() - tstart:.2f} s')
+    print('END program')
+# =============================    End of program   =====================
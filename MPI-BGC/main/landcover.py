@@ -26,6 +26,9 @@ Version    Date       Name
            Set enviroments to personal modules, adapted to global MPI-BGC project
     1.5    2023-05-31 Evgenii Churiulin, MPI-BGC
            Code refactoring
+    1.6    2026-10-17 MPI-BGC
+           PFT data of all stations are selected by one vectorized selection
+           for each dataset (calc.get_station_data)
 """
 #=============================     Import modules     =========================
 # -- Standard modules:
@@ -44,6 +47,7 @@ from settings import (logical_settings, config, get_path_in, get_output_path,
     get_settings4plots_landcover)
 from libraries import (makefolder, get_data, get_interpol, plot_diff_hist,
     tick_rotation_size)
+from calc import get_station_data
 # =============================   Personal functions   =================
 def read_data(region:str, lst4datasets:list[str], var:str, lsettings:bool,
         lresmp:bool, uconfig:config) -> tuple[list[xr.Dataset]]:
@@ -143,6 +147,7 @@ if __name__ == '__main__':
 
     # -- Get actual PFT data:
     pft4simulations = []           # full list of PFT data
+    lc4simulations  = []           # land cover data (all PFTs)
     for j in range(len(lst4lc_ds)):
         landCover = (lst4veget[j][param_LC]
                         .sel(time = slice(f'{t_start}', f'{t_stop}'))
@@ -152,6 +157,7 @@ if __name__ == '__main__':
         # -- Get actual data for each OCN PFT in simulation:
         pft_data  = [landCover[:, i, :, :] for i in range(len(veg_type))]
         pft4simulations.append(pft_data)
+        lc4simulations.append(landCover)
 
     # -- Get actual PFT names:
     pft_sname = [] # short name of PFTs in OCN simulations (they are the same)
@@ -163,37 +169,23 @@ if __name__ == '__main__':
     # -- PFT analysis for each station (table + figure):
     if lstations:
         print('Working on collage plot and data for stations \n')
-        # -- Get actual PFT data for each station
-        pft4datasets = []
-        for j in range(len(lst4lc_ds)):
-            pft4stations = [] # PFT for all stations
-            nam_stations = [] # station names
-            for st in range(len(stations)):
-                # Get name of each station:
-                nam_stations.append(stations.get(st + 1)[2])
-                # Get latitude and longitude for each station:
-                lats, lons = stations.get(st + 1)[0], stations.get(st + 1)[1]
-                # Get PFT for each station:
-                pft4station = [
-                    pft4simulations[j][i].sel(lat = lats, lon = lons, method = 'nearest')
-                    for i in range(len(pft4simulations[j]))]
-                # -- Collect stations from one dataset:
-                pft4stations.append(pft4station)
-            # -- Collect datasets:
-            pft4datasets.append(pft4stations)
+        # -- Get actual PFT data for all stations and datasets by one selection
+        #    for each dataset, pft4datasets[j, st, :, i] --> (dataset, station, time, PFT):
+        pft4datasets = get_station_data(lst4lc_ds, lc4simulations, None, stations)
+        nam_stations = list(pft4datasets.station_name.values) # station names
 
         # -- Get PFT table for stations:
         for j in range(len(lst4lc_ds)):
             pft_dataset = []
             for st in range(len(stations)):
                 pft_station = []
-                for i in range(len(pft4datasets[j][st])):
+                for i in range(len(pft4simulations[j])):
                     pft_station.append(
                         pd.concat(
                             [
                                 pd.Series(nam_stations[st]),
                                 pd.Series(pft_sname[i]),
-                                pd.Series(pft4datasets[j][st][i].mean('time').data * 100)  # get PFT values  in %
+                                pd.Series(pft4datasets[j, st, :, i].mean('time').data * 100)  # get PFT values  in %
                             ], axis = 1
                         )
                     )
@@ -225,9 +217,9 @@ if __name__ == '__main__':
                                                     rowspan = 1, colspan = 1))
 
             for st in range(len(stations)):
-                for i in range(len(pft4datasets[j][st])):
-                    ax_list[st].plot(pft4datasets[j][st][i].time        ,
-                                     pft4datasets[j][st][i].values * 100,          # PFT values in %
+                for i in range(len(pft4simulations[j])):
+                    ax_list[st].plot(pft4datasets[j, st, :, i].time     ,
+                                     pft4datasets[j, st, :, i].values * 100,       # PFT values in %
                                      label     = pft_sname[i]  ,
                                      linestyle = styles_ocn[i] ,
                                      color     = colors_ocn[i] )
@@ -13,6 +13,8 @@ Version    Date       Name
 ---------- ---------- ----
     1.1    05.11.2023 Evgenii Churiulin, Max Planck Institute for Biogeochemistry
            Initial release
+    1.2    16.10.2026 MPI-BGC
+           Added raster of region labels (int8) for all RECCAP2 domains
 """
 
 #=============================     Import modules     ==========================
@@ -32,6 +34,7 @@ class Reccap2a_domains:
         self.var_name = 'MASK'
         self.isvalue = 1
         self.nonvalue = 0
+        self.nolabel = -1
         self.ocn_lat_start = 90.0
         self.ocn_lat_end = -60.0
         self.domains_RECCAP2 = {
@@ -104,6 +107,44 @@ class Reccap2a_domains:
         ds.to_netcdf(pout)
 
 
+    def get_labels(self, pin:str, lst4zones:list[str]) -> np.array:
+        """Get raster of region labels (int8): label of each cell is index of
+           the domain in lst4zones, cells outside of domains are nolabel"""
+        labels = None
+        for i, zone in enumerate(lst4zones):
+            mask = self.select_domain(pin, zone)
+            if labels is None:
+                labels = np.full(mask.shape, self.nolabel, dtype = np.int8)
+            labels[mask == self.isvalue] = i
+        return labels
+
+
+    def save_labels(
+        self, lst4zones:list[str], labels:np.array, lat:np.array, lon:np.array,
+        pout:str):
+        """Save raster of region labels on OCN grid:"""
+        ds = xr.DataArray(
+            data = labels.astype(np.int8),
+            dims = ['lat', 'lon'],
+            coords = dict(
+                lat = lat,
+                lon = lon,
+            ),
+            attrs = {
+                'title' : 'RECCAP2A research domains',
+                'autors' : 'Evgenii Churiulin, Ana Bastos'
+            }
+        )
+        # -- Settings for region labels:
+        ds.name = 'region'
+        ds.attrs['long_name'] = 'Reccap2A domain labels'
+        ds.attrs['flag_values'] = np.arange(len(lst4zones), dtype = np.int8)
+        ds.attrs['flag_meanings'] = ' '.join(lst4zones)
+        ds.attrs['missing_label'] = self.nolabel
+        # -- Save NetCDF file:
+        ds.to_netcdf(pout, encoding = {'region': {'dtype': 'int8', '_FillValue': None}})
+
+
 if __name__ == '__main__':
     # ============================= Users settings =========================
     # -- RECCAP2A research domains:
@@ -137,3 +178,10 @@ if __name__ == '__main__':
             np.arange(lat1, lat2, step_lat),
             np.arange(lon1, lon2, step_lon),
             f'{main}/{zone}_domain.nc')
+    # -- Get raster of region labels for all domains (one file):
+    reccap_filter.save_labels(
+        reccap_zone,
+        reccap_filter.get_labels(pin, reccap_zone),
+        np.arange(lat1, lat2, step_lat),
+        np.arange(lon1, lon2, step_lon),
+        f'{main}/RECCAP2_regions.nc')
@@ -13,6 +13,8 @@ Version    Date       Name
 ---------- ---------- ----
     1.1    09.11.2023 Evgenii Churiulin, MPI-BGC
            Initial release
+    1.2    16.10.2026 MPI-BGC
+           Added chunk sizes for lazy (Dask) data processing
 """
 from creator_dict4maps import Map_settings
 from typing import Optional
@@ -1266,6 +1268,23 @@ class Bulder_config_class:
                 {'index' : 17, 'value' : 180, 'color' : '00dc82', 'veg_class' : 'Shrub or herbaceous cover,\n flooded, fresh/saline/brakish water'}, # 'natural'
             ]
         )
+
+        # Section 11: Settings for lazy (Dask) data processing:
+        # ======================================================================
+        # -- 11.1: Chunk sizes for dataset families. Data are read by chunks only
+        #          if lazy mode is active (get_data with llazy = True). Peak memory
+        #          depends on chunk size, not on the length of the time series.
+        cfg.add(
+            'dask_chunks', {
+                # Family   chunks
+                'OCN'   : {'time' : 12},
+                'JUL'   : {'time' : 12},
+                'ORC'   : {'time' : 12},
+                'ESA'   : {'time' :  1, 'lat' : 360, 'lon' : 720},
+                'GFED'  : {'time' : 12, 'lat' : 360, 'lon' : 720},
+                'Other' : {'time' : 12},
+            }
+        )
         return cfg
 
 # -- Testing mode:
@@ -481,6 +481,11 @@ def loc_output_folders() -> dict:
         'ocn_data4ctr_alg'      : 'There are no output files',
         'OCN_param'             : test_fig  + '/OCN_PARAM',
         'rand_ts4s0'            : test_dat  + '/RUND_TS',
+        # 5. Folder --> cache of preprocessed data
+        'cache4get_data'        : main_pout + '/CACHE/GET_DATA',
+        'cache4grids'           : main_pout + '/CACHE/GRIDS',
+        'cache4stats'           : main_pout + '/CACHE/STATS',
+        'cache4dag'             : main_pout + '/CACHE/DAG',
     }
     return pouts
 
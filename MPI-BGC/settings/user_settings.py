@@ -20,6 +20,7 @@ __all__ = [
     'get_settings4plots_landcover',
     'get_ocn_pft',
     'get_modis_pft',
+    'get_settings4chunks',
 ]
 """
 The module has user settings for visualization:
@@ -87,6 +88,8 @@ Version    Date       Name
            Added new OCN simulations
     1.6    2023-11-09 Evgenii Churiulin, MPI-BGC
            Added functions and new config class with user settings
+    1.7    2026-10-16 MPI-BGC
+           Added settings for lazy (Dask) data processing
 """
 # =============================     Import modules     ==================
 import config as cnf
@@ -448,6 +451,13 @@ def get_modis_pft(uconfig:cnf) -> list[dict]:
     return uconfig.get('modis_pft')
 
 
+# Section 11: User settings for lazy (Dask) data processing:
+# ======================================================================
+def get_settings4chunks(uconfig:cnf) -> dict:
+    """User settings for chunk sizes of dataset families (OCN, JUL, ORC, ESA, GFED):"""
+    return uconfig.get('dask_chunks')
+
+
 # -- Simple tests:
 if __name__ == '__main__':
     bcc = cnf.Bulder_config_class()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of renderers for 2D maps (lib4visualization.netcdf_grid) on OCN grid
+(300 * 720 grid points) with synthetic data:
+    1. pcolor     - one polygon for each cell (the previous version);
+    2. pcolormesh - one mesh of quadrilaterals;
+    3. auto       - image for regular grids (cylindrical projection), otherwise
+                    pcolormesh.
+Figures are rendered with Agg backend (dpi as in savefig of scripts), output of
+each renderer is compared pixel by pixel with pcolor output. Differences only
+at borders of cells (shift of border by 1 pixel) are not errors of renderer,
+they are shown separately.
+
+How to run:
+    cd tests
+    python3 bench_render.py [dpi]
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-17 MPI-BGC
+           Initial release
+"""
+# =============================     Import modules     =================
+# -- Standard:
+import os
+import sys
+import time
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+# -- Personal:
+sys.path.append(os.path.join(os.getcwd(), '..', 'libraries'))
+import lib4visualization as vis
+
+# =============================   Personal functions   =================
+
+# render_panel --> Render one map and get image (RGB) and wall time:
+def render_panel(domain:str, renderer:str, lons:np.array, lats:np.array,
+                 data:np.array, cbar_limit:list[dict], dpi:int) -> tuple[np.array, float]:
+    fig, ax = plt.subplots(figsize = (12, 7), dpi = dpi)
+    tstart = time.perf_counter()
+    vis.netcdf_grid(ax, domain, lons, lats, data, 'mean', 'burned_area',
+                    cbar_limit, 'burned area', renderer = renderer)
+    fig.canvas.draw()
+    wtime = time.perf_counter() - tstart
+    image = np.asarray(fig.canvas.buffer_rgba())[..., :3].astype(np.int16)
+    plt.close(fig)
+    return image, wtime
+
+# get_differences --> Fraction of different pixels (all and not explained by shift of
+#                     cell borders by 1 pixel):
+def get_differences(image:np.array, ref:np.array, tol:int = 2) -> tuple[float, float]:
+    ldiff = np.abs(image - ref).max(axis = -1) > tol
+    pad = np.pad(ref, ((1, 1), (1, 1), (0, 0)), mode = 'edge')
+    lshift = np.zeros(ldiff.shape, dtype = bool)
+    for i in range(3):
+        for j in range(3):
+            lshift |= np.abs(image - pad[i:i + ref.shape[0], j:j + ref.shape[1]]
+                            ).max(axis = -1) <= tol
+    return ldiff.mean(), (ldiff & ~lshift).mean()
+
+
+if __name__ == '__main__':
+    # =============================   User settings   ==================
+    dpi    = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    nlat   = 300
+    nlon   = 720
+    lst4domains   = ['Tropics', 'NH', 'Global']
+    lst4renderers = ['pcolor', 'pcolormesh', 'auto']
+    cbar_limit = [{'mode': 'burned_area', 'param': 'mean',
+                   'ymin': 0.0, 'ymax': 1.0, 'cbar': 'viridis'}]
+    # -- Synthetic data (the same grid as OCN, latitudes from north to south):
+    rng  = np.random.default_rng(42)
+    lats = np.linspace(89.75, -59.75, nlat)
+    lons = np.linspace(-179.75, 179.75, nlon)
+    data = rng.random((nlat, nlon))
+    data[rng.random(data.shape) < 0.05] = np.nan
+
+    # =============================    Main program   ==================
+    print(f'Grid: {nlat} * {nlon}, dpi: {dpi}')
+    for domain in lst4domains:
+        # -- The first call creates Basemap, projected grid and land mask (cache):
+        render_panel(domain, 'pcolormesh', lons, lats, data, cbar_limit, 50)
+        xi, yi = vis.get_projected_grid(
+            vis.select_domain(domain, None, lons, lats)[0],
+            vis.get_domain_settings(domain, lons, lats)[0], lons, lats)[2:]
+        print(f'{domain} (regular grid: {vis.is_regular_grid(xi, yi)}):')
+        ref, ref_time = render_panel(domain, 'pcolor', lons, lats, data, cbar_limit, dpi)
+        print(f'    {"pcolor":<12}: {ref_time:8.2f} s per panel')
+        for renderer in lst4renderers[1:]:
+            image, wtime = render_panel(domain, renderer, lons, lats, data, cbar_limit, dpi)
+            ndiff, nerror = get_differences(image, ref)
+            print(f'    {renderer:<12}: {wtime:8.2f} s per panel, different pixels: '
+                  f'{ndiff:.4%}, not at cell borders: {nerror:.4%}')
+# =============================    End of program   ================
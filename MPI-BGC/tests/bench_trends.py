@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of trend algorithms on OCN grid (300 * 720 grid points) with
+synthetic heavy-tailed data:
+    1. polyfit path (the previous version of Statistic.timtrend);
+    2. closed form of least-squares trend (get_linear_trend);
+    3. Theil-Sen / Mann-Kendall, Numba version (theil_sen_mk);
+    4. Theil-Sen / Mann-Kendall, NumPy version (theil_sen_mk_numpy).
+Theil-Sen slopes are compared with scipy.stats.theilslopes for random points.
+
+How to run:
+    cd tests
+    python3 bench_trends.py [number of years]
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-16 MPI-BGC
+           Initial release
+"""
+# =============================     Import modules     =================
+# -- Standard:
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import xarray as xr
+from scipy.stats import theilslopes
+# -- Personal:
+sys.path.append(os.path.join(os.getcwd(), '..', 'calc'))
+from stat_controls import get_linear_trend
+from robust_trends import lnumba, theil_sen_mk, theil_sen_mk_numpy, get_robust_trend
+
+# =============================   Personal functions   =================
+
+# polyfit_trend --> the previous version of Statistic.timtrend:
+def polyfit_trend(data:xr.DataArray) -> np.array:
+    values = data.values.copy()
+    years  = data.time.dt.year.values
+    values[np.isnan(values)] = 0
+    regressions = np.polyfit(years, values.reshape(len(years), -1), 1)
+    return regressions[0,:].reshape(values.shape[1], values.shape[2])
+
+# run_timer --> Get wall time of function:
+def run_timer(name:str, func, *args) -> float:
+    tstart = time.perf_counter()
+    func(*args)
+    wtime = time.perf_counter() - tstart
+    print(f'{name:<32}: {wtime:8.2f} s')
+    return wtime
+
+
+if __name__ == '__main__':
+    # =============================   User settings   ==================
+    nyears = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    nlat   = 300
+    nlon   = 720
+    # -- Synthetic data: trend + heavy-tailed noise, water points are NaN:
+    rng   = np.random.default_rng(42)
+    years = np.arange(2001, 2001 + nyears)
+    data  = (0.05 * (years - years[0])[:, None, None] +
+             rng.standard_t(2, size = (nyears, nlat, nlon)))
+    data[:, :50, :] = np.nan
+    data[rng.random(data.shape) < 0.05] = np.nan
+    data = xr.DataArray(
+        data,
+        dims = ('time', 'lat', 'lon'),
+        coords = {
+            'time': pd.date_range(f'{years[0]}', periods = nyears, freq = 'YS'),
+            'lat' : np.linspace(-59.75, 89.75, nlat),
+            'lon' : np.linspace(-179.75, 179.75, nlon),
+        },
+    )
+    values = np.ascontiguousarray(
+        data.transpose('lat', 'lon', 'time').values.reshape(-1, nyears))
+
+    # =============================    Main program   ==================
+    print(f'Grid: {nlat} * {nlon}, years: {nyears}, Numba: {lnumba}')
+    run_timer('polyfit (previous timtrend)', polyfit_trend, data)
+    run_timer('closed form (get_linear_trend)', get_linear_trend, data)
+    if lnumba:
+        # -- The first call includes compilation time:
+        run_timer('Theil-Sen/MK Numba (compile)', theil_sen_mk, values[:10], years * 1.0)
+    run_timer('Theil-Sen/MK (get_robust_trend)', get_robust_trend, data)
+    run_timer('Theil-Sen/MK NumPy', theil_sen_mk_numpy, values, years * 1.0)
+
+    # -- Control of results:
+    res = theil_sen_mk(values, years * 1.0)
+    res_np = theil_sen_mk_numpy(values, years * 1.0)
+    print('Max difference Numba - NumPy:', np.nanmax(np.abs(res - res_np)))
+    points = rng.choice(np.where(res[:, 4] > 2)[0], 20, replace = False)
+    max_diff = 0.0
+    for i in points:
+        valid = ~np.isnan(values[i])
+        max_diff = max(max_diff, abs(
+            theilslopes(values[i][valid], years[valid])[0] - res[i, 0]))
+    print('Max difference with scipy.stats.theilslopes:', max_diff)
+# =============================    End of program   ================
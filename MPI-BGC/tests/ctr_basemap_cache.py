@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Control of Basemap cache (lib4visualization.get_basemap): maps are drawn many
+times by netcdf_grid (new figure for each map), cached Basemap instances should
+not keep state of axes (_initialized_axes, _mapboundarydrawn), references to
+axes and figures. Number of axes in cached Basemap and number of alive figures
+after all maps should be 0.
+
+How to run:
+    cd tests
+    python3 ctr_basemap_cache.py [number of maps]
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-17 MPI-BGC
+           Initial release
+"""
+# =============================     Import modules     =================
+# -- Standard:
+import os
+import sys
+import gc
+import weakref
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+# -- Personal:
+sys.path.append(os.path.join(os.getcwd(), '..', 'libraries'))
+import lib4visualization as vis
+
+# =============================   Personal functions   =================
+
+# draw_map --> Draw one map in new figure and get weak reference of figure:
+def draw_map(domain:str, lons:np.array, lats:np.array, data:np.array,
+             cbar_limit:list[dict]) -> weakref.ref:
+    fig, ax = plt.subplots(figsize = (6, 4), dpi = 50)
+    vis.netcdf_grid(ax, domain, lons, lats, data, 'mean', 'burned_area',
+                    cbar_limit, 'burned area')
+    fig.canvas.draw()
+    plt.close(fig)
+    return weakref.ref(fig)
+
+# get_axes_state --> Number of axes and drawn boundaries in cached Basemap instances:
+def get_axes_state() -> tuple[int, int]:
+    naxes = sum(len(getattr(m, '_initialized_axes', ())) for m in vis.basemap_cache.values())
+    nboundary = sum(getattr(m, '_mapboundarydrawn', False) is not False
+                    for m in vis.basemap_cache.values())
+    return naxes, nboundary
+
+
+if __name__ == '__main__':
+    # =============================   User settings   ==================
+    nmaps = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    lst4domains = ['Global', 'NH', 'Tropics']
+    cbar_limit = [{'mode': 'burned_area', 'param': 'mean',
+                   'ymin': 0.0, 'ymax': 1.0, 'cbar': 'viridis'}]
+    rng  = np.random.default_rng(42)
+    lats = np.linspace(89.75, -59.75, 300)
+    lons = np.linspace(-179.75, 179.75, 720)
+    data = rng.random((len(lats), len(lons)))
+
+    # =============================    Main program   ==================
+    lst4figs = []
+    for i in range(nmaps):
+        lst4figs.append(draw_map(lst4domains[i % len(lst4domains)], lons, lats, data, cbar_limit))
+    gc.collect()
+    naxes, nboundary = get_axes_state()
+    nalive = sum(fig() is not None for fig in lst4figs)
+    print(f'Maps: {nmaps}, cached Basemap instances: {len(vis.basemap_cache)}')
+    print(f'Axes in cached Basemap: {naxes}, drawn boundaries: {nboundary}, '
+          f'alive figures: {nalive}')
+# =============================    End of program   ================
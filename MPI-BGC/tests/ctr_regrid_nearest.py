@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Control of nearest regridding with sparse weights (lib4regrid.regrid, method
+'nearest') against xarray interp_like (method = 'nearest'). Grids with ties
+(each target point is in the middle between two source cells, for example:
+0.25 deg --> 0.5 deg), ascending and descending latitudes and random grids
+are checked. Fraction of different cells should be 0.
+
+How to run:
+    cd tests
+    python3 ctr_regrid_nearest.py
+
+History:
+Version    Date       Name
+---------- ---------- ----
+    1.1    2026-10-17 MPI-BGC
+           Initial release
+"""
+# =============================     Import modules     =================
+# -- Standard:
+import os
+import sys
+import numpy as np
+import xarray as xr
+# -- Personal:
+sys.path.append(os.path.join(os.getcwd(), '..', 'libraries'))
+import lib4regrid
+
+# =============================   Personal functions   =================
+
+# get_mismatch --> Fraction of target cells with different values (NaN = NaN):
+def get_mismatch(data:xr.DataArray, dst_lat:np.array, dst_lon:np.array) -> float:
+    target = xr.Dataset(coords = {'lat': dst_lat, 'lon': dst_lon})
+    ref = data.interp_like(target, method = 'nearest').values
+    res = lib4regrid.regrid(data, dst_lat, dst_lon, method = 'nearest').values
+    return np.mean(~((ref == res) | (np.isnan(ref) & np.isnan(res))))
+
+
+if __name__ == '__main__':
+    # =============================   User settings   ==================
+    rng  = np.random.default_rng(42)
+    lat4 = np.arange(-89.875, 90.0, 0.25)
+    lon4 = np.arange(-179.875, 180.0, 0.25)
+    lat2 = np.arange(-89.75, 90.0, 0.5)
+    lon2 = np.arange(-179.75, 180.0, 0.5)
+    lst4grids = {
+        # name: (source lat, source lon, target lat, target lon)
+        '0.25 -> 0.5, ascending lat'   : (lat4, lon4, lat2, lon2),
+        '0.25 -> 0.5, descending lat'  : (lat4[::-1], lon4, lat2[::-1], lon2),
+        '0.25 -> 0.5, mixed lat order' : (lat4[::-1], lon4, lat2, lon2),
+        '1.0 -> 0.5'                   : (np.arange(-89.5, 90.0, 1.0),
+                                          np.arange(-179.5, 180.0, 1.0), lat2, lon2),
+        'random grids'                 : (np.sort(rng.uniform(-90, 90, 50)), lon4[:100],
+                                          np.sort(rng.uniform(-95, 95, 70))[::-1], lon2[:40]),
+    }
+
+    # =============================    Main program   ==================
+    for name, (src_lat, src_lon, dst_lat, dst_lon) in lst4grids.items():
+        data = xr.DataArray(
+            rng.random((2, len(src_lat), len(src_lon))),
+            dims = ('time', 'lat', 'lon'),
+            coords = {'lat': src_lat, 'lon': src_lon},
+        )
+        data[:, ::7, ::5] = np.nan
+        print(f'{name:<30}: different cells {get_mismatch(data, dst_lat, dst_lon):.2%}')
+# =============================    End of program   ================